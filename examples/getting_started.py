@@ -7,6 +7,9 @@ for collaborative reinforcement learning tasks.
 
 import sys
 import os
+
+import numpy as np
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from multi_agent.workflows import CollaborativeLearning
@@ -50,15 +53,25 @@ def main():
     # Step 3: Define a sample task
     print("\n3. Defining sample task...")
     
+    rng = np.random.default_rng(0)
+    
+    def regression_split(slope, n=20):
+        x = rng.uniform(-1, 1, size=(n, 4)).astype(np.float32)
+        return x, (x @ slope).astype(np.float32)
+    
+    slopes = [rng.normal(size=(4, 1)).astype(np.float32) for _ in range(4)]
+    observations, targets = regression_split(slopes[0], n=64)
+    time_steps = np.arange(200, dtype=np.float32) / 10.0
+    
     task_name = "HalfCheetah-v4"
     task_config = {
         "current_performance": 0.65,
         "target_performance": 0.90,
         "prediction_horizon": 10,
-        "support_data": "sample_support_data",
-        "query_data": "sample_query_data",
-        "sequence_data": "sample_sequence_data",
-        "environment_data": "sample_env_data"
+        "support_data": [regression_split(slope) for slope in slopes],
+        "query_data": [regression_split(slope) for slope in slopes],
+        "sequence_data": np.stack([np.sin(time_steps), np.cos(time_steps)], axis=-1),
+        "environment_data": {"observations": observations, "targets": targets}
     }
     
     print(f"   📋 Task: {task_name}")
@@ -79,13 +92,14 @@ def main():
         print("\n5. 📊 Results:")
         print("   " + "="*40)
         
-        if results["status"] == "success":
-            print(f"   ✅ Status: {results['status'].upper()}")
+        if results["status"] in ("success", "partial"):
+            icon = "✅" if results["status"] == "success" else "⚠️"
+            print(f"   {icon} Status: {results['status'].upper()}")
             print(f"   📈 Performance Improvement: {results['improvement']:.1f}%")
-            print(f"   🧠 Emergent Strategies Discovered: {results['emergent_strategies']}")
             print(f"   🤝 Collaboration Effectiveness: {results['collaboration_effectiveness']:.1%}")
-            
-            print("\n   🎉 SUCCESS: Agents achieved emergent intelligence!")
+            for name, record in results["results"]["subtasks"].items():
+                detail = record.get("reason") or f"{record.get('elapsed', 0.0):.2f}s"
+                print(f"      • {name}: {record['status']} ({detail})")
             
         else:
             print(f"   ❌ Status: {results['status'].upper()}")
@@ -93,14 +107,12 @@ def main():
     
     except Exception as e:
         print(f"\n   ❌ Error during execution: {str(e)}")
-        print("   💡 This is expected in the initial setup - implement core components!")
     
     # Step 6: Next steps
     print("\n6. 🚀 Next Steps:")
     print("   " + "-"*40)
-    print("   • Implement core SSM-MetaRL components in core/ directory")
-    print("   • Connect tools to actual model implementations")
-    print("   • Add real environment data and tasks")
+    print("   • Replace the synthetic arrays with real environment data and tasks")
+    print("   • Try execution_mode=\"crew\" for LLM-planned delegation")
     print("   • Run advanced benchmarks with emergence_benchmark.py")
     print("   • Explore custom agent creation and collaboration patterns")
     
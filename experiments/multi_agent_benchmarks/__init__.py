@@ -0,0 +1 @@
+"""Benchmarks for the multi-agent framework."""
@@ -0,0 +1,95 @@
+"""Cold-start (import and construction) benchmark for the multi_agent package.
+
+Each stage runs in a fresh interpreter so module caches never hide import
+cost. The run fails when the median cold ``import multi_agent`` exceeds the
+budget or when the bare package import loads a heavy dependency.
+
+Usage:
+    python -m experiments.multi_agent_benchmarks.import_time --budget 0.25
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+HEAVY_MODULES = ("crewai", "crewai_tools", "langchain", "torch", "gymnasium")
+
+STAGES = {
+    "package": "import multi_agent",
+    "subpackages": "import multi_agent.agents, multi_agent.tools, multi_agent.workflows",
+    "coordinator": "from multi_agent.agents import CoordinatorAgent; CoordinatorAgent()",
+    "workflow": "from multi_agent.workflows import CollaborativeLearning; CollaborativeLearning()"
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeats: int = 5) -> Dict[str, Any]:
+    """Run ``statement`` in ``repeats`` fresh interpreters and summarize the timings."""
+    samples: List[float] = []
+    loaded: List[str] = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe["seconds"])
+        loaded = probe["loaded"]
+    return {
+        "median_seconds": statistics.median(samples),
+        "min_seconds": min(samples),
+        "max_seconds": max(samples),
+        "heavy_modules_loaded": loaded
+    }
+
+
+def run(budget: float = 0.25, repeats: int = 5,
+        stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Measure the selected stages and check the package import against ``budget``."""
+    results = {name: measure(STAGES[name], repeats) for name in (stages or list(STAGES))}
+    package = results.get("package")
+    failures = []
+    if package is not None:
+        if package["median_seconds"] > budget:
+            failures.append(f"import multi_agent took {package['median_seconds']:.3f}s "
+                            f"(budget {budget:.3f}s)")
+        if package["heavy_modules_loaded"]:
+            failures.append(f"import multi_agent loaded {package['heavy_modules_loaded']}")
+    return {"budget_seconds": budget, "repeats": repeats, "stages": results,
+            "passed": not failures, "failures": failures}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.25,
+                        help="Maximum median seconds for a cold `import multi_agent`")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES))
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = run(args.budget, args.repeats, args.stages)
+    for name, stage in report["stages"].items():
+        print(f"{name:12s} median {stage['median_seconds'] * 1000:8.1f} ms  "
+              f"heavy: {', '.join(stage['heavy_modules_loaded']) or '-'}")
+    for failure in report["failures"]:
+        print(f"FAIL: {failure}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
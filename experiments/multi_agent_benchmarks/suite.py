@@ -0,0 +1,368 @@
+"""Performance benchmarks for the tools, agents and workflows.
+
+Benchmarks:
+    ssm         SSMTool wall time and steps/sec vs sequence length and state_dim
+    maml        MAMLTool wall time and peak memory vs tasks and adaptation_steps
+    adaptation  AdaptationTool per-update latency vs batch size
+    workflow    End-to-end ``solve_task`` wall time (direct path, and the crew
+                path with an offline stub LLM)
+
+Results are written as JSON. With ``--baseline`` every metric is compared
+with the stored run and regressions beyond ``--tolerance`` fail the run.
+Tool result caches are disabled so each repeat measures real work.
+
+Usage:
+    python -m experiments.multi_agent_benchmarks.suite --quick --output results.json
+    python -m experiments.multi_agent_benchmarks.suite --quick \\
+        --baseline experiments/multi_agent_benchmarks/baseline_quick.json
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Metric-name suffixes and whether larger values are better
+_DIRECTIONS = (("per_second", True), ("_seconds", False), ("_ms", False), ("_bytes", False))
+# Metrics checked against the baseline; medians and tail latencies are
+# reported but too noisy on shared machines to gate on
+GATED_METRICS = ("min_seconds", "steps_per_second", "tasks_per_second", "update_p50_ms",
+                 "peak_rss_bytes")
+
+GRIDS = {
+    "full": {
+        "ssm": {"sequence_length": [256, 1024, 4096, 16384], "state_dim": [16, 64, 256]},
+        "maml": {"num_tasks": [2, 8, 32], "adaptation_steps": [1, 5, 10]},
+        "adaptation": {"batch_size": [8, 64, 512]},
+        "workflow": {"execution_mode": ["direct", "crew"]}
+    },
+    "quick": {
+        "ssm": {"sequence_length": [256, 2048], "state_dim": [16, 64]},
+        "maml": {"num_tasks": [2, 16], "adaptation_steps": [1, 5]},
+        "adaptation": {"batch_size": [16, 256]},
+        "workflow": {"execution_mode": ["direct", "crew"]}
+    }
+}
+
+
+class PeakRSS:
+    """Samples the resident set size in a thread and reports the peak increase.
+
+    Reads ``/proc/self/statm``, so it counts tensor allocations that
+    ``tracemalloc`` cannot see; on other platforms the result is None.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.peak_bytes: Optional[int] = None
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._stop = threading.Event()
+
+    def _rss(self) -> Optional[int]:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page
+        except OSError:
+            return None
+
+    def _sample(self, baseline: int) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, self._rss() - baseline)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakRSS":
+        baseline = self._rss()
+        if baseline is not None:
+            self.peak_bytes = 0
+            self._thread = threading.Thread(target=self._sample, args=(baseline,), daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.peak_bytes is not None:
+            self._stop.set()
+            self._thread.join()
+
+
+class _NoMemory:
+    peak_bytes = None
+
+    def __enter__(self) -> "_NoMemory":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+def measure(fn: Callable[[], Any], repeats: int = 3, warmup: int = 1,
+            memory: bool = False) -> Dict[str, Any]:
+    """Time ``fn`` over ``repeats`` runs after ``warmup`` untimed runs."""
+    for _ in range(warmup):
+        fn()
+    samples, peaks = [], []
+    for _ in range(repeats):
+        with PeakRSS() if memory else _NoMemory() as probe:
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        peaks.append(probe.peak_bytes)
+    result = {"median_seconds": statistics.median(samples), "min_seconds": min(samples)}
+    if memory and peaks[0] is not None:
+        result["peak_rss_bytes"] = max(peaks)
+    return result
+
+
+def _grid(spec: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = sorted(spec)
+    return [dict(zip(names, values)) for values in itertools.product(*(spec[n] for n in names))]
+
+
+def bench_ssm(params: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    from multi_agent.tools.ssm_tool import SSMTool
+
+    tool = SSMTool()
+    tool.set_cache(None)
+    length, input_dim = params["sequence_length"], 8
+    sequence = np.random.default_rng(0).standard_normal((length, input_dim)).astype(np.float32)
+    kwargs = dict(state_dim=params["state_dim"], input_dim=input_dim, prediction_steps=10,
+                  train_epochs=1)
+
+    def call() -> None:
+        result = tool._run(sequence, **kwargs)
+        if result["status"] != "success":
+            raise RuntimeError(result["error_message"])
+
+    metrics = measure(call, repeats)
+    metrics["steps_per_second"] = length / metrics["min_seconds"]
+    return metrics
+
+
+def bench_maml(params: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    from multi_agent.tools.maml_tool import MAMLTool
+
+    tool = MAMLTool()
+    tool.set_cache(None)
+    rng = np.random.default_rng(0)
+    tasks = []
+    for _ in range(params["num_tasks"]):
+        slope = rng.standard_normal((4, 1)).astype(np.float32)
+        x = rng.uniform(-1, 1, size=(32, 4)).astype(np.float32)
+        tasks.append({"support_x": x[:16], "support_y": x[:16] @ slope,
+                      "query_x": x[16:], "query_y": x[16:] @ slope})
+
+    def call() -> None:
+        result = tool._run(tasks, adaptation_steps=params["adaptation_steps"])
+        if result["status"] != "success":
+            raise RuntimeError(result["error_message"])
+
+    metrics = measure(call, repeats, memory=True)
+    metrics["tasks_per_second"] = params["num_tasks"] / metrics["min_seconds"]
+    return metrics
+
+
+def bench_adaptation(params: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    from multi_agent.tools.adaptation_tool import AdaptationTool
+
+    tool = AdaptationTool()
+    tool.set_cache(None)
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((params["batch_size"], 8)).astype(np.float32)
+    y = x.sum(axis=-1, keepdims=True)
+    latencies = []
+
+    def call() -> None:
+        result = tool._run(x, y, adaptation_steps=50)
+        if result["status"] != "success":
+            raise RuntimeError(result["error_message"])
+        latencies.append(result["update_latency"])
+
+    metrics = measure(call, repeats)
+    metrics["update_p50_ms"] = statistics.median(entry["p50_ms"] for entry in latencies)
+    metrics["update_p99_ms"] = statistics.median(entry["p99_ms"] for entry in latencies)
+    return metrics
+
+
+def _workflow_inputs() -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+
+    def split(slope: np.ndarray) -> Any:
+        x = rng.uniform(-1, 1, size=(20, 4)).astype(np.float32)
+        return x, (x @ slope).astype(np.float32)
+
+    slopes = [rng.standard_normal((4, 1)).astype(np.float32) for _ in range(4)]
+    t = np.linspace(0, 8 * np.pi, 256, dtype=np.float32)
+    observations, targets = split(slopes[0])
+    return {
+        "support_data": [split(slope) for slope in slopes],
+        "query_data": [split(slope) for slope in slopes],
+        "sequence_data": np.stack([np.sin(t), np.cos(t)], axis=-1),
+        "environment_data": {"observations": observations, "targets": targets}
+    }
+
+
+def bench_workflow(params: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    from multi_agent.agents import AdaptationAgent, MetaLearningAgent, StateModelingAgent
+    from multi_agent.workflows import CollaborativeLearning
+
+    mode = params["execution_mode"]
+    config: Dict[str, Any] = {"execution_mode": mode, "verbose": False}
+    if mode == "crew":
+        # Every LLM call is answered locally, so this measures framework overhead
+        config.update(llm="stub", llm_cache={"mode": "replay"})
+    agent_config = {"cache": False, "verbose": False}
+    workflow = CollaborativeLearning(
+        agents=[MetaLearningAgent(agent_config), AdaptationAgent(agent_config),
+                StateModelingAgent(agent_config)],
+        config=config
+    )
+    inputs = _workflow_inputs()
+
+    def call() -> None:
+        result = workflow.solve_task("benchmark", **inputs)
+        if result["status"] != "success":
+            raise RuntimeError(result.get("error_message", result["status"]))
+
+    try:
+        return measure(call, repeats)
+    finally:
+        workflow.executor.shutdown()
+
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any], int], Dict[str, Any]]] = {
+    "ssm": bench_ssm,
+    "maml": bench_maml,
+    "adaptation": bench_adaptation,
+    "workflow": bench_workflow
+}
+
+
+def environment() -> Dict[str, Any]:
+    import torch
+
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
+    }
+
+
+def run(benchmarks: Optional[List[str]] = None, grid: str = "quick",
+        repeats: int = 3) -> Dict[str, Any]:
+    """Run the selected benchmarks over a parameter grid.
+
+    Returns:
+        ``{"environment": ..., "grid": ..., "results": {name: [{params, metrics}]}}``
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for name in benchmarks or list(BENCHMARKS):
+        results[name] = []
+        for params in _grid(GRIDS[grid][name]):
+            try:
+                metrics = BENCHMARKS[name](params, repeats)
+            except Exception as e:
+                metrics = {"error": str(e)}
+            results[name].append({"params": params, "metrics": metrics})
+    return {"environment": environment(), "grid": grid, "repeats": repeats, "results": results}
+
+
+def _lower_is_better(metric: str) -> Optional[bool]:
+    for suffix, higher_is_better in _DIRECTIONS:
+        if metric.endswith(suffix):
+            return not higher_is_better
+    return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+            noise_floor_seconds: float = 1e-3,
+            noise_floor_bytes: int = 16 * 2 ** 20,
+            metrics: Tuple[str, ...] = GATED_METRICS) -> List[Dict[str, Any]]:
+    """``metrics`` that got worse than ``baseline`` by more than ``tolerance`` (relative).
+
+    Timings below ``noise_floor_seconds`` and memory below
+    ``noise_floor_bytes`` in both runs are ignored (RSS moves by whole pages
+    and allocator arenas), as are benchmarks and parameter combinations
+    missing from either run.
+    Benchmarks that errored are reported as regressions.
+    """
+    def keyed(runs: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        return {(name, json.dumps(entry["params"], sort_keys=True)): entry["metrics"]
+                for name, entries in runs["results"].items() for entry in entries}
+
+    current, previous = keyed(report), keyed(baseline)
+    regressions = []
+    for key in sorted(current.keys() & previous.keys()):
+        values, reference = current[key], previous[key]
+        if "error" in values:
+            regressions.append({"benchmark": key[0], "params": json.loads(key[1]),
+                                "metric": "error", "current": values["error"]})
+            continue
+        for metric in sorted(values.keys() & reference.keys() & set(metrics)):
+            lower_is_better = _lower_is_better(metric)
+            old, new = reference[metric], values[metric]
+            if lower_is_better is None or not old:
+                continue
+            if metric.endswith("_seconds") and max(old, new) < noise_floor_seconds:
+                continue
+            if metric.endswith("_bytes") and max(old, new) < noise_floor_bytes:
+                continue
+            change = (new - old) / abs(old) if lower_is_better else (old - new) / abs(old)
+            if change > tolerance:
+                regressions.append({"benchmark": key[0], "params": json.loads(key[1]),
+                                    "metric": metric, "baseline": old, "current": new,
+                                    "worse_by": change})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Benchmarks to run, from {sorted(BENCHMARKS)} (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Use the small parameter grid")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against this stored report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmarks: {unknown}")
+
+    report = run(args.benchmarks or None, "quick" if args.quick else "full", args.repeats)
+    for name, entries in report["results"].items():
+        for entry in entries:
+            metrics = ", ".join(f"{metric}={value:.4g}" if isinstance(value, float)
+                                else f"{metric}={value}"
+                                for metric, value in entry["metrics"].items())
+            print(f"{name:10s} {json.dumps(entry['params'], sort_keys=True)}  {metrics}")
+
+    failed = any("error" in entry["metrics"]
+                 for entries in report["results"].values() for entry in entries)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        for regression in report["regressions"]:
+            print(f"REGRESSION: {regression['benchmark']} {regression['params']} "
+                  f"{regression['metric']}: {regression.get('baseline')} -> {regression['current']}")
+        failed = failed or bool(report["regressions"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
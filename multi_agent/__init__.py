@@ -1,9 +1,34 @@
 """MultiAgent-SSM-MetaRL: Multi-Agent Framework for Advanced RL Research."""
 
+from typing import TYPE_CHECKING
+
+from ._lazy import attach
+
 __version__ = "0.1.0"
 __author__ = "sunghunkwag"
 __description__ = "Multi-Agent Framework for State Space Models with Meta-Reinforcement Learning"
 
-from .agents import *
-from .tools import *
-from .workflows import *
\ No newline at end of file
+# Public names resolve through the subpackages on first access (PEP 562), so
+# importing the package does not pull in crewai, langchain or torch
+_EXPORTS = {
+    "MetaLearningAgent": ".agents",
+    "AdaptationAgent": ".agents",
+    "StateModelingAgent": ".agents",
+    "EnvironmentAgent": ".agents",
+    "CoordinatorAgent": ".agents",
+    "SSMTool": ".tools",
+    "MAMLTool": ".tools",
+    "AdaptationTool": ".tools",
+    "EnvironmentTool": ".tools",
+    "CollaborativeLearning": ".workflows",
+    "EmergentOptimization": ".workflows"
+}
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .agents import *
+    from .tools import *
+    from .workflows import *
+
+__all__ = list(_EXPORTS)
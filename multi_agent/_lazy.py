@@ -0,0 +1,32 @@
+"""PEP 562 lazy attribute loading for the package namespaces."""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def attach(package: str, attributes: Dict[str, str]) -> Tuple[Callable[[str], Any],
+                                                               Callable[[], List[str]]]:
+    """Build module-level ``__getattr__``/``__dir__`` for a package.
+
+    Args:
+        package: ``__name__`` of the package the functions are installed in
+        attributes: Public attribute name -> relative module that defines it
+
+    Returns:
+        ``(__getattr__, __dir__)``; the first access imports the defining
+        module and caches the attribute in the package namespace
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = attributes.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1,15 +1,37 @@
 """Multi-Agent System - Specialized AI Agents."""
 
-from .meta_learning_agent import MetaLearningAgent
-from .adaptation_agent import AdaptationAgent
-from .state_modeling_agent import StateModelingAgent
-from .environment_agent import EnvironmentAgent
-from .coordinator_agent import CoordinatorAgent
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+# Agents are imported on first access so `import multi_agent.agents` stays
+# cheap; crewai and torch load only when an agent is actually used
+__getattr__, __dir__ = attach(__name__, {
+    "MetaLearningAgent": ".meta_learning_agent",
+    "AdaptationAgent": ".adaptation_agent",
+    "StateModelingAgent": ".state_modeling_agent",
+    "EnvironmentAgent": ".environment_agent",
+    "CoordinatorAgent": ".coordinator_agent",
+    "CachedLLM": ".llm_cache",
+    "LLMResponseCache": ".llm_cache",
+    "StubLLM": ".llm_cache"
+})
+
+if TYPE_CHECKING:
+    from .meta_learning_agent import MetaLearningAgent
+    from .adaptation_agent import AdaptationAgent
+    from .state_modeling_agent import StateModelingAgent
+    from .environment_agent import EnvironmentAgent
+    from .coordinator_agent import CoordinatorAgent
+    from .llm_cache import CachedLLM, LLMResponseCache, StubLLM
 
 __all__ = [
     "MetaLearningAgent",
     "AdaptationAgent", 
     "StateModelingAgent",
     "EnvironmentAgent",
-    "CoordinatorAgent"
-]
\ No newline at end of file
+    "CoordinatorAgent",
+    "CachedLLM",
+    "LLMResponseCache",
+    "StubLLM"
+]
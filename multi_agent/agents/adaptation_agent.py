@@ -1,9 +1,13 @@
 """Adaptation Agent - Specializes in real-time optimization."""
 
-from typing import Dict, Any, Optional
-from crewai import Agent, Task
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple, TYPE_CHECKING
+from ..core.tracing import traced
 from ..tools.adaptation_tool import AdaptationTool
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+    from ..core.tenants import TenantRegistry
+
 class AdaptationAgent:
     """Agent specialized in test-time adaptation and online optimization.
     
@@ -17,24 +21,44 @@ class AdaptationAgent:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.adaptation_tool = AdaptationTool()
-        
-        self.agent = Agent(
-            role="Test-Time Adaptation Specialist",
-            goal="Continuously optimize model performance during deployment through real-time adaptation",
-            backstory="""You are an expert in online learning and test-time adaptation. 
-            Your specialty is improving model performance in real-time as new data 
-            becomes available, without requiring retraining from scratch.""",
-            tools=[self.adaptation_tool],
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
-        )
+        if not self.config.get("cache", True):
+            self.adaptation_tool.set_cache(None)
+        # Per-task adaptations are stored as deltas against the meta-initialization
+        self.checkpoints = None
+        if self.config.get("checkpoint_dir"):
+            from ..core.checkpoint import CheckpointStore
+            self.checkpoints = CheckpointStore(self.config["checkpoint_dir"])
+        self.active_task: Optional[str] = None
+        self._tenants: Optional["TenantRegistry"] = None
+        self._agent = None
     
+    @property
+    def agent(self) -> "Agent":
+        """Underlying CrewAI agent, built on first use."""
+        if self._agent is None:
+            from crewai import Agent
+            from .llm_cache import build_llm
+            self._agent = Agent(
+                role="Test-Time Adaptation Specialist",
+                goal="Continuously optimize model performance during deployment through real-time adaptation",
+                backstory="""You are an expert in online learning and test-time adaptation. 
+                Your specialty is improving model performance in real-time as new data 
+                becomes available, without requiring retraining from scratch.""",
+                tools=[self.adaptation_tool],
+                llm=build_llm(self.config),
+                verbose=self.config.get("verbose", True),
+                allow_delegation=False,
+                max_iter=3
+            )
+        return self._agent
+
+    @traced(category="agent", measure_bytes=False)
     def create_optimization_task(self, 
                                current_performance: float,
                                target_performance: float,
-                               environment_data: Any) -> Task:
+                               environment_data: Any) -> "Task":
         """Create a real-time optimization task."""
+        from crewai import Task
         return Task(
             description=f"""
             Perform real-time adaptation to improve performance:
@@ -54,11 +78,131 @@ class AdaptationAgent:
             expected_output="Adapted model with improved performance metrics"
         )
     
-    def adapt_online(self, observations: Any, targets: Any) -> Dict[str, Any]:
-        """Perform online adaptation with new observations."""
-        # Implementation will interface with core adaptation components
+    def tool_kwargs(self, observations: Any, targets: Any,
+                    stream: Optional[Iterable[Tuple[Any, Any]]] = None) -> Dict[str, Any]:
+        """Arguments for ``AdaptationTool._run`` built from this agent's config."""
+        return {
+            "observations": observations,
+            "targets": targets,
+            "learning_rate": self.config.get("learning_rate", 0.01),
+            "adaptation_steps": self.config.get("adaptation_steps", 5),
+            "stream": stream,
+            "replay_capacity": self.config.get("replay_capacity", 1024),
+            "replay_batch_size": self.config.get("replay_batch_size", 32),
+            # Low-memory mode for constrained hosts; see AdaptationTool._run
+            "adaptation_mode": self.config.get("adaptation_mode", "full"),
+            "lora_rank": self.config.get("lora_rank", 4),
+            "memory_ceiling_mb": self.config.get("memory_ceiling_mb"),
+            "gradient_free": self.config.get("gradient_free", False),
+            # e.g. {"tolerance": 1e-3, "patience": 2}; see AdaptationTool._run
+            "early_stopping": self.config.get("early_stopping")
+        }
+
+    @traced(category="agent")
+    def adapt_online(self, observations: Any, targets: Any,
+                     stream: Optional[Iterable[Tuple[Any, Any]]] = None) -> Dict[str, Any]:
+        """Perform online adaptation with new observations.
+
+        Args:
+            observations: Latest observation batch (may be None with ``stream``)
+            targets: Targets matching ``observations``
+            stream: Optional iterator of further ``(observations, targets)``
+                mini-batches to adapt on incrementally
+        """
+        return self._summarize(
+            self.adaptation_tool._run(**self.tool_kwargs(observations, targets, stream))
+        )
+
+    async def aadapt_online(self, observations: Any, targets: Any,
+                            stream: Optional[Iterable[Tuple[Any, Any]]] = None) -> Dict[str, Any]:
+        """Async counterpart of :meth:`adapt_online`."""
+        return self._summarize(
+            await self.adaptation_tool._arun(**self.tool_kwargs(observations, targets, stream))
+        )
+
+    @traced(category="agent")
+    def save_task(self, task_id: Optional[str] = None) -> int:
+        """Checkpoint the current adapted parameters for ``task_id``.
+
+        Defaults to the active task. Returns the bytes written.
+        """
+        task_id = task_id or self.active_task
+        adapter = self.adaptation_tool.adapter
+        if self.checkpoints is None or adapter is None or task_id is None:
+            raise ValueError("saving needs config['checkpoint_dir'], an adapter and a task id")
+        return self.checkpoints.save_task(task_id, dict(adapter.model.named_parameters()))
+
+    @traced(category="agent")
+    def swap_task(self, task_id: str, reset_replay: bool = True) -> Dict[str, Any]:
+        """Hot-swap to ``task_id``'s adapted parameters without rebuilding the adapter.
+
+        Unknown tasks start from the meta-initialization. Only the task's
+        delta is read; the meta checkpoint is memory-mapped.
+        """
+        import time
+
+        if self.checkpoints is None:
+            raise ValueError("swapping tasks needs config['checkpoint_dir']")
+        start = time.perf_counter()
+        if task_id in self.checkpoints:
+            parameters, source = self.checkpoints.load_task(task_id), "task"
+        else:
+            parameters, source = self.checkpoints.meta_parameters(), "meta"
+            if parameters is None:
+                raise FileNotFoundError(f"no checkpoint for task {task_id!r} and no meta checkpoint")
+        self.adaptation_tool.swap_parameters(parameters, reset_replay=reset_replay)
+        self.active_task = task_id
+        return {"task_id": task_id, "source": source, "seconds": time.perf_counter() - start}
+
+    def tenant_registry(self) -> "TenantRegistry":
+        """Per-tenant delta registry over the current model, built on first use.
+
+        The shared base is the adapter's model, or the meta checkpoint when no
+        adapter exists yet. Configure with ``config["tenants"]`` (``rank``,
+        ``max_resident``, ``spill_dir``, ``capacity``).
+        """
+        if self._tenants is None:
+            from ..core.tenants import TenantRegistry
+
+            if self.adaptation_tool.adapter is None:
+                meta = self.checkpoints.meta_parameters() if self.checkpoints is not None else None
+                if meta is None:
+                    raise ValueError("a tenant registry needs an adapted model or a meta checkpoint")
+                self.adaptation_tool.swap_parameters(meta)
+            self._tenants = TenantRegistry(self.adaptation_tool.adapter.model,
+                                           **self.config.get("tenants", {}))
+        return self._tenants
+
+    @traced(category="agent")
+    def adapt_tenants(self, tenant_ids: Sequence[str], observations: Any,
+                      targets: Any) -> Dict[str, Dict[str, float]]:
+        """Adapt several tenants' deltas in one batched pass (row ``i`` is ``tenant_ids[i]``'s)."""
+        return self.tenant_registry().adapt(
+            tenant_ids, observations, targets,
+            steps=self.config.get("adaptation_steps", 5),
+            learning_rate=self.config.get("learning_rate", 0.01)
+        )
+
+    @traced(category="agent")
+    def predict_tenants(self, tenant_ids: Sequence[str], observations: Any) -> Any:
+        """Predictions for a mixed-tenant batch in one forward pass."""
+        return self.tenant_registry().forward(tenant_ids, observations)
+
+    def _summarize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if result["status"] != "success":
+            return {
+                "adapted_params": {},
+                "performance_improvement": 0.0,
+                "adaptation_steps": 0
+            }
+        adapter = self.adaptation_tool.adapter
         return {
-            "adapted_params": {},
-            "performance_improvement": 0.0,
-            "adaptation_steps": 0
-        }
\ No newline at end of file
+            "adapted_params": {
+                name: p.detach().clone() for name, p in adapter.model.named_parameters()
+            },
+            "performance_improvement": result["performance_metrics"]["improvement"],
+            "adaptation_steps": result["throughput"]["updates"],
+            "samples_per_second": result["throughput"]["samples_per_second"],
+            # None when the result was served from the cache
+            "update_latency_ms": (result["update_latency"] or {}).get("mean_ms")
+        }
@@ -0,0 +1,141 @@
+"""Environment Agent - Manages task/environment setup and rollout collection."""
+
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from ..core.tracing import traced
+from ..tools.environment_tool import EnvironmentTool
+
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+
+class EnvironmentAgent:
+    """Agent responsible for environments and experience collection.
+
+    This agent focuses on:
+    - Environment and task distribution setup
+    - Vectorized rollout collection
+    - Turning trajectories into modeling and meta-learning data
+    - Throughput monitoring (environment steps per second per core)
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        self.environment_tool = EnvironmentTool()
+        # Vector environments kept alive between collections (LRU)
+        self.environment_tool.set_runner_limit(self.config.get("max_runners", 4))
+        self._agent = None
+
+    def __enter__(self) -> "EnvironmentAgent":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the cached vector environments and their worker processes."""
+        self.environment_tool.close()
+
+    @property
+    def agent(self) -> "Agent":
+        """Underlying CrewAI agent, built on first use."""
+        if self._agent is None:
+            from crewai import Agent
+            from .llm_cache import build_llm
+            self._agent = Agent(
+                role="Environment and Task Manager",
+                goal="Provide diverse, high-throughput experience from environments and task distributions",
+                backstory="""You are an expert in reinforcement learning environments. You set
+                up task distributions, run many environments in parallel and turn raw
+                trajectories into data the modeling and meta-learning specialists can use.""",
+                tools=[self.environment_tool],
+                llm=build_llm(self.config),
+                verbose=self.config.get("verbose", True),
+                allow_delegation=False,
+                max_iter=3
+            )
+        return self._agent
+
+    @traced(category="agent", measure_bytes=False)
+    def create_environment_task(self, env_id: str, num_tasks: int) -> "Task":
+        """Create an experience collection task."""
+        from crewai import Task
+        return Task(
+            description=f"""
+            Collect experience for: {env_id}
+
+            Number of tasks: {num_tasks}
+
+            Your task:
+            1. Configure the environment and its task distribution
+            2. Collect batched trajectories from parallel environments
+            3. Prepare sequence data for state space modeling
+            4. Prepare support/query splits for meta-learning
+
+            Focus on collection throughput and task diversity.
+            """,
+            agent=self.agent,
+            expected_output="Batched trajectories with throughput metrics"
+        )
+
+    def tool_kwargs(self, env_id: Optional[str] = None,
+                    num_steps: Optional[int] = None) -> Dict[str, Any]:
+        """Arguments for ``EnvironmentTool._run`` built from this agent's config."""
+        return {
+            "env_id": env_id or self.config.get("env_id", "toy"),
+            "num_envs": self.config.get("num_envs", 8),
+            "num_steps": num_steps or self.config.get("num_steps", 128),
+            "vectorization": self.config.get("vectorization", "sync"),
+            "seed": self.config.get("seed", 0),
+            "env_kwargs": self.config.get("env_kwargs")
+        }
+
+    @traced(category="agent")
+    def collect_rollouts(self, env_id: Optional[str] = None,
+                         num_steps: Optional[int] = None) -> Dict[str, Any]:
+        """Collect batched trajectories from the vectorized environment."""
+        return self.environment_tool._run(**self.tool_kwargs(env_id, num_steps))
+
+    async def acollect_rollouts(self, env_id: Optional[str] = None,
+                                num_steps: Optional[int] = None) -> Dict[str, Any]:
+        """Async counterpart of :meth:`collect_rollouts`."""
+        return await self.environment_tool._arun(**self.tool_kwargs(env_id, num_steps))
+
+    @staticmethod
+    def ssm_kwargs(rollout: Dict[str, Any]) -> Dict[str, Any]:
+        """``SSMTool._run`` arguments for learning the environment dynamics.
+
+        Each sub-environment is one sequence in the batch: inputs are
+        ``[observation, action]`` and targets the next observation.
+        """
+        import torch
+
+        transitions = rollout["transitions"]
+        inputs = torch.cat([transitions["observations"], transitions["actions"]], dim=-1)
+        return {
+            "sequence_data": inputs,
+            "targets": transitions["next_observations"],
+            "input_dim": inputs.shape[-1],
+            "output_dim": transitions["next_observations"].shape[-1],
+            "prediction_steps": 0
+        }
+
+    @staticmethod
+    def meta_tasks(rollout: Dict[str, Any], support_fraction: float = 0.5) -> List[Dict[str, Any]]:
+        """``MAMLTool`` tasks, one per sub-environment (each has its own dynamics).
+
+        Valid transitions of every sub-environment are split in time into a
+        support prefix and a query suffix.
+        """
+        import torch
+
+        transitions = rollout["transitions"]
+        inputs = torch.cat([transitions["observations"], transitions["actions"]], dim=-1)
+        targets = transitions["next_observations"]
+        tasks = []
+        for x, y, valid in zip(inputs, targets, transitions["valid"]):
+            x, y = x[valid], y[valid]
+            split = int(len(x) * support_fraction)
+            if split == 0 or split == len(x):
+                continue
+            tasks.append({"support_x": x[:split], "support_y": y[:split],
+                          "query_x": x[split:], "query_y": y[split:]})
+        return tasks
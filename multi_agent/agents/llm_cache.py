@@ -0,0 +1,392 @@
+"""Persistent LLM response cache for the CrewAI-backed agents.
+
+Agents rebuild near-identical prompts on every run. :class:`CachedLLM` wraps
+the agents' LLM and stores responses in a SQLite :class:`LLMResponseCache`,
+keyed by a hash of the model and the *normalized* prompt, so volatile
+fields (timestamps, UUIDs, object addresses, indentation) do not defeat the
+cache. Identical prompts in flight at the same time are sent once.
+
+In ``"replay"`` mode the wrapped LLM is never called: recorded responses
+are served from the cache and misses are answered by a local
+:class:`StubLLM`, so a whole ``solve_task`` run is reproducible offline.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from ..core.tracing import Tracer, traced
+
+CACHE_MODES = ("record", "replay", "off")
+
+# (pattern, replacement) pairs applied before hashing a prompt
+VOLATILE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    (r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?", "<timestamp>"),
+    (r"\b\d{4}-\d{2}-\d{2}\b", "<date>"),
+    (r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b", "<uuid>"),
+    (r"\b0x[0-9a-fA-F]{6,}\b", "<address>"),
+    (r"\s+", " ")
+)
+
+
+def normalize_prompt(text: str,
+                     patterns: Iterable[Tuple[Union[str, Pattern], str]] = VOLATILE_FIELDS) -> str:
+    """Replace volatile fields in ``text`` so equivalent prompts compare equal."""
+    for pattern, replacement in patterns:
+        text = re.sub(pattern, replacement, text)
+    return text.strip()
+
+
+def _prompt_text(messages: Union[str, List[Dict[str, Any]]]) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(f"{message.get('role', 'user')}: {message.get('content', '')}"
+                     for message in messages)
+
+
+class LLMResponseCache:
+    """Content-addressed SQLite store of LLM responses.
+
+    Args:
+        path: SQLite database file (``":memory:"`` for a process-local cache)
+        ttl: Seconds after which an entry expires (``None`` keeps entries
+            until evicted for size)
+        max_entries: Entries kept; least recently used ones are evicted
+            beyond it (``None`` for unbounded)
+    """
+
+    def __init__(self, path: str = ":memory:", ttl: Optional[float] = None,
+                 max_entries: Optional[int] = 10000):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, prompt TEXT, response TEXT,"
+                " created REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+            )
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, prompt: str, **params: Any) -> str:
+        """Cache key of a normalized prompt sent to ``model`` with ``params``."""
+        payload = json.dumps([model, prompt, params], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Recorded response for ``key``, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                with self._connection:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key)
+                )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = "", prompt: str = "") -> None:
+        """Record ``response``, then evict expired and least recently used entries."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, prompt, response, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)", (key, model, prompt, response, now, now)
+            )
+            if self.ttl is not None:
+                self.expired += self._connection.execute(
+                    "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+                ).rowcount
+            if self.max_entries is not None:
+                self.evictions += self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                ).rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss/expiry/eviction counters and the number of entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self)
+        }
+
+
+class StubLLM(BaseLLM):
+    """Deterministic local LLM for offline runs and tests.
+
+    Every call immediately returns a final answer derived from a hash of
+    the prompt, in the ReAct format CrewAI agents parse.
+    """
+
+    model: str = "stub"
+
+    def call(self, messages: Any, tools: Any = None, callbacks: Any = None,
+             available_functions: Any = None, from_task: Any = None,
+             from_agent: Any = None, response_model: Any = None) -> str:
+        prompt = normalize_prompt(_prompt_text(messages))
+        digest = hashlib.blake2b(prompt.encode(), digest_size=4).hexdigest()
+        return ("Thought: I now know the final answer\n"
+                f"Final Answer: offline stub response {digest}")
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+class CachedLLM(BaseLLM):
+    """LLM wrapper that serves repeated prompts from an :class:`LLMResponseCache`.
+
+    Attributes:
+        model: Model name the cache is keyed on; defaults to ``llm.model``,
+            so a replay run only needs the name, not a live client
+        llm: Wrapped LLM (a CrewAI ``BaseLLM``); only called on misses in
+            ``"record"`` mode
+        mode: ``"record"`` (read-through cache), ``"replay"`` (cache or
+            ``fallback``, never ``llm``) or ``"off"`` (always call ``llm``)
+        fallback: LLM answering replay misses; defaults to :class:`StubLLM`
+        strict: In replay mode, raise ``LookupError`` on a miss instead
+    """
+
+    model: str = "cached"
+    llm: Optional[BaseLLM] = None
+    mode: str = "record"
+    fallback: Optional[BaseLLM] = None
+    strict: bool = False
+    _cache: Any = PrivateAttr(default=None)
+    _in_flight: Dict[str, threading.Event] = PrivateAttr(default_factory=dict)
+    _in_flight_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _counters: Dict[str, int] = PrivateAttr(
+        default_factory=lambda: {"llm_calls": 0, "deduplicated": 0, "replay_misses": 0}
+    )
+
+    def __init__(self, cache: Optional[LLMResponseCache] = None, **data: Any):
+        llm = data.get("llm")
+        data.setdefault("model", llm.model if llm is not None else "cached")
+        super().__init__(**data)
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"mode must be one of {CACHE_MODES}, got {self.mode!r}")
+        if self.llm is None and self.mode != "replay":
+            raise ValueError(f"mode {self.mode!r} needs an llm to wrap")
+        self._cache = cache if cache is not None else LLMResponseCache()
+        if self.fallback is None:
+            self.fallback = StubLLM(model="stub")
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        return self._cache
+
+    def _key(self, messages: Any, tools: Any) -> Tuple[str, str]:
+        prompt = normalize_prompt(_prompt_text(messages))
+        tool_names = sorted(str(tool.get("function", tool).get("name", ""))
+                            for tool in tools or [] if isinstance(tool, dict))
+        key = LLMResponseCache.key(self.model, prompt, stop=self.stop_sequences,
+                                   tools=tool_names)
+        return key, prompt
+
+    @traced("CachedLLM.call", category="llm_cache", measure_bytes=False)
+    def call(self, messages: Any, tools: Any = None, callbacks: Any = None,
+             available_functions: Any = None, from_task: Any = None,
+             from_agent: Any = None, response_model: Any = None) -> Any:
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        if self.mode == "off":
+            self._counters["llm_calls"] += 1
+            return self.llm.call(messages, **kwargs)
+
+        key, prompt = self._key(messages, tools)
+        while True:
+            response = self._cache.get(key)
+            if response is not None:
+                return response
+            if self.mode == "replay":
+                if self.strict:
+                    raise LookupError(f"no recorded response for prompt {prompt[:80]!r}")
+                self._counters["replay_misses"] += 1
+                return self.fallback.call(messages, **kwargs)
+
+            # Single-flight: the first caller computes, identical callers wait
+            with self._in_flight_lock:
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self._in_flight[key] = threading.Event()
+            if pending is not None:
+                self._counters["deduplicated"] += 1
+                pending.wait()
+                continue
+            try:
+                self._counters["llm_calls"] += 1
+                response = self.llm.call(messages, **kwargs)
+                if isinstance(response, str):
+                    self._cache.put(key, response, self.model, prompt)
+                return response
+            finally:
+                with self._in_flight_lock:
+                    self._in_flight.pop(key).set()
+
+    def supports_function_calling(self) -> bool:
+        # Cached responses are plain text, so agents use the ReAct text protocol
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words() if self.llm is not None else True
+
+    def get_context_window_size(self) -> int:
+        inner = self.llm if self.llm is not None else self.fallback
+        return inner.get_context_window_size()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Cache counters plus wrapped-LLM calls, deduplicated prompts and replay misses."""
+        return dict(self._cache.metrics(), **self._counters)
+
+
+_caches: Dict[str, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def build_llm(config: Dict[str, Any]) -> Optional[BaseLLM]:
+    """LLM for an agent built from its config, or None for CrewAI's default.
+
+    ``config["llm"]`` is a ``BaseLLM`` or a model name; ``config["llm_cache"]``
+    (``path``, ``ttl``, ``max_entries``, ``mode``, ``strict``) wraps it in a
+    :class:`CachedLLM`. Agents configured with the same ``path`` share one
+    cache connection.
+    """
+    llm = config.get("llm")
+    settings = config.get("llm_cache")
+    if settings is None or settings.get("mode") != "replay":
+        if isinstance(llm, str):
+            from crewai import LLM
+            llm = LLM(model=llm)
+        if settings is None:
+            return llm
+    settings = dict(settings)
+    if isinstance(llm, str):
+        # Replay never calls the model, so only its name is needed
+        settings.setdefault("model", llm)
+        llm = None
+    path = settings.pop("path", ":memory:")
+    ttl, max_entries = settings.pop("ttl", None), settings.pop("max_entries", 10000)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None or cache.ttl != ttl or cache.max_entries != max_entries:
+            cache = _caches[path] = LLMResponseCache(path, ttl, max_entries)
+    return CachedLLM(cache=cache, llm=llm, **settings)
+
+
+class _LLMCallSpans:
+    """Turns CrewAI ``LLMCall*`` events into spans; shared by overlapping runs."""
+
+    def __init__(self):
+        self.users = 0
+        self.started: Dict[str, float] = {}
+        self.tracers: Dict[int, Tracer] = {}
+        self.lock = threading.Lock()
+
+    def on_started(self, source: Any, event: Any) -> None:
+        with self.lock:
+            self.started[event.call_id] = event.timestamp.timestamp()
+
+    def on_finished(self, source: Any, event: Any) -> None:
+        from crewai.events import LLMCallFailedEvent
+
+        with self.lock:
+            start = self.started.pop(event.call_id, None)
+            tracers = list(self.tracers.values())
+        if start is None:
+            return
+        for tracer in tracers:
+            tracer.record_interval(f"LLM.call[{event.model or 'llm'}]", "llm", start,
+                                   event.timestamp.timestamp(), agent=event.agent_role or "",
+                                   failed=isinstance(event, LLMCallFailedEvent))
+
+    def handlers(self) -> List[Tuple[type, Any]]:
+        from crewai.events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+        return [(LLMCallStartedEvent, self.on_started), (LLMCallCompletedEvent, self.on_finished),
+                (LLMCallFailedEvent, self.on_finished)]
+
+
+_llm_call_spans = _LLMCallSpans()
+
+
+@contextmanager
+def trace_llm_calls(tracer: Tracer) -> Iterator[None]:
+    """Record every CrewAI LLM call made inside the block as an ``llm`` span.
+
+    Spans are built from the ``LLMCall*`` events that CrewAI's LLM clients
+    emit, so they cover any provider; calls answered by a
+    :class:`CachedLLM` are recorded separately as ``llm_cache`` spans.
+    Overlapping blocks share one set of event handlers, so each call is
+    recorded once per tracer. Nothing is registered while ``tracer`` is
+    disabled.
+    """
+    if not tracer.enabled:
+        yield
+        return
+    from crewai.events import crewai_event_bus
+
+    state = _llm_call_spans
+    with state.lock:
+        state.users += 1
+        state.tracers[id(tracer)] = tracer
+        if state.users == 1:
+            for event_type, handler in state.handlers():
+                crewai_event_bus.on(event_type)(handler)
+    try:
+        yield
+    finally:
+        # Handlers run on the bus' worker threads; wait for pending ones
+        crewai_event_bus.flush()
+        with state.lock:
+            state.users -= 1
+            if state.users == 0:
+                for event_type, handler in state.handlers():
+                    crewai_event_bus.off(event_type, handler)
+                state.tracers.clear()
+                state.started.clear()
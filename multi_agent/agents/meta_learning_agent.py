@@ -1,9 +1,13 @@
 """Meta-Learning Agent - Specializes in fast adaptation strategies."""
 
-from typing import List, Dict, Any, Optional
-from crewai import Agent, Task
+from typing import Callable, List, Dict, Any, Optional, TYPE_CHECKING
+from ..core.tracing import traced
 from ..tools.maml_tool import MAMLTool
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+    from ..core.task_sampler import TaskSampler
+
 class MetaLearningAgent:
     """Agent specialized in meta-learning and fast adaptation.
     
@@ -17,24 +21,42 @@ class MetaLearningAgent:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.maml_tool = MAMLTool()
-        
-        self.agent = Agent(
-            role="Meta-Learning Specialist",
-            goal="Discover optimal initialization strategies for fast adaptation across diverse tasks",
-            backstory="""You are an expert in Model-Agnostic Meta-Learning (MAML) with deep 
-            understanding of gradient-based optimization. Your expertise lies in finding 
-            optimal model initialization that enables rapid adaptation to new tasks with 
-            minimal training data.""",
-            tools=[self.maml_tool],
-            verbose=True,
-            allow_delegation=False,
-            max_iter=5
-        )
+        if not self.config.get("cache", True):
+            self.maml_tool.set_cache(None)
+        # Meta-initializations persist in config["checkpoint_dir"] and warm-start later runs
+        self.checkpoints = None
+        if self.config.get("checkpoint_dir"):
+            from ..core.checkpoint import CheckpointStore
+            self.checkpoints = CheckpointStore(self.config["checkpoint_dir"])
+        self._agent = None
     
+    @property
+    def agent(self) -> "Agent":
+        """Underlying CrewAI agent, built on first use."""
+        if self._agent is None:
+            from crewai import Agent
+            from .llm_cache import build_llm
+            self._agent = Agent(
+                role="Meta-Learning Specialist",
+                goal="Discover optimal initialization strategies for fast adaptation across diverse tasks",
+                backstory="""You are an expert in Model-Agnostic Meta-Learning (MAML) with deep 
+                understanding of gradient-based optimization. Your expertise lies in finding 
+                optimal model initialization that enables rapid adaptation to new tasks with 
+                minimal training data.""",
+                tools=[self.maml_tool],
+                llm=build_llm(self.config),
+                verbose=self.config.get("verbose", True),
+                allow_delegation=False,
+                max_iter=5
+            )
+        return self._agent
+
+    @traced(category="agent", measure_bytes=False)
     def create_adaptation_task(self, task_description: str, 
                              support_data: Any, 
-                             query_data: Any) -> Task:
+                             query_data: Any) -> "Task":
         """Create a meta-learning adaptation task."""
+        from crewai import Task
         return Task(
             description=f"""
             Perform meta-learning adaptation for: {task_description}
@@ -51,11 +73,92 @@ class MetaLearningAgent:
             expected_output="Adapted model parameters and performance metrics"
         )
     
+    def tool_kwargs(self, tasks: Optional[List[Dict]]) -> Dict[str, Any]:
+        """Arguments for ``MAMLTool._run`` built from this agent's config."""
+        return {
+            "tasks": tasks,
+            "inner_lr": self.config.get("inner_lr", 0.01),
+            "outer_lr": self.config.get("outer_lr", 0.001),
+            "adaptation_steps": self.config.get("adaptation_steps", 5),
+            "meta_iterations": self.config.get("meta_iterations", 1),
+            "mode": self.config.get("mode", "maml"),
+            "reptile_step": self.config.get("reptile_step", 0.5),
+            "initial_parameters": (self.checkpoints.meta_parameters()
+                                   if self.checkpoints is not None
+                                   and self.config.get("resume", True) else None),
+            # e.g. {"world_size": 4, "straggler_timeout": 30.0}; see MAMLTool._run
+            "distributed": self.config.get("distributed"),
+            # e.g. {"tolerance": 1e-3, "patience": 2}; see MAMLTool._run
+            "early_stopping": self.config.get("early_stopping")
+        }
+
+    @traced(category="agent")
+    def save_checkpoint(self, result: Dict[str, Any]) -> Optional[str]:
+        """Persist a successful ``MAMLTool`` result as the meta-initialization.
+
+        Returns:
+            The checkpoint id, or None without ``config["checkpoint_dir"]``
+        """
+        if self.checkpoints is None or result.get("status") != "success":
+            return None
+        return self.checkpoints.save_meta(result["optimized_parameters"],
+                                          {"mode": result["mode"]})
+
+    @traced(category="agent")
     def optimize_initialization(self, tasks: List[Dict]) -> Dict[str, Any]:
         """Optimize model initialization across multiple tasks."""
-        # Implementation will interface with core SSM-MetaRL components
+        result = self.maml_tool._run(**self.tool_kwargs(tasks))
+        self.save_checkpoint(result)
+        return self._summarize(result)
+
+    async def aoptimize_initialization(self, tasks: List[Dict]) -> Dict[str, Any]:
+        """Async counterpart of :meth:`optimize_initialization`."""
+        result = await self.maml_tool._arun(**self.tool_kwargs(tasks))
+        self.save_checkpoint(result)
+        return self._summarize(result)
+
+    def make_sampler(self, distribution: Callable[..., Dict[str, Any]]) -> "TaskSampler":
+        """Prefetching sampler over ``distribution`` configured from this agent's config.
+
+        Reads ``meta_batch_size`` (16), ``seed`` (0), ``prefetch`` (2) and
+        ``sampler_workers`` (1).
+        """
+        from ..core.task_sampler import TaskSampler
+        return TaskSampler(distribution,
+                           meta_batch_size=self.config.get("meta_batch_size", 16),
+                           seed=self.config.get("seed", 0),
+                           prefetch=self.config.get("prefetch", 2),
+                           num_workers=self.config.get("sampler_workers", 1))
+
+    @traced(category="agent")
+    def optimize_on_distribution(self, distribution: Callable[..., Dict[str, Any]]
+                                 ) -> Dict[str, Any]:
+        """Meta-train on fresh meta-batches drawn from ``distribution`` every iteration.
+
+        Returns:
+            The :meth:`optimize_initialization` summary plus the sampler's
+            stall metrics under ``"sampler"``
+        """
+        with self.make_sampler(distribution) as sampler:
+            sampler.warm_up()
+            result = self.maml_tool._run(**dict(self.tool_kwargs(None), task_sampler=sampler))
+        self.save_checkpoint(result)
+        summary = self._summarize(result)
+        summary["sampler"] = sampler.metrics()
+        return summary
+
+    @staticmethod
+    def _summarize(result: Dict[str, Any]) -> Dict[str, Any]:
+        if result["status"] != "success":
+            return {
+                "optimized_params": {},
+                "adaptation_speed": 0.0,
+                "cross_task_performance": 0.0
+            }
+        curve = result["adaptation_performance"]
         return {
-            "optimized_params": {},
-            "adaptation_speed": 0.0,
-            "cross_task_performance": 0.0
-        }
\ No newline at end of file
+            "optimized_params": result["optimized_parameters"],
+            # Mean query-loss reduction per inner gradient step
+            "adaptation_speed": (curve[0] - curve[-1]) / max(len(curve) - 1, 1),
+            "cross_task_performance": result["tasks_improved"]
+        }
@@ -1,9 +1,13 @@
 """State Modeling Agent - Specializes in temporal dynamics capture."""
 
-from typing import Dict, Any, Optional, Tuple
-from crewai import Agent, Task
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
+from ..core.tracing import traced
 from ..tools.ssm_tool import SSMTool
 
+if TYPE_CHECKING:
+    from crewai import Agent, Task
+    from ..core.serving import SSMInferenceServer
+
 class StateModelingAgent:
     """Agent specialized in state space modeling and temporal dynamics.
     
@@ -17,24 +21,37 @@ class StateModelingAgent:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.ssm_tool = SSMTool()
-        
-        self.agent = Agent(
-            role="State Space Modeling Expert",
-            goal="Capture complex temporal dynamics and long-term dependencies in sequential data",
-            backstory="""You are a specialist in State Space Models (SSMs) with expertise 
-            in modeling temporal dynamics and sequential patterns. Your strength lies in 
-            capturing long-term dependencies efficiently and understanding how states 
-            evolve over time.""",
-            tools=[self.ssm_tool],
-            verbose=True,
-            allow_delegation=False,
-            max_iter=4
-        )
+        if not self.config.get("cache", True):
+            self.ssm_tool.set_cache(None)
+        self._agent = None
     
+    @property
+    def agent(self) -> "Agent":
+        """Underlying CrewAI agent, built on first use."""
+        if self._agent is None:
+            from crewai import Agent
+            from .llm_cache import build_llm
+            self._agent = Agent(
+                role="State Space Modeling Expert",
+                goal="Capture complex temporal dynamics and long-term dependencies in sequential data",
+                backstory="""You are a specialist in State Space Models (SSMs) with expertise 
+                in modeling temporal dynamics and sequential patterns. Your strength lies in 
+                capturing long-term dependencies efficiently and understanding how states 
+                evolve over time.""",
+                tools=[self.ssm_tool],
+                llm=build_llm(self.config),
+                verbose=self.config.get("verbose", True),
+                allow_delegation=False,
+                max_iter=4
+            )
+        return self._agent
+
+    @traced(category="agent", measure_bytes=False)
     def create_modeling_task(self, 
                            sequence_data: Any,
-                           prediction_horizon: int) -> Task:
+                           prediction_horizon: int) -> "Task":
         """Create a state space modeling task."""
+        from crewai import Task
         return Task(
             description=f"""
             Model temporal dynamics for sequence prediction:
@@ -53,13 +70,88 @@ class StateModelingAgent:
             expected_output="Trained SSM with sequence predictions and analysis"
         )
     
+    def tool_kwargs(self, sequence: Any, state_dim: Optional[int] = None) -> Dict[str, Any]:
+        """Arguments for ``SSMTool._run`` built from this agent's config.
+
+        ``sequence`` may be shaped ``(length,)`` (univariate),
+        ``(length, dim)`` or ``(batch, length, dim)``.
+        """
+        from ..core.utils import to_tensor
+
+        sequence = to_tensor(sequence)
+        if sequence.dim() == 1:
+            sequence = sequence.unsqueeze(-1)
+        return {
+            "sequence_data": sequence,
+            "state_dim": state_dim or self.config.get("state_dim", 64),
+            "input_dim": sequence.shape[-1],
+            "prediction_steps": self.config.get("prediction_steps", 10),
+            "train_epochs": self.config.get("train_epochs", 1),
+            "learning_rate": self.config.get("learning_rate", 1e-2),
+            "chunk_size": self.config.get("chunk_size", 1024),
+            "return_hidden_states": self.config.get("return_hidden_states", False),
+            "precision": self.config.get("precision", "fp32"),
+            "precision_report": self.config.get("precision_report", False)
+        }
+
+    @traced(category="agent")
     def model_dynamics(self, 
                       sequence: Any, 
                       state_dim: int) -> Tuple[Any, Dict[str, float]]:
-        """Model temporal dynamics of input sequence."""
-        # Implementation will interface with core SSM components
-        return None, {
-            "modeling_accuracy": 0.0,
-            "long_term_stability": 0.0,
-            "computational_efficiency": 0.0
-        }
\ No newline at end of file
+        """Model temporal dynamics of input sequence.
+
+        Returns:
+            Tuple of next-step predictions and modeling metrics
+        """
+        return self._summarize(self.ssm_tool._run(**self.tool_kwargs(sequence, state_dim)))
+
+    async def amodel_dynamics(self,
+                              sequence: Any,
+                              state_dim: int) -> Tuple[Any, Dict[str, float]]:
+        """Async counterpart of :meth:`model_dynamics`."""
+        return self._summarize(await self.ssm_tool._arun(**self.tool_kwargs(sequence, state_dim)))
+
+    @traced(category="agent")
+    def update_stream(self, session_id: Any, observations: Any) -> Tuple[Any, Dict[str, float]]:
+        """Append ``observations`` to a live stream and forecast from its carried state.
+
+        The first call for ``session_id`` fits the model on ``observations``
+        as the stream's history; later calls process only the new steps.
+        """
+        kwargs = dict(self.tool_kwargs(observations), session_id=session_id,
+                      return_hidden_states=False)
+        return self._summarize(self.ssm_tool._run(**kwargs))
+
+    @traced(category="agent")
+    def inference_server(self, sequence: Any,
+                         state_dim: Optional[int] = None) -> "SSMInferenceServer":
+        """Fit the SSM on ``sequence`` and return a started micro-batching server.
+
+        Streams opened on the server start from a zero state unless
+        ``open_stream`` is given one. Batch size
+        and deadline come from ``config["serving"]`` (``max_batch_size``,
+        ``max_wait_ms``, ``capacity``).
+        """
+        from ..core.serving import SSMInferenceServer
+
+        kwargs = dict(self.tool_kwargs(sequence, state_dim), return_model=True,
+                      return_hidden_states=False)
+        result = self.ssm_tool._run(**kwargs)
+        if result["status"] != "success":
+            raise RuntimeError(f"SSM fitting failed: {result['error_message']}")
+        server = SSMInferenceServer(result["model"], **self.config.get("serving", {}))
+        return server.start()
+
+    @staticmethod
+    def _summarize(result: Dict[str, Any]) -> Tuple[Any, Dict[str, float]]:
+        if result["status"] != "success":
+            return None, {
+                "modeling_accuracy": 0.0,
+                "long_term_stability": 0.0,
+                "steps_per_second": 0.0
+            }
+        return result["predictions"], {
+            "modeling_accuracy": result["modeling_accuracy"],
+            "long_term_stability": result["long_term_stability"],
+            "steps_per_second": result["steps_per_second"]
+        }
@@ -0,0 +1,35 @@
+"""Inter-agent communication - message broker and shared-memory data exchange."""
+
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+__getattr__, __dir__ = attach(__name__, {
+    "MessageBroker": ".message_broker",
+    "Message": ".message_broker",
+    "Subscription": ".message_broker",
+    "LocalTransport": ".message_broker",
+    "ConnectionTransport": ".message_broker",
+    "SharedTensorStore": ".shared_memory",
+    "TensorHandle": ".shared_memory"
+})
+
+if TYPE_CHECKING:
+    from .message_broker import (
+        ConnectionTransport,
+        LocalTransport,
+        Message,
+        MessageBroker,
+        Subscription
+    )
+    from .shared_memory import SharedTensorStore, TensorHandle
+
+__all__ = [
+    "MessageBroker",
+    "Message",
+    "Subscription",
+    "LocalTransport",
+    "ConnectionTransport",
+    "SharedTensorStore",
+    "TensorHandle"
+]
@@ -0,0 +1,396 @@
+"""Topic-based publish/subscribe broker for messages between agents.
+
+Subscribers own bounded queues; when a queue is full the subscription's
+overflow policy decides whether the publisher blocks (backpressure) or a
+message is dropped. High-frequency updates (e.g. adaptation gradients) can
+be coalesced: a new message whose key matches one still queued is merged
+into it instead of growing the queue. Delivery goes through a pluggable
+:class:`Transport`; the default delivers in-process, and
+:class:`ConnectionTransport` carries batches over a pipe or local socket
+between processes.
+"""
+
+import fnmatch
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+@dataclass
+class Message:
+    """A payload published on a topic.
+
+    Attributes:
+        topic: Dot-separated topic name (e.g. ``"adaptation.gradients"``)
+        payload: Message body; must match the topic's registered type
+        sender: Name of the publishing agent
+        timestamp: ``time.time()`` at publish, used for delivery latency
+        sequence: Per-broker publish counter
+        merged: Number of later messages coalesced into this one
+    """
+
+    topic: str
+    payload: Any
+    sender: str = ""
+    timestamp: float = field(default_factory=time.time)
+    sequence: int = 0
+    merged: int = 0
+
+
+class Transport:
+    """Moves batches of published messages to the broker(s) that deliver them."""
+
+    def attach(self, deliver: Callable[[List[Message]], None]) -> None:
+        """Register the local broker's delivery callback for incoming batches."""
+        self._deliver = deliver
+
+    def send(self, messages: List[Message]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LocalTransport(Transport):
+    """In-process transport: published batches are delivered immediately."""
+
+    def send(self, messages: List[Message]) -> None:
+        self._deliver(messages)
+
+
+class ConnectionTransport(Transport):
+    """Transport over a ``multiprocessing.connection.Connection``.
+
+    Each published batch is pickled once and sent to the peer; a background
+    thread delivers batches received from the peer to the local broker.
+    Build a connected pair with :meth:`pair` or connect over a local socket
+    with :meth:`listen`/:meth:`connect`.
+    """
+
+    def __init__(self, connection: Any):
+        self._connection = connection
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def pair(cls) -> Tuple["ConnectionTransport", "ConnectionTransport"]:
+        from multiprocessing import Pipe
+        left, right = Pipe(duplex=True)
+        return cls(left), cls(right)
+
+    @classmethod
+    def listen(cls, address: Any, authkey: Optional[bytes] = None) -> "ConnectionTransport":
+        """Accept one peer on ``address`` (e.g. ``("localhost", 0)`` or a socket path)."""
+        from multiprocessing.connection import Listener
+        with Listener(address, authkey=authkey) as listener:
+            return cls(listener.accept())
+
+    @classmethod
+    def connect(cls, address: Any, authkey: Optional[bytes] = None) -> "ConnectionTransport":
+        from multiprocessing.connection import Client
+        return cls(Client(address, authkey=authkey))
+
+    def attach(self, deliver: Callable[[List[Message]], None]) -> None:
+        super().attach(deliver)
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                messages = self._connection.recv()
+            except (EOFError, OSError):
+                return
+            self._deliver(messages)
+
+    def send(self, messages: List[Message]) -> None:
+        with self._send_lock:
+            self._connection.send(messages)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class Subscription:
+    """Bounded queue of messages for one subscriber.
+
+    Args:
+        pattern: Topic name or ``fnmatch`` pattern (e.g. ``"adaptation.*"``)
+        maxsize: Queue capacity
+        overflow: ``"block"`` (publisher waits), ``"drop_oldest"`` or
+            ``"drop_newest"``
+        coalesce_key: Maps a message to a key; a queued message with the
+            same key absorbs the new one via ``merge``
+        merge: Combines ``(queued_payload, new_payload)``; defaults to
+            keeping the newest payload
+        latency_window: Number of recent delivery latencies kept
+    """
+
+    def __init__(self,
+                 pattern: str,
+                 maxsize: int = 1024,
+                 overflow: str = "block",
+                 coalesce_key: Optional[Callable[[Message], Hashable]] = None,
+                 merge: Optional[Callable[[Any, Any], Any]] = None,
+                 latency_window: int = 1024):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.pattern = pattern
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.coalesce_key = coalesce_key
+        self.merge = merge or (lambda old, new: new)
+        self._queue: Deque[Message] = deque()
+        self._pending: Dict[Hashable, Message] = {}
+        self._condition = threading.Condition()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.closed = False
+
+    def matches(self, topic: str) -> bool:
+        return topic == self.pattern or fnmatch.fnmatchcase(topic, self.pattern)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _offer(self, message: Message, timeout: Optional[float]) -> bool:
+        with self._condition:
+            if self.coalesce_key is not None:
+                key = self.coalesce_key(message)
+                queued = self._pending.get(key)
+                if queued is not None:
+                    queued.payload = self.merge(queued.payload, message.payload)
+                    queued.merged += 1 + message.merged
+                    self.coalesced += 1
+                    return True
+            if len(self._queue) >= self.maxsize:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._forget(self._queue.popleft())
+                    self.dropped += 1
+                elif not self._condition.wait_for(
+                        lambda: len(self._queue) < self.maxsize or self.closed, timeout):
+                    self.dropped += 1
+                    return False
+            if self.closed:
+                return False
+            self._queue.append(message)
+            if self.coalesce_key is not None:
+                self._pending[self.coalesce_key(message)] = message
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify_all()
+            return True
+
+    def _forget(self, message: Message) -> None:
+        if self.coalesce_key is not None:
+            key = self.coalesce_key(message)
+            if self._pending.get(key) is message:
+                del self._pending[key]
+
+    def _take(self) -> Message:
+        message = self._queue.popleft()
+        self._forget(message)
+        self._latencies.append(time.time() - message.timestamp)
+        self.delivered += 1
+        return message
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Next message, waiting up to ``timeout`` seconds (None waits forever)."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._queue or self.closed, timeout):
+                return None
+            if not self._queue:
+                return None
+            message = self._take()
+            self._condition.notify_all()
+            return message
+
+    def get_batch(self, max_items: int = 64, timeout: Optional[float] = 0.0) -> List[Message]:
+        """Up to ``max_items`` queued messages; waits up to ``timeout`` for the first."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._queue or self.closed, timeout)
+            batch = [self._take() for _ in range(min(max_items, len(self._queue)))]
+            if batch:
+                self._condition.notify_all()
+            return batch
+
+    def drain(self) -> List[Message]:
+        """Every queued message, without waiting."""
+        return self.get_batch(max_items=self.maxsize, timeout=0.0)
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Publish-to-consume latency in milliseconds over the recent window."""
+        if not self._latencies:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        window = sorted(self._latencies)
+        last = len(window) - 1
+        return {
+            "mean_ms": sum(window) / len(window) * 1000.0,
+            "p50_ms": window[round(0.5 * last)] * 1000.0,
+            "p99_ms": window[round(0.99 * last)] * 1000.0
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pattern": self.pattern,
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "latency": self.latency_stats()
+        }
+
+
+class MessageBroker:
+    """Routes published messages to subscriptions by topic.
+
+    Publishers may batch: :meth:`publish` buffers up to ``max_batch``
+    messages (flushed when full, after ``flush_interval`` seconds or on
+    :meth:`flush`), and :meth:`publish_many` sends a batch at once. Each
+    batch crosses the transport as a single unit.
+
+    Args:
+        transport: Delivery path; defaults to :class:`LocalTransport`
+        max_batch: Messages buffered by :meth:`publish` before sending
+        flush_interval: Maximum age in seconds of a buffered batch, checked
+            on every publish
+        publish_timeout: How long a publisher blocks on a full ``"block"``
+            subscription before the message is dropped (None waits forever)
+    """
+
+    def __init__(self,
+                 transport: Optional[Transport] = None,
+                 max_batch: int = 1,
+                 flush_interval: float = 0.01,
+                 publish_timeout: Optional[float] = 1.0):
+        self.transport = transport or LocalTransport()
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.publish_timeout = publish_timeout
+        self._subscriptions: List[Subscription] = []
+        self._topic_types: Dict[str, type] = {}
+        self._outgoing: List[Message] = []
+        self._outgoing_since = 0.0
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.published = 0
+        self.batches_sent = 0
+        self.unrouted = 0
+        self.transport.attach(self._deliver)
+
+    def register_topic(self, topic: str, payload_type: type) -> None:
+        """Require payloads published on ``topic`` to be ``payload_type`` instances."""
+        self._topic_types[topic] = payload_type
+
+    def subscribe(self, pattern: str, **kwargs: Any) -> Subscription:
+        """Subscribe to a topic or pattern; see :class:`Subscription` for options."""
+        subscription = Subscription(pattern, **kwargs)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+        subscription.close()
+
+    def _message(self, topic: str, payload: Any, sender: str) -> Message:
+        payload_type = self._topic_types.get(topic)
+        if payload_type is not None and not isinstance(payload, payload_type):
+            raise TypeError(f"topic {topic!r} expects {payload_type.__name__} payloads, "
+                            f"got {type(payload).__name__}")
+        return Message(topic, payload, sender, sequence=next(self._sequence))
+
+    def publish(self, topic: str, payload: Any, sender: str = "") -> None:
+        """Publish one message (buffered when ``max_batch > 1``)."""
+        message = self._message(topic, payload, sender)
+        with self._lock:
+            self.published += 1
+            if not self._outgoing:
+                self._outgoing_since = time.monotonic()
+            self._outgoing.append(message)
+            if (len(self._outgoing) < self.max_batch
+                    and time.monotonic() - self._outgoing_since < self.flush_interval):
+                return
+            batch, self._outgoing = self._outgoing, []
+        self._send(batch)
+
+    def publish_many(self, topic: str, payloads: List[Any], sender: str = "") -> None:
+        """Publish several messages on one topic as a single batch."""
+        batch = [self._message(topic, payload, sender) for payload in payloads]
+        with self._lock:
+            self.published += len(batch)
+            batch, self._outgoing = self._outgoing + batch, []
+        self._send(batch)
+
+    def flush(self) -> None:
+        """Send any buffered messages now."""
+        with self._lock:
+            batch, self._outgoing = self._outgoing, []
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch: List[Message]) -> None:
+        self.batches_sent += 1
+        self.transport.send(batch)
+
+    def _deliver(self, messages: List[Message]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for message in messages:
+            targets = [s for s in subscriptions if s.matches(message.topic)]
+            if not targets:
+                self.unrouted += 1
+            for subscription in targets:
+                subscription._offer(message, self.publish_timeout)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close()
+        self.transport.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Broker-wide counters plus per-subscription queue and latency metrics."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            buffered = len(self._outgoing)
+        per_subscription = [subscription.metrics() for subscription in subscriptions]
+        latencies = [m["latency"] for m in per_subscription if m["delivered"]]
+        return {
+            "published": self.published,
+            "batches_sent": self.batches_sent,
+            "buffered": buffered,
+            "unrouted": self.unrouted,
+            "delivered": sum(m["delivered"] for m in per_subscription),
+            "dropped": sum(m["dropped"] for m in per_subscription),
+            "coalesced": sum(m["coalesced"] for m in per_subscription),
+            "queue_depth": sum(m["depth"] for m in per_subscription),
+            "max_queue_depth": max((m["max_depth"] for m in per_subscription), default=0),
+            "mean_latency_ms": (sum(l["mean_ms"] for l in latencies) / len(latencies)
+                                if latencies else 0.0),
+            "p99_latency_ms": max((l["p99_ms"] for l in latencies), default=0.0),
+            "subscriptions": per_subscription
+        }
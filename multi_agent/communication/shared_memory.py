@@ -0,0 +1,175 @@
+"""Shared-memory tensor store for zero-copy data exchange between agents.
+
+Large arrays (rollouts, hidden states, parameter snapshots) are written once
+into memory-mapped files, on ``/dev/shm`` where available, and passed around
+as small picklable :class:`TensorHandle` objects. Any process that loads a
+handle maps the same pages instead of receiving a pickled copy.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import torch
+
+# torch dtypes without a NumPy equivalent are stored as same-width integers
+_STORAGE_DTYPES = {torch.bfloat16: torch.int16}
+
+
+class TensorHandle(NamedTuple):
+    """Reference to a tensor published in a :class:`SharedTensorStore`."""
+
+    path: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * torch.empty(
+            0, dtype=getattr(torch, self.dtype)
+        ).element_size()
+
+
+def _default_directory() -> str:
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def load(handle: TensorHandle) -> torch.Tensor:
+    """Map a published tensor into this process without copying it.
+
+    The mapping is copy-on-write: in-place writes stay private to the caller
+    and never reach the publisher or other readers.
+    """
+    dtype = getattr(torch, handle.dtype)
+    storage_dtype = _STORAGE_DTYPES.get(dtype, dtype)
+    if 0 in handle.shape:
+        return torch.empty(handle.shape, dtype=dtype)
+    array = np.memmap(handle.path, mode="c", shape=handle.shape,
+                      dtype=torch.empty(0, dtype=storage_dtype).numpy().dtype)
+    tensor = torch.from_numpy(array)
+    return tensor.view(dtype) if storage_dtype is not dtype else tensor
+
+
+def resolve(value: Any) -> Any:
+    """Replace every :class:`TensorHandle` in nested dicts/lists/tuples with its tensor."""
+    if isinstance(value, TensorHandle):
+        return load(value)
+    if isinstance(value, dict):
+        return {key: resolve(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item) for item in value]
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(resolve(item) for item in value)
+    return value
+
+
+class SharedTensorStore:
+    """Publishes tensors into memory-mapped files and hands out handles.
+
+    The store owns its files: :meth:`release` deletes one, :meth:`close`
+    (also run when the store is garbage collected or the interpreter exits)
+    deletes all of them. Readers only need the handle and :func:`load`.
+
+    Args:
+        directory: Parent directory for the store's files; defaults to
+            ``/dev/shm`` when writable, else the system temp directory
+        prefix: Prefix of the store's private subdirectory
+    """
+
+    def __init__(self, directory: Optional[str] = None, prefix: str = "multi_agent-"):
+        self.directory = tempfile.mkdtemp(prefix=prefix, dir=directory or _default_directory())
+        self._handles: Dict[str, TensorHandle] = {}
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def __enter__(self) -> "SharedTensorStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes currently published."""
+        return sum(handle.nbytes for handle in list(self._handles.values()))
+
+    def put(self, data: Any) -> TensorHandle:
+        """Copy ``data`` (tensor or NumPy array) into shared memory once."""
+        tensor = data if isinstance(data, torch.Tensor) else torch.as_tensor(data)
+        tensor = tensor.detach().cpu().contiguous()
+        dtype = tensor.dtype
+        storage_dtype = _STORAGE_DTYPES.get(dtype, dtype)
+        path = os.path.join(self.directory, uuid.uuid4().hex)
+        handle = TensorHandle(path, tuple(tensor.shape), str(dtype).replace("torch.", ""))
+
+        if tensor.numel() == 0:
+            open(path, "wb").close()
+        else:
+            source = tensor.view(storage_dtype).numpy()
+            array = np.memmap(path, mode="w+", shape=source.shape, dtype=source.dtype)
+            array[...] = source
+            array.flush()
+            del array
+        with self._lock:
+            self._handles[path] = handle
+        return handle
+
+    def put_dict(self, tensors: Dict[str, Any]) -> Dict[str, TensorHandle]:
+        """Publish every tensor of a mapping, e.g. a parameter snapshot."""
+        return {name: self.put(tensor) for name, tensor in tensors.items()}
+
+    def release(self, handle: TensorHandle) -> None:
+        """Delete a published tensor; readers that already mapped it keep their view."""
+        with self._lock:
+            if self._handles.pop(handle.path, None) is None:
+                return
+        try:
+            os.remove(handle.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """Delete every published tensor and the store's directory."""
+        with self._lock:
+            self._handles.clear()
+        self._finalizer()
+
+
+def share(value: Any, store: SharedTensorStore, threshold: int = 0) -> Any:
+    """Publish tensors/arrays of at least ``threshold`` bytes found in ``value``.
+
+    Returns ``value`` with those arrays replaced by handles; smaller arrays
+    and everything else are left as they are. Undo with :func:`resolve`.
+    """
+    if isinstance(value, torch.Tensor) or isinstance(value, np.ndarray):
+        size = value.numel() * value.element_size() if isinstance(value, torch.Tensor) \
+            else value.nbytes
+        return store.put(value) if size >= threshold else value
+    if isinstance(value, dict):
+        return {key: share(item, store, threshold) for key, item in value.items()}
+    if isinstance(value, list):
+        return [share(item, store, threshold) for item in value]
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(share(item, store, threshold) for item in value)
+    return value
+
+
+def handles_in(value: Any) -> Tuple[TensorHandle, ...]:
+    """All handles nested in ``value`` (for releasing them after use)."""
+    if isinstance(value, TensorHandle):
+        return (value,)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)) and not hasattr(value, "_fields"):
+        return tuple(handle for item in value for handle in handles_in(item))
+    return ()
@@ -0,0 +1,128 @@
+"""Core Components - Compute engines behind the multi-agent tools."""
+
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+# Submodules load on first access, so e.g. the tools' `core.utils` import
+# does not also pull in gymnasium through the rollout engine
+__getattr__, __dir__ = attach(__name__, {
+    "DiagonalSSM": ".ssm",
+    "HiddenStateView": ".ssm",
+    "fit_ssm": ".ssm",
+    "parallel_scan": ".ssm",
+    "MLPRegressor": ".models",
+    "BatchedMAML": ".maml",
+    "TaskBatch": ".maml",
+    "collate_tasks": ".maml",
+    "ReplayBuffer": ".adaptation",
+    "StreamingAdapter": ".adaptation",
+    "ToyDynamicsEnv": ".envs",
+    "make_env_fn": ".envs",
+    "RolloutBuffer": ".rollout",
+    "VectorRollout": ".rollout",
+    "ResultCache": ".cache",
+    "cached_run": ".cache",
+    "configure_default_cache": ".cache",
+    "content_hash": ".cache",
+    "default_cache": ".cache",
+    "CheckpointStore": ".checkpoint",
+    "load_tensors": ".checkpoint",
+    "save_tensors": ".checkpoint",
+    "LowPrecisionLinear": ".quantization",
+    "calibrate_ssm": ".quantization",
+    "precision_report": ".quantization",
+    "quantize_ssm": ".quantization",
+    "SSMInferenceServer": ".serving",
+    "StateTable": ".serving",
+    "MetaBatch": ".task_sampler",
+    "SinusoidTasks": ".task_sampler",
+    "TaskSampler": ".task_sampler",
+    "LowMemoryAdapter": ".low_memory",
+    "ParameterSubset": ".low_memory",
+    "memory_report": ".low_memory",
+    "TenantRegistry": ".tenants",
+    "StepScheduler": ".early_stopping",
+    "ResourceAllocator": ".resources",
+    "ResourceGrant": ".resources",
+    "DistributedMAML": ".distributed",
+    "launch_local": ".distributed",
+    "meta_train": ".distributed",
+    "Tracer": ".tracing",
+    "disable_tracing": ".tracing",
+    "enable_tracing": ".tracing",
+    "get_tracer": ".tracing",
+    "span": ".tracing",
+    "traced": ".tracing"
+})
+
+if TYPE_CHECKING:
+    from .ssm import DiagonalSSM, HiddenStateView, fit_ssm, parallel_scan
+    from .models import MLPRegressor
+    from .maml import BatchedMAML, TaskBatch, collate_tasks
+    from .adaptation import ReplayBuffer, StreamingAdapter
+    from .envs import ToyDynamicsEnv, make_env_fn
+    from .rollout import RolloutBuffer, VectorRollout
+    from .cache import (ResultCache, cached_run, configure_default_cache, content_hash,
+                        default_cache)
+    from .checkpoint import CheckpointStore, load_tensors, save_tensors
+    from .quantization import (LowPrecisionLinear, calibrate_ssm, precision_report,
+                               quantize_ssm)
+    from .serving import SSMInferenceServer, StateTable
+    from .task_sampler import MetaBatch, SinusoidTasks, TaskSampler
+    from .low_memory import LowMemoryAdapter, ParameterSubset, memory_report
+    from .tenants import TenantRegistry
+    from .early_stopping import StepScheduler
+    from .resources import ResourceAllocator, ResourceGrant
+    from .distributed import DistributedMAML, launch_local, meta_train
+    from .tracing import Tracer, disable_tracing, enable_tracing, get_tracer, span, traced
+
+__all__ = [
+    "DiagonalSSM",
+    "HiddenStateView",
+    "fit_ssm",
+    "parallel_scan",
+    "MLPRegressor",
+    "BatchedMAML",
+    "TaskBatch",
+    "collate_tasks",
+    "ReplayBuffer",
+    "StreamingAdapter",
+    "ToyDynamicsEnv",
+    "make_env_fn",
+    "RolloutBuffer",
+    "VectorRollout",
+    "ResultCache",
+    "cached_run",
+    "configure_default_cache",
+    "content_hash",
+    "default_cache",
+    "CheckpointStore",
+    "load_tensors",
+    "save_tensors",
+    "LowPrecisionLinear",
+    "calibrate_ssm",
+    "precision_report",
+    "quantize_ssm",
+    "SSMInferenceServer",
+    "StateTable",
+    "MetaBatch",
+    "SinusoidTasks",
+    "TaskSampler",
+    "LowMemoryAdapter",
+    "ParameterSubset",
+    "memory_report",
+    "TenantRegistry",
+    "StepScheduler",
+    "ResourceAllocator",
+    "ResourceGrant",
+    "DistributedMAML",
+    "launch_local",
+    "meta_train",
+    "Tracer",
+    "disable_tracing",
+    "enable_tracing",
+    "get_tracer",
+    "span",
+    "traced"
+]
@@ -0,0 +1,232 @@
+"""Streaming test-time adaptation with a bounded-memory replay store."""
+
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import torch
+from torch import nn
+
+from .early_stopping import StepScheduler
+from .utils import to_tensor
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer backed by preallocated tensors.
+
+    Storage is allocated once, on the first ``add`` (when feature shapes are
+    known), and then overwritten in place, so memory stays flat no matter how
+    many samples stream through.
+    """
+
+    def __init__(self, capacity: int, seed: int = 0):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._observations: Optional[torch.Tensor] = None
+        self._targets: Optional[torch.Tensor] = None
+        self._cursor = 0
+        self._size = 0
+        self._generator = torch.Generator().manual_seed(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        if self._observations is None:
+            return 0
+        return (self._observations.numel() * self._observations.element_size()
+                + self._targets.numel() * self._targets.element_size())
+
+    def clear(self) -> None:
+        """Forget all samples; the storage is kept for reuse."""
+        self._cursor = 0
+        self._size = 0
+
+    def add(self, observations: torch.Tensor, targets: torch.Tensor) -> None:
+        """Insert a batch, overwriting the oldest samples once full."""
+        if self._observations is None:
+            self._observations = observations.new_empty((self.capacity,) + observations.shape[1:])
+            self._targets = targets.new_empty((self.capacity,) + targets.shape[1:])
+
+        count = observations.shape[0]
+        if count >= self.capacity:
+            observations, targets = observations[-self.capacity:], targets[-self.capacity:]
+            count = self.capacity
+        first = min(count, self.capacity - self._cursor)
+        self._observations[self._cursor:self._cursor + first] = observations[:first]
+        self._targets[self._cursor:self._cursor + first] = targets[:first]
+        if first < count:
+            self._observations[:count - first] = observations[first:]
+            self._targets[:count - first] = targets[first:]
+        self._cursor = (self._cursor + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def sample(self, batch_size: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Draw ``batch_size`` stored samples uniformly with replacement."""
+        if self._size == 0:
+            raise ValueError("cannot sample from an empty replay buffer")
+        index = torch.randint(self._size, (batch_size,), generator=self._generator)
+        return self._observations[index], self._targets[index]
+
+
+class StreamingAdapter:
+    """Incrementally adapts a model to a stream of observation/target batches.
+
+    Every update mixes the incoming batch with a replay sample to limit
+    forgetting, then stores the batch in the :class:`ReplayBuffer`.
+    """
+
+    def __init__(self,
+                 model: nn.Module,
+                 learning_rate: float = 0.01,
+                 replay_capacity: int = 1024,
+                 replay_batch_size: int = 32,
+                 latency_window: int = 1024,
+                 seed: int = 0):
+        self.model = model
+        self.optimizer = torch.optim.SGD(model.parameters(), lr=learning_rate)
+        self.replay = ReplayBuffer(replay_capacity, seed=seed)
+        self.replay_batch_size = replay_batch_size
+        self.latencies = deque(maxlen=latency_window)
+        self.total_updates = 0
+        self.total_samples = 0
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Everything later updates depend on, as tensors and scalars.
+
+        Equal fingerprints mean equal future behaviour, which lets result
+        caches key stateful adaptation calls on the adapter's contents.
+        """
+        replay = self.replay
+        return {
+            "model": self.model.state_dict(),
+            "replay": [replay._observations, replay._targets, replay._cursor, replay._size,
+                       replay._generator.get_state()]
+        }
+
+    def set_learning_rate(self, learning_rate: float) -> None:
+        for group in self.optimizer.param_groups:
+            group["lr"] = learning_rate
+
+    def evaluate(self, observations: torch.Tensor, targets: torch.Tensor) -> float:
+        with torch.no_grad():
+            return torch.mean((self.model(observations) - targets) ** 2).item()
+
+    def update(self, observations: torch.Tensor, targets: torch.Tensor) -> float:
+        """Apply one learning-rate-scaled gradient step; returns the batch loss."""
+        start = time.perf_counter()
+        x, y = observations, targets
+        if len(self.replay) > 0 and self.replay_batch_size > 0:
+            replay_x, replay_y = self.replay.sample(self.replay_batch_size)
+            x, y = torch.cat([x, replay_x]), torch.cat([y, replay_y])
+        loss = torch.mean((self.model(x) - y) ** 2)
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        elapsed = time.perf_counter() - start
+        self.latencies.append(elapsed)
+        self.total_updates += 1
+        return loss.item()
+
+    @staticmethod
+    def _as_batch(observations: Any, targets: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        x, y = to_tensor(observations), to_tensor(targets)
+        if x.dim() == 1:
+            x = x.unsqueeze(0)
+        if y.dim() == 1:
+            y = y.unsqueeze(-1) if x.shape[0] == y.shape[0] else y.unsqueeze(0)
+        return x, y
+
+    def adapt_stream(self,
+                     stream: Iterable[Tuple[Any, Any]],
+                     updates_per_batch: int = 1,
+                     history_size: int = 1000,
+                     should_stop: Optional[Callable[[], bool]] = None,
+                     reference: Optional[Tuple[Any, Any]] = None,
+                     scheduler: Optional[StepScheduler] = None) -> Dict[str, Any]:
+        """Consume ``(observations, targets)`` batches and adapt on each one.
+
+        Progress is measured on a single fixed reference batch so that the
+        initial and final losses are comparable: ``reference`` when given
+        (e.g. a held-out batch), otherwise the first batch of the stream.
+
+        Args:
+            stream: Iterable of ``(observations, targets)`` mini-batches
+            updates_per_batch: Gradient updates applied to each batch
+            history_size: Number of most recent losses to keep
+            should_stop: Polled before every update; returning True ends the
+                stream early (used to cancel abandoned calls)
+            reference: Optional ``(observations, targets)`` batch to evaluate on
+            scheduler: Optional :class:`~multi_agent.core.early_stopping.StepScheduler`;
+                each batch is then one task that stops updating once its
+                loss plateaus, up to ``updates_per_batch`` steps more if
+                earlier batches left budget unused
+
+        Returns:
+            Reference loss before/after adaptation, the reference loss after
+            every update, a bounded history of update losses and counts
+        """
+        reference_history = deque(maxlen=history_size)
+        update_history = deque(maxlen=history_size)
+        ref_x = ref_y = initial_loss = final_loss = None
+        if reference is not None:
+            ref_x, ref_y = self._as_batch(*reference)
+            initial_loss = final_loss = self.evaluate(ref_x, ref_y)
+        batches = samples = updates = 0
+        for observations, targets in stream:
+            if should_stop is not None and should_stop():
+                break
+            x, y = self._as_batch(observations, targets)
+            if ref_x is None:
+                ref_x, ref_y = x, y
+                initial_loss = final_loss = self.evaluate(ref_x, ref_y)
+            if scheduler is not None:
+                scheduler.start(1)
+            for _ in itertools.count() if scheduler is not None else range(updates_per_batch):
+                if should_stop is not None and should_stop():
+                    break
+                if scheduler is not None and not len(scheduler.active()):
+                    break
+                loss = self.update(x, y)
+                if scheduler is not None:
+                    scheduler.observe(torch.tensor([0]), torch.tensor([loss]), self._grad_norm())
+                update_history.append(loss)
+                updates += 1
+                final_loss = self.evaluate(ref_x, ref_y)
+                reference_history.append(final_loss)
+            self.replay.add(x.detach(), y.detach())
+            batches += 1
+            samples += x.shape[0]
+        self.total_samples += samples
+        return {
+            "initial_loss": initial_loss,
+            "final_loss": final_loss,
+            "reference_history": list(reference_history),
+            "loss_history": list(update_history),
+            "batches": batches,
+            "samples": samples,
+            "updates": updates
+        }
+
+    def _grad_norm(self) -> Optional[torch.Tensor]:
+        """Norm of the gradients left by the last update (None without gradients)."""
+        grads = [p.grad for group in self.optimizer.param_groups for p in group["params"]
+                 if p.grad is not None]
+        if not grads:
+            return None
+        return torch.sqrt(sum(torch.sum(g ** 2) for g in grads)).reshape(1)
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Per-update latency in milliseconds over the recent window."""
+        if not self.latencies:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        window = torch.tensor(list(self.latencies), dtype=torch.float64) * 1000.0
+        return {
+            "mean_ms": window.mean().item(),
+            "p50_ms": torch.quantile(window, 0.5).item(),
+            "p99_ms": torch.quantile(window, 0.99).item()
+        }
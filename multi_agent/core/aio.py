@@ -0,0 +1,19 @@
+"""Helpers for offloading blocking work from an asyncio event loop."""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+
+async def run_in_executor(func: Callable[..., Any],
+                          *args: Any,
+                          executor: Optional[Executor] = None,
+                          **kwargs: Any) -> Any:
+    """Run a blocking callable in ``executor`` (default: the loop's thread pool).
+
+    Tensor-heavy tool calls release the GIL inside torch kernels, so running
+    them on executor threads keeps the event loop responsive.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,369 @@
+"""Content-addressed cache for tool results.
+
+Tool calls are keyed by a hash of their argument *contents* (array bytes,
+shapes, dtypes and hyperparameters), so identical calls, e.g. CrewAI
+retrying a tool with the same data, reuse the earlier result instead of
+recomputing it. Entries live in a byte-bounded in-memory LRU tier and,
+optionally, an on-disk tier that survives the process.
+
+Cached values are never handed out directly: a hit returns a fresh copy
+(disk entries are memory-mapped copy-on-write), so callers may mutate
+results without corrupting the cache.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# torch/numpy are imported where used: tools apply ``cached_run`` at class
+# definition, and importing a tool module should not load torch
+_MISSING = object()
+
+
+class Uncacheable(TypeError):
+    """Raised when a value cannot be content-hashed (e.g. an iterator)."""
+
+
+def _update(digest: Any, value: Any) -> None:
+    import numpy as np
+    import torch
+
+    if isinstance(value, torch.Tensor):
+        tensor = value.detach().cpu().contiguous()
+        digest.update(f"tensor{tuple(tensor.shape)}{tensor.dtype}".encode())
+        if tensor.dtype == torch.bfloat16:
+            tensor = tensor.view(torch.int16)
+        digest.update(memoryview(tensor.numpy()).cast("B"))
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        if array.dtype.hasobject:
+            raise Uncacheable("object arrays cannot be content-hashed")
+        digest.update(f"ndarray{array.shape}{array.dtype}".encode())
+        digest.update(memoryview(array).cast("B"))
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}(".encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+        digest.update(b")")
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}(".encode())
+        for item in value:
+            _update(digest, item)
+        digest.update(b")")
+    elif isinstance(value, torch.nn.Module):
+        digest.update(type(value).__qualname__.encode())
+        _update(digest, value.state_dict())
+    elif isinstance(value, (torch.dtype, torch.device)):
+        digest.update(str(value).encode())
+    else:
+        raise Uncacheable(f"cannot content-hash {type(value).__name__}")
+
+
+def content_hash(value: Any) -> str:
+    """Stable hex digest of nested tensors, arrays, containers and scalars.
+
+    Raises:
+        Uncacheable: If ``value`` contains something without a stable
+            content representation, such as a generator
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def _nbytes(value: Any, seen: Optional[set] = None) -> int:
+    """Approximate memory held by ``value``, counting each tensor once."""
+    import numpy as np
+    import torch
+
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return 64 + sum(_nbytes(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return 64 + sum(_nbytes(item, seen) for item in value)
+    if isinstance(value, torch.nn.Module):
+        return sum(_nbytes(t, seen) for t in value.state_dict().values())
+    if hasattr(value, "__dict__"):
+        return 64 + sum(_nbytes(item, seen) for item in vars(value).values())
+    return 64
+
+
+class ResultCache:
+    """Byte-bounded LRU cache with an optional disk tier.
+
+    Args:
+        max_bytes: Memory budget of the in-memory tier; least recently used
+            entries are evicted beyond it
+        directory: Directory of the disk tier; ``None`` keeps entries in
+            memory only. Entries are written through on ``put``, so a new
+            process with the same directory starts warm
+        max_disk_bytes: Budget of the disk tier (``None`` for unbounded)
+    """
+
+    def __init__(self,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 directory: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative")
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.bypassed = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            files = [name for name in os.listdir(directory) if name.endswith(".pt")]
+            files.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+            for name in files:
+                self._disk[name[:-3]] = os.path.getsize(os.path.join(directory, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or key in self._disk
+
+    @staticmethod
+    def key(namespace: str, arguments: Any) -> str:
+        """Cache key for calling ``namespace`` with ``arguments``."""
+        return content_hash((namespace, arguments))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pt")
+
+    def _store(self, key: str, value: Any) -> None:
+        size = _nbytes(value)
+        if key in self._entries:
+            self.bytes -= self._sizes.pop(key)
+            del self._entries[key]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            evicted, _ = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(evicted)
+            self.evictions += 1
+
+    def _load_from_disk(self, key: str) -> Any:
+        import torch
+
+        try:
+            # mmap'd storages are private mappings: writes never reach the file
+            return torch.load(self._path(key), mmap=True, weights_only=False)
+        except (OSError, RuntimeError, EOFError):
+            self._disk.pop(key, None)
+            return _MISSING
+
+    def _write_to_disk(self, key: str, value: Any) -> None:
+        import torch
+
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            torch.save(value, temporary)
+            os.replace(temporary, path)
+        except Exception:
+            # Unpicklable results still get the memory tier
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self._disk[key] = os.path.getsize(path)
+        self._disk.move_to_end(key)
+        while self.max_disk_bytes is not None and sum(self._disk.values()) > self.max_disk_bytes:
+            evicted, _ = self._disk.popitem(last=False)
+            self.disk_evictions += 1
+            try:
+                os.remove(self._path(evicted))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Copy of the cached value for ``key``, or ``default`` on a miss."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            elif key in self._disk:
+                value = self._load_from_disk(key)
+                if value is not _MISSING:
+                    self._disk.move_to_end(key)
+                    self._store(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+            if value is _MISSING:
+                self.misses += 1
+                return default
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a private copy of ``value``; the caller keeps ownership of its object."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, value)
+            if self.directory is not None:
+                self._write_to_disk(key, value)
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop every in-memory entry (and the disk tier with ``disk=True``)."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+            if disk:
+                for key in list(self._disk):
+                    try:
+                        os.remove(self._path(key))
+                    except FileNotFoundError:
+                        pass
+                self._disk.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and tier sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "bypassed": self.bypassed,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": sum(self._disk.values())
+            }
+
+
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ResultCache:
+    """Process-wide cache shared by the tools unless they are given another."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
+
+
+def configure_default_cache(**kwargs: Any) -> ResultCache:
+    """Replace the process-wide cache, e.g. to add a disk tier.
+
+    Tools created afterwards use the new cache; keyword arguments are those
+    of :class:`ResultCache`.
+    """
+    global _default_cache
+    with _default_lock:
+        _default_cache = ResultCache(**kwargs)
+        return _default_cache
+
+
+def cached_run(fingerprint: Optional[Callable[[Any], Any]] = None,
+               snapshot: Optional[Callable[[Any], Any]] = None,
+               restore: Optional[Callable[[Any, Any], None]] = None,
+               lock: Optional[Callable[[Any], Any]] = None,
+               bypass: Optional[Callable[[Dict[str, Any]], bool]] = None,
+               measurements: Sequence[str] = ()) -> Callable:
+    """Decorate a tool's ``_run`` so successful results go through ``self._cache``.
+
+    The key covers the tool class and every bound argument (defaults
+    included). Calls whose arguments cannot be hashed (iterators, opaque
+    objects) bypass the cache, as do tools whose ``_cache`` is ``None``.
+
+    Stateful tools describe their state with three hooks: ``fingerprint``
+    returns a hashable view of the state the result depends on (added to the
+    key), ``snapshot`` the state after the call (stored with the result) and
+    ``restore`` installs a stored snapshot on a hit, so the tool ends up
+    where recomputing would have left it. ``lock`` returns a reentrant lock
+    held across lookup, compute and store. ``bypass`` receives the bound
+    arguments and returns True for calls that must always run (e.g. calls
+    that advance a session).
+
+    Hits carry ``"cached": True``. ``measurements`` names result fields that
+    describe the original run rather than the call (latencies, throughput;
+    dotted paths reach into nested dicts); a hit reports them as None so
+    monitoring never reads a stale timing as a fresh one.
+    """
+    def decorate(run: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        signature = inspect.signature(run)
+
+        @functools.wraps(run)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+            cache = getattr(self, "_cache", None)
+            if cache is None:
+                return run(self, *args, **kwargs)
+            with lock(self) if lock is not None else nullcontext():
+                try:
+                    bound = signature.bind(self, *args, **kwargs)
+                    bound.apply_defaults()
+                    arguments = dict(bound.arguments)
+                    del arguments["self"]
+                    if bypass is not None and bypass(arguments):
+                        raise Uncacheable("call bypasses the cache")
+                    if fingerprint is not None:
+                        arguments["__state__"] = fingerprint(self)
+                    key = cache.key(type(self).__qualname__, arguments)
+                except (Uncacheable, TypeError):
+                    with cache._lock:
+                        cache.bypassed += 1
+                    return run(self, *args, **kwargs)
+
+                entry = cache.get(key, _MISSING)
+                if entry is not _MISSING:
+                    if restore is not None:
+                        restore(self, entry["state"])
+                    result = entry["result"]
+                    for path in measurements:
+                        *parents, field = path.split(".")
+                        target = result
+                        for parent in parents:
+                            target = target.get(parent) or {}
+                        if field in target:
+                            target[field] = None
+                    result["cached"] = True
+                    return result
+
+                result = run(self, *args, **kwargs)
+                if result.get("status") == "success":
+                    cache.put(key, {
+                        "result": result,
+                        "state": snapshot(self) if snapshot is not None else None
+                    })
+                return result
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,320 @@
+"""Checkpoints of meta-parameters and per-task adapted parameters.
+
+Files use the safetensors layout: an 8-byte little-endian header size, a
+JSON index (dtype, shape and byte offsets of every tensor, plus string
+metadata) and one flat data buffer. Loading memory-maps the file
+copy-on-write, so opening even a large checkpoint only parses the index;
+pages are read when a tensor is first touched.
+
+:class:`CheckpointStore` keeps one meta-initialization and any number of
+per-task adaptations, each stored as a delta against the meta-parameters it
+was adapted from: unchanged tensors are omitted, mostly-unchanged ones are
+stored sparsely and the rest as half-precision deltas.
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import torch
+
+# safetensors dtype codes
+_DTYPES = {
+    torch.float64: "F64", torch.float32: "F32", torch.float16: "F16", torch.bfloat16: "BF16",
+    torch.int64: "I64", torch.int32: "I32", torch.int16: "I16", torch.int8: "I8",
+    torch.uint8: "U8", torch.bool: "BOOL"
+}
+_CODES = {code: dtype for dtype, code in _DTYPES.items()}
+# Same-width integer views for exact (bitwise XOR) deltas
+_BIT_VIEWS = {8: torch.int64, 4: torch.int32, 2: torch.int16, 1: torch.uint8}
+_TASK_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def save_tensors(path: str, tensors: Dict[str, torch.Tensor],
+                 metadata: Optional[Dict[str, str]] = None) -> int:
+    """Write ``tensors`` to ``path`` atomically; returns the file size in bytes."""
+    prepared = {}
+    for name, tensor in tensors.items():
+        tensor = tensor.detach().cpu().contiguous()
+        if tensor.dtype not in _DTYPES:
+            raise TypeError(f"unsupported dtype {tensor.dtype} for {name!r}")
+        prepared[name] = tensor
+    # Largest elements first keeps every tensor aligned to its element size
+    order = sorted(prepared, key=lambda name: (-prepared[name].element_size(), name))
+
+    index: Dict[str, Any] = {}
+    offset = 0
+    for name in order:
+        tensor = prepared[name]
+        size = tensor.numel() * tensor.element_size()
+        index[name] = {"dtype": _DTYPES[tensor.dtype], "shape": list(tensor.shape),
+                       "data_offsets": [offset, offset + size]}
+        offset += size
+    if metadata:
+        index["__metadata__"] = {str(key): str(value) for key, value in metadata.items()}
+    header = json.dumps(index, separators=(",", ":")).encode()
+    header += b" " * (-(8 + len(header)) % 8)
+
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name in order:
+            tensor = prepared[name]
+            if tensor.numel():
+                if tensor.dtype == torch.bfloat16:
+                    tensor = tensor.view(torch.int16)
+                f.write(memoryview(tensor.numpy()).cast("B"))
+    os.replace(temporary, path)
+    return 8 + len(header) + offset
+
+
+def read_index(path: str) -> Tuple[Dict[str, Any], Dict[str, str], int]:
+    """Tensor index, metadata and data-buffer offset of a checkpoint file."""
+    with open(path, "rb") as f:
+        (length,) = struct.unpack("<Q", f.read(8))
+        index = json.loads(f.read(length))
+    metadata = index.pop("__metadata__", {})
+    return index, metadata, 8 + length
+
+
+def load_tensors(path: str) -> Tuple[Dict[str, torch.Tensor], Dict[str, str]]:
+    """Memory-map a checkpoint; tensors are copy-on-write views of the file.
+
+    In-place writes to the returned tensors stay private to this process and
+    never reach the file.
+    """
+    index, metadata, start = read_index(path)
+    if os.path.getsize(path) == start:
+        buffer = np.empty(0, dtype=np.uint8)
+    else:
+        buffer = np.memmap(path, dtype=np.uint8, mode="c", offset=start)
+    tensors = {}
+    for name, entry in index.items():
+        dtype = _CODES[entry["dtype"]]
+        storage = torch.int16 if dtype == torch.bfloat16 else dtype
+        begin, end = entry["data_offsets"]
+        array = buffer[begin:end].view(torch.empty(0, dtype=storage).numpy().dtype)
+        tensor = torch.from_numpy(array).reshape(entry["shape"])
+        tensors[name] = tensor.view(dtype) if storage is not dtype else tensor
+    return tensors, metadata
+
+
+class CheckpointStore:
+    """A meta-initialization plus per-task adaptations stored as deltas.
+
+    Layout: ``<directory>/meta.safetensors`` (the current
+    meta-initialization), ``<directory>/tasks/<task_id>.safetensors`` and
+    ``<directory>/bases/<checkpoint_id>.safetensors``. Each task file
+    records the id of the meta checkpoint it was taken against. When
+    :meth:`save_meta` replaces a meta checkpoint that tasks still refer to,
+    the old one moves to ``bases/``, so those tasks keep loading against
+    their own base; bases no task refers to are removed.
+
+    Args:
+        directory: Checkpoint directory (created if missing)
+        delta_dtype: Dtype of arithmetic deltas of floating-point tensors
+            (the default ``torch.float16`` halves task files against full
+            float32 copies, with rounding error relative to the delta);
+            ``None`` stores exact deltas as the XOR of the parameters' bit
+            patterns. Other tensors always get exact deltas
+        sparse_threshold: Deltas with at most this fraction of non-zero
+            entries are stored as index/value pairs
+        delta_tolerance: Arithmetic delta entries at most this large in
+            magnitude are dropped, so small drifts store sparsely
+    """
+
+    def __init__(self, directory: str, delta_dtype: Optional[torch.dtype] = torch.float16,
+                 sparse_threshold: float = 0.25, delta_tolerance: float = 0.0):
+        self.directory = directory
+        self.delta_dtype = delta_dtype
+        self.sparse_threshold = sparse_threshold
+        self.delta_tolerance = delta_tolerance
+        os.makedirs(os.path.join(directory, "tasks"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "bases"), exist_ok=True)
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.safetensors")
+
+    def base_path(self, checkpoint_id: str) -> str:
+        return os.path.join(self.directory, "bases", f"{checkpoint_id}.safetensors")
+
+    def task_path(self, task_id: str) -> str:
+        if not _TASK_ID.match(task_id):
+            raise ValueError(f"task ids may only contain letters, digits, '_', '.' and '-': {task_id!r}")
+        return os.path.join(self.directory, "tasks", f"{task_id}.safetensors")
+
+    def save_meta(self, parameters: Dict[str, torch.Tensor],
+                  metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Store the meta-initialization; returns its content id.
+
+        Tasks saved against the replaced meta checkpoint keep resolving to it.
+        """
+        from .cache import content_hash
+
+        checkpoint_id = content_hash({name: t.detach().cpu() for name, t in parameters.items()})
+        referenced = self._referenced_bases()
+        try:
+            _, current, _ = read_index(self.meta_path)
+        except FileNotFoundError:
+            current = {}
+        previous = current.get("checkpoint_id")
+        if previous is not None and previous != checkpoint_id and previous in referenced:
+            os.replace(self.meta_path, self.base_path(previous))
+        save_tensors(self.meta_path, parameters,
+                     dict(metadata or {}, checkpoint_id=checkpoint_id))
+        for name in os.listdir(os.path.join(self.directory, "bases")):
+            base = name[:-len(".safetensors")]
+            if name.endswith(".safetensors") and base not in referenced | {previous}:
+                os.remove(self.base_path(base))
+        return checkpoint_id
+
+    def _referenced_bases(self) -> Set[str]:
+        # Only the task files' JSON indexes are read
+        referenced = set()
+        for task_id in self.task_ids():
+            try:
+                referenced.add(read_index(self.task_path(task_id))[1].get("base"))
+            except FileNotFoundError:
+                pass
+        return referenced
+
+    def _load_meta(self, checkpoint_id: Optional[str] = None
+                   ) -> Optional[Tuple[Dict[str, torch.Tensor], Dict[str, str]]]:
+        # Each load is a fresh private mapping (an index parse and an mmap),
+        # so callers never share writable views
+        try:
+            loaded = load_tensors(self.meta_path)
+        except FileNotFoundError:
+            loaded = None
+        if checkpoint_id is None or (loaded is not None
+                                     and loaded[1].get("checkpoint_id") == checkpoint_id):
+            return loaded
+        try:
+            return load_tensors(self.base_path(checkpoint_id))
+        except FileNotFoundError:
+            return None
+
+    def meta_parameters(self) -> Optional[Dict[str, torch.Tensor]]:
+        """Memory-mapped meta-parameters, or None before :meth:`save_meta`."""
+        loaded = self._load_meta()
+        return None if loaded is None else loaded[0]
+
+    def meta_metadata(self) -> Dict[str, str]:
+        loaded = self._load_meta()
+        return {} if loaded is None else dict(loaded[1])
+
+    def save_task(self, task_id: str, parameters: Dict[str, torch.Tensor],
+                  metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Store ``parameters`` as a delta against the meta-parameters.
+
+        Returns:
+            Bytes written
+        """
+        loaded = self._load_meta()
+        if loaded is None:
+            raise FileNotFoundError(f"no meta checkpoint in {self.directory}; call save_meta first")
+        meta, meta_metadata = loaded
+        if set(parameters) != set(meta):
+            raise ValueError("task parameters must have the same names as the meta-parameters")
+
+        encoded, exact = {}, []
+        for name, value in parameters.items():
+            value = value.detach().cpu()
+            if value.shape != meta[name].shape:
+                raise ValueError(f"shape mismatch for {name!r}: {tuple(value.shape)} "
+                                 f"vs {tuple(meta[name].shape)}")
+            if self.delta_dtype is None or not value.is_floating_point():
+                bits = _BIT_VIEWS[value.element_size()]
+                delta = value.contiguous().view(bits) ^ meta[name].contiguous().view(bits)
+                exact.append(name)
+            else:
+                delta = value.to(meta[name].dtype) - meta[name]
+                if self.delta_tolerance > 0:
+                    delta = delta.masked_fill(delta.abs() <= self.delta_tolerance, 0)
+                delta = delta.to(self.delta_dtype)
+            nonzero = delta.reshape(-1).nonzero().squeeze(-1)
+            if nonzero.numel() == 0:
+                continue
+            if nonzero.numel() <= self.sparse_threshold * delta.numel():
+                encoded[f"{name}::indices"] = nonzero.to(torch.int32 if delta.numel() < 2 ** 31
+                                                         else torch.int64)
+                encoded[f"{name}::values"] = delta.reshape(-1)[nonzero]
+            else:
+                encoded[f"{name}::delta"] = delta
+        return save_tensors(self.task_path(task_id), encoded,
+                            dict(metadata or {}, base=meta_metadata["checkpoint_id"],
+                                 task_id=task_id,
+                                 encoding="xor" if self.delta_dtype is None else "add",
+                                 exact=json.dumps(exact)))
+
+    def load_task(self, task_id: str) -> Dict[str, torch.Tensor]:
+        """Adapted parameters of ``task_id`` (meta-parameters plus its delta).
+
+        The delta is applied to the meta checkpoint the task was saved
+        against, even if a newer one has been saved since.
+
+        Raises:
+            KeyError: If no checkpoint exists for ``task_id``
+            ValueError: If the task's meta checkpoint is no longer stored
+        """
+        path = self.task_path(task_id)
+        if not os.path.exists(path):
+            raise KeyError(task_id)
+        encoded, metadata = load_tensors(path)
+        loaded = self._load_meta(metadata.get("base"))
+        if loaded is None:
+            raise ValueError(f"task {task_id!r} was saved against meta checkpoint "
+                             f"{metadata.get('base')}, which is no longer stored")
+        meta = loaded[0]
+
+        if metadata.get("encoding") == "xor":
+            exact_names = set(meta)
+        else:
+            exact_names = set(json.loads(metadata.get("exact", "[]")))
+        parameters = {}
+        for name, base in meta.items():
+            dense, indices = encoded.get(f"{name}::delta"), encoded.get(f"{name}::indices")
+            if dense is None and indices is None:
+                # Unchanged tensors stay views of the mapped meta checkpoint
+                parameters[name] = base
+                continue
+            exact = name in exact_names
+            value = base.clone()
+            flat = (value.view(_BIT_VIEWS[value.element_size()]) if exact else value).view(-1)
+            if dense is not None:
+                index, delta = slice(None), dense.reshape(-1)
+            else:
+                index, delta = indices.long(), encoded[f"{name}::values"]
+            flat[index] = flat[index] ^ delta if exact else flat[index] + delta.to(value.dtype)
+            parameters[name] = value
+        return parameters
+
+    def task_ids(self) -> List[str]:
+        directory = os.path.join(self.directory, "tasks")
+        return sorted(name[:-len(".safetensors")] for name in os.listdir(directory)
+                      if name.endswith(".safetensors"))
+
+    def __contains__(self, task_id: str) -> bool:
+        return os.path.exists(self.task_path(task_id))
+
+    def delete_task(self, task_id: str) -> None:
+        try:
+            os.remove(self.task_path(task_id))
+        except FileNotFoundError:
+            pass
+
+    def nbytes(self) -> Dict[str, int]:
+        """Disk usage of the meta checkpoint, the older bases still in use and all task deltas."""
+        meta = os.path.getsize(self.meta_path) if os.path.exists(self.meta_path) else 0
+        directory = os.path.join(self.directory, "bases")
+        bases = [name for name in os.listdir(directory) if name.endswith(".safetensors")]
+        tasks = sum(os.path.getsize(self.task_path(task_id)) for task_id in self.task_ids())
+        return {"meta": meta, "bases": sum(os.path.getsize(os.path.join(directory, name))
+                                           for name in bases),
+                "num_bases": len(bases), "tasks": tasks, "num_tasks": len(self.task_ids())}
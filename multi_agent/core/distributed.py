@@ -0,0 +1,290 @@
+"""Data-parallel meta-training over ``torch.distributed`` (gloo, CPU).
+
+Every rank holds the task list and the same initialization. Tasks are cut
+into chunks and the chunks are dealt round-robin across ranks; each rank
+runs the inner loops of its chunks locally and the meta-gradients (Reptile
+deltas) are summed with a single all-reduce per outer step, after which
+every rank applies the identical update.
+
+Stragglers: with ``straggler_timeout`` set, a rank stops starting new
+chunks once the timeout has elapsed in the current outer step (it always
+finishes at least one chunk). The ranks then exchange their progress and
+the unfinished chunks are either dropped from this step's meta-gradient
+(``"drop"``) or dealt to the ranks that finished their own share
+(``"reassign"``). The meta-gradient is averaged over the tasks that were
+actually processed, so dropping keeps it unbiased for the remaining tasks.
+A rank that hangs inside a collective is not recoverable this way; the
+process group's ``timeout`` turns that into an error instead of a stall.
+"""
+
+import datetime
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import torch
+import torch.distributed as dist
+
+from .maml import BatchedMAML, TaskBatch, collate_tasks
+
+STRAGGLER_POLICIES = ("drop", "reassign")
+
+
+def _world() -> Tuple[int, int]:
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_rank(), dist.get_world_size()
+    return 0, 1
+
+
+class DistributedMAML:
+    """Shards the outer step of a :class:`BatchedMAML` across ranks.
+
+    Works without an initialized process group as a single rank, which is
+    equivalent to ``BatchedMAML.outer_step`` up to float summation order.
+
+    Args:
+        learner: The meta-learner; identical (same init) on every rank
+        tasks: Full task list, identical on every rank
+        chunk_size: Tasks per chunk, the unit of sharding and reassignment
+        straggler_timeout: Seconds into an outer step after which a rank
+            starts no new chunks (None waits for every chunk)
+        straggler_policy: ``"drop"`` or ``"reassign"`` unfinished chunks
+    """
+
+    def __init__(self,
+                 learner: BatchedMAML,
+                 tasks: List[Dict[str, Any]],
+                 chunk_size: int = 8,
+                 straggler_timeout: Optional[float] = None,
+                 straggler_policy: str = "reassign"):
+        if straggler_policy not in STRAGGLER_POLICIES:
+            raise ValueError(f"straggler_policy must be one of {STRAGGLER_POLICIES}, "
+                             f"got {straggler_policy!r}")
+        if not tasks:
+            raise ValueError("at least one task is required")
+        self.learner = learner
+        self.tasks = tasks
+        self.chunk_size = max(1, chunk_size)
+        self.straggler_timeout = straggler_timeout
+        self.straggler_policy = straggler_policy
+        self.rank, self.world_size = _world()
+        self.num_chunks = -(-len(tasks) // self.chunk_size)
+        self._batches: Dict[int, List[TaskBatch]] = {}
+
+    def shard(self, rank: int) -> List[int]:
+        """Chunk ids owned by ``rank`` (round-robin, so shards differ by at most one)."""
+        return list(range(rank, self.num_chunks, self.world_size))
+
+    def _chunk(self, chunk_id: int) -> List[TaskBatch]:
+        # Collated lazily: a rank only stacks the chunks it actually runs
+        batches = self._batches.get(chunk_id)
+        if batches is None:
+            start = chunk_id * self.chunk_size
+            batches = [batch for _, batch in
+                       collate_tasks(self.tasks[start:start + self.chunk_size])]
+            self._batches[chunk_id] = batches
+        return batches
+
+    def _run_chunk(self, chunk_id: int, accumulators: Dict[str, Any]) -> None:
+        learner = self.learner
+        for batch in self._chunk(chunk_id):
+            if learner.mode == "reptile":
+                params = dict(learner.model.named_parameters())
+                with torch.no_grad():
+                    adapted, curve = learner.adapt(batch)
+                    for name, p in params.items():
+                        accumulators["deltas"][name] += (adapted[name] - p).sum(dim=0)
+            else:
+                _, curve = learner.adapt(batch)
+                # Summed here, divided by the global task count after the all-reduce
+                curve[:, -1].sum().backward()
+                curve = curve.detach()
+            accumulators["curve"] += curve.sum(dim=0)
+            accumulators["improved"] += (curve[:, -1] < curve[:, 0]).sum().item()
+            accumulators["tasks"] += batch.num_tasks
+
+    def _all_reduce(self, tensor: torch.Tensor) -> torch.Tensor:
+        if self.world_size > 1:
+            dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+        return tensor
+
+    def outer_step(self) -> Dict[str, Any]:
+        """One synchronized meta-update over the tasks finished in time.
+
+        Returns:
+            Global meta loss and mean adaptation curve over processed tasks,
+            the share of tasks improved, and straggler accounting
+            (``tasks_dropped``, ``chunks_reassigned``, per-rank seconds)
+        """
+        learner = self.learner
+        params = dict(learner.model.named_parameters())
+        accumulators = {
+            "deltas": {name: torch.zeros_like(p) for name, p in params.items()},
+            "curve": torch.zeros(learner.adaptation_steps + 1),
+            "improved": 0,
+            "tasks": 0
+        }
+        if learner.mode != "reptile":
+            learner.optimizer.zero_grad()
+
+        start = time.perf_counter()
+        own = self.shard(self.rank)
+        done = 0
+        for chunk_id in own:
+            if (done and self.straggler_timeout is not None
+                    and time.perf_counter() - start > self.straggler_timeout):
+                break
+            self._run_chunk(chunk_id, accumulators)
+            done += 1
+        own_seconds = time.perf_counter() - start
+
+        # Progress exchange: chunks done and seconds spent, per rank
+        progress = torch.zeros(2, self.world_size, dtype=torch.float64)
+        progress[0, self.rank], progress[1, self.rank] = done, own_seconds
+        self._all_reduce(progress)
+        done_by_rank = [int(count) for count in progress[0].tolist()]
+        leftover = [chunk_id for rank in range(self.world_size)
+                    for chunk_id in self.shard(rank)[done_by_rank[rank]:]]
+        reassigned = 0
+        if leftover and self.straggler_policy == "reassign":
+            helpers = [rank for rank in range(self.world_size)
+                       if done_by_rank[rank] == len(self.shard(rank))]
+            if helpers:
+                reassigned = len(leftover)
+                for index, chunk_id in enumerate(leftover):
+                    if helpers[index % len(helpers)] == self.rank:
+                        self._run_chunk(chunk_id, accumulators)
+                leftover = []
+
+        # One all-reduce for the meta-gradient (or deltas) and the statistics
+        if learner.mode == "reptile":
+            tensors = [accumulators["deltas"][name] for name in params]
+        else:
+            tensors = [p.grad if p.grad is not None else torch.zeros_like(p)
+                       for p in params.values()]
+        stats = torch.cat([accumulators["curve"],
+                           torch.tensor([accumulators["improved"], accumulators["tasks"]],
+                                        dtype=torch.float32)])
+        flat = self._all_reduce(torch.cat([t.reshape(-1) for t in tensors] + [stats]))
+        total = int(flat[-1].item())
+        improved = flat[-2].item()
+        curve = flat[-(len(stats)):-2] / total
+        offset = 0
+        with torch.no_grad():
+            for (name, p), t in zip(params.items(), tensors):
+                summed = flat[offset:offset + t.numel()].view_as(p)
+                offset += t.numel()
+                if learner.mode == "reptile":
+                    p.add_(summed, alpha=learner.reptile_step / total)
+                else:
+                    p.grad = summed / total
+        if learner.mode != "reptile":
+            learner.optimizer.step()
+
+        dropped = sum(min(self.chunk_size, len(self.tasks) - chunk_id * self.chunk_size)
+                      for chunk_id in leftover)
+        return {
+            "meta_loss": curve[-1].item(),
+            "curve": curve,
+            "tasks_improved": improved / total,
+            "tasks_processed": total,
+            "tasks_dropped": dropped,
+            "chunks_reassigned": reassigned,
+            "rank_seconds": progress[1].tolist()
+        }
+
+
+def meta_train(tasks: List[Dict[str, Any]],
+               inner_lr: float = 0.01,
+               outer_lr: float = 0.001,
+               adaptation_steps: int = 5,
+               meta_iterations: int = 1,
+               mode: str = "maml",
+               hidden_dim: int = 64,
+               seed: int = 0,
+               reptile_step: float = 0.5,
+               initial_parameters: Optional[Dict[str, Any]] = None,
+               chunk_size: int = 8,
+               straggler_timeout: Optional[float] = None,
+               straggler_policy: str = "reassign") -> Dict[str, Any]:
+    """Meta-train on this rank of the current process group (or alone).
+
+    Call on every rank with the same arguments (e.g. under ``torchrun``
+    after ``init_process_group("gloo")``); every rank returns the same
+    parameters.
+    """
+    from .models import MLPRegressor
+    from .utils import to_tensor
+
+    if not tasks:
+        raise ValueError("at least one task is required")
+    (_, first), = collate_tasks(tasks[:1])
+    # Same seeded initialization as MAMLTool, so every rank starts identical
+    with torch.random.fork_rng(devices=[]):
+        torch.manual_seed(seed)
+        model = MLPRegressor(first.support_x.shape[-1], first.support_y.shape[-1], hidden_dim)
+    if initial_parameters is not None:
+        model.load_state_dict({name: to_tensor(value)
+                               for name, value in initial_parameters.items()})
+    learner = BatchedMAML(model, inner_lr, outer_lr, adaptation_steps, mode, reptile_step)
+    trainer = DistributedMAML(learner, tasks, chunk_size, straggler_timeout,
+                              straggler_policy)
+
+    steps = [trainer.outer_step() for _ in range(meta_iterations)]
+    return {
+        "parameters": {name: p.detach().clone() for name, p in model.named_parameters()},
+        "meta_loss_history": [step["meta_loss"] for step in steps],
+        "curve": steps[-1]["curve"],
+        "tasks_improved": steps[-1]["tasks_improved"],
+        "world_size": trainer.world_size,
+        "tasks_processed": [step["tasks_processed"] for step in steps],
+        "tasks_dropped": sum(step["tasks_dropped"] for step in steps),
+        "chunks_reassigned": sum(step["chunks_reassigned"] for step in steps),
+        "rank_seconds": [step["rank_seconds"] for step in steps]
+    }
+
+
+def _spawned_rank(rank: int, world_size: int, rendezvous: str, spec: Dict[str, Any],
+                  result_path: str, timeout: float) -> None:
+    from ..communication.shared_memory import resolve
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // world_size))
+    dist.init_process_group("gloo", init_method=f"file://{rendezvous}", rank=rank,
+                            world_size=world_size,
+                            timeout=datetime.timedelta(seconds=timeout))
+    try:
+        spec = resolve(spec)
+        result = meta_train(spec.pop("tasks"), **spec)
+        if rank == 0:
+            torch.save(result, result_path)
+    finally:
+        dist.destroy_process_group()
+
+
+def launch_local(world_size: int, tasks: List[Dict[str, Any]],
+                 timeout: float = 300.0, **kwargs: Any) -> Dict[str, Any]:
+    """Run :func:`meta_train` on ``world_size`` local gloo processes.
+
+    Task arrays are published once to shared memory and mapped by every
+    rank. ``kwargs`` are :func:`meta_train` arguments. Returns rank 0's result.
+    """
+    return _launch(_spawned_rank, world_size, tasks, timeout, **kwargs)
+
+
+def _launch(entry: Callable[..., None], world_size: int, tasks: List[Dict[str, Any]],
+            timeout: float, **kwargs: Any) -> Dict[str, Any]:
+    # ``entry`` has the signature of _spawned_rank and must be importable by
+    # spawned processes
+    import torch.multiprocessing as mp
+    from ..communication.shared_memory import SharedTensorStore, share
+
+    with tempfile.TemporaryDirectory(prefix="multi_agent-dist-") as directory, \
+            SharedTensorStore() as store:
+        spec = dict(kwargs, tasks=share(tasks, store))
+        result_path = os.path.join(directory, "result.pt")
+        mp.start_processes(entry,
+                           args=(world_size, os.path.join(directory, "rendezvous"), spec,
+                                 result_path, timeout),
+                           nprocs=world_size, join=True, start_method="spawn")
+        return torch.load(result_path)
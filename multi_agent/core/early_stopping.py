@@ -0,0 +1,153 @@
+"""Convergence-aware scheduling of per-task adaptation steps.
+
+A fixed schedule runs ``adaptation_steps`` inner updates for every task. A
+:class:`StepScheduler` instead watches each task's training loss and gradient
+norm, stops a task once it has converged and lets tasks that are still
+improving run past ``adaptation_steps`` with the steps the converged ones did
+not use. The total never exceeds the fixed schedule's budget.
+
+Work is organised in rounds (one :meth:`StepScheduler.start` per group of
+tasks adapted together). Budget a round leaves unused carries over to later
+rounds until :meth:`StepScheduler.reset`.
+"""
+
+from typing import Any, Dict, Optional
+
+import torch
+
+
+class StepScheduler:
+    """Per-task early stopping with reallocation of the saved step budget.
+
+    A task converges once its loss improved by less than ``tolerance``
+    (relative) for ``patience`` consecutive steps, or its gradient norm fell
+    to ``grad_tolerance``.
+
+    Args:
+        adaptation_steps: Steps per task of the fixed schedule (the budget)
+        tolerance: Relative loss improvement below which a step is stale
+        patience: Consecutive stale steps before a task stops
+        grad_tolerance: Gradient norm at or below which a task stops
+        max_steps: Most steps any one task may take; defaults to
+            ``2 * adaptation_steps`` (``adaptation_steps`` without reallocation)
+        reallocate: Give unused budget to tasks that have not converged
+    """
+
+    def __init__(self,
+                 adaptation_steps: int = 5,
+                 tolerance: float = 1e-3,
+                 patience: int = 2,
+                 grad_tolerance: float = 0.0,
+                 max_steps: Optional[int] = None,
+                 reallocate: bool = True):
+        if adaptation_steps < 1 or patience < 1:
+            raise ValueError("adaptation_steps and patience must be at least 1")
+        self.adaptation_steps = adaptation_steps
+        self.tolerance = tolerance
+        self.patience = patience
+        self.grad_tolerance = grad_tolerance
+        self.reallocate = reallocate
+        self.max_steps = (max_steps if max_steps is not None
+                          else 2 * adaptation_steps if reallocate else adaptation_steps)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all rounds: totals and carried budget."""
+        self.carried = 0
+        self.tasks = 0
+        self.steps_taken = 0
+        self.steps_reallocated = 0
+        self.steps_freed = 0
+        self.tasks_converged = 0
+        self._start_round(0)
+
+    def _start_round(self, num_tasks: int) -> None:
+        self.steps = torch.zeros(num_tasks, dtype=torch.long)
+        self.converged = torch.zeros(num_tasks, dtype=torch.bool)
+        self.stale = torch.zeros(num_tasks, dtype=torch.long)
+        self.last_loss = torch.full((num_tasks,), float("inf"))
+        self.round_budget = 0
+
+    def start(self, num_tasks: int) -> None:
+        """Begin a round of ``num_tasks`` tasks adapted together."""
+        self.finish()
+        self._start_round(num_tasks)
+        self.round_budget = self.carried + self.adaptation_steps * num_tasks
+        self.carried = 0
+        self.tasks += num_tasks
+
+    def finish(self) -> None:
+        """Close the current round, carrying its unused budget forward."""
+        if self.round_budget:
+            self.carried = self.round_budget - int(self.steps.sum())
+            self.tasks_converged += int(self.converged.sum())
+            self.steps_freed += self._freed()
+            self.round_budget = 0
+
+    def _freed(self) -> int:
+        # Steps of the fixed schedule that converged tasks did not need
+        unused = (self.adaptation_steps - self.steps).clamp(min=0)
+        return int(unused[self.converged].sum())
+
+    def active(self) -> torch.Tensor:
+        """Indices of the tasks to step next; empty when the round is done.
+
+        Tasks below ``adaptation_steps`` come first, then the highest-loss
+        ones, when the remaining budget cannot cover every unfinished task.
+        """
+        limit = self.max_steps if self.reallocate else self.adaptation_steps
+        candidates = torch.nonzero(~self.converged & (self.steps < limit)).squeeze(-1)
+        remaining = self.round_budget - int(self.steps.sum())
+        if len(candidates) > remaining:
+            ranked = sorted(candidates.tolist(),
+                            key=lambda i: (self.steps[i] >= self.adaptation_steps,
+                                           -self.last_loss[i]))
+            candidates = torch.tensor(sorted(ranked[:max(remaining, 0)]), dtype=torch.long)
+        return candidates
+
+    def observe(self, indices: torch.Tensor, losses: torch.Tensor,
+                grad_norms: Optional[torch.Tensor] = None) -> None:
+        """Record one step of the tasks at ``indices``.
+
+        Args:
+            indices: Tasks that were just stepped (as returned by :meth:`active`)
+            losses: Their training losses before the step
+            grad_norms: Their gradient norms at the step
+        """
+        losses = losses.detach().float().reshape(-1)
+        previous = self.last_loss[indices]
+        improvement = (previous - losses) / previous.abs().clamp(min=1e-12)
+        stale = torch.isfinite(previous) & (improvement < self.tolerance)
+        self.stale[indices] = torch.where(stale, self.stale[indices] + 1,
+                                          torch.zeros_like(self.stale[indices]))
+        converged = self.stale[indices] >= self.patience
+        if grad_norms is not None:
+            converged |= grad_norms.detach().reshape(-1) <= self.grad_tolerance
+        self.converged[indices] |= converged
+        extra = (self.steps[indices] >= self.adaptation_steps).sum().item()
+        self.steps[indices] += 1
+        self.last_loss[indices] = losses
+        self.steps_taken += len(indices)
+        self.steps_reallocated += extra
+
+    def report(self) -> Dict[str, Any]:
+        """Steps taken against the fixed schedule, over all rounds so far.
+
+        ``steps_freed`` counts the fixed-schedule steps converged tasks did not
+        need; ``steps_reallocated`` how many of them went to unconverged tasks
+        beyond ``adaptation_steps``; ``steps_saved`` the net difference.
+        """
+        converged, freed = self.tasks_converged, self.steps_freed
+        if self.round_budget:
+            converged, freed = converged + int(self.converged.sum()), freed + self._freed()
+        fixed = self.adaptation_steps * self.tasks
+        return {
+            "tasks": self.tasks,
+            "fixed_schedule_steps": fixed,
+            "steps_taken": self.steps_taken,
+            "steps_saved": fixed - self.steps_taken,
+            "steps_freed": freed,
+            "steps_reallocated": self.steps_reallocated,
+            "tasks_converged": converged,
+            "mean_steps_per_task": self.steps_taken / max(self.tasks, 1)
+        }
@@ -0,0 +1,388 @@
+"""Low-memory test-time adaptation for constrained hosts.
+
+:class:`LowMemoryAdapter` is a :class:`StreamingAdapter` that
+
+* updates only a small parameter subset: per-unit ``"affine"`` scale/shift
+  or rank-``r`` ``"lora"`` adapters on every ``nn.Linear``, with the base
+  weights frozen. Adapters are attached with forward hooks and folded into
+  the base weights at the end of every stream, so the model keeps its plain
+  state dict (checkpoints, task deltas and caching are unaffected);
+* can skip autograd entirely with a ``gradient_free`` SPSA step: two
+  forward passes under ``no_grad`` recompute what backprop would store, so
+  neither gradients nor saved activations are kept;
+* splits every update into micro-batches sized so the step's accounted
+  tensor memory (trainable gradients plus the activations of one
+  micro-batch) stays under ``memory_ceiling_bytes``.
+
+Memory is accounted, not sampled from the OS: activation bytes are the
+tensors autograd saves for backward (measured once per input width with a
+saved-tensor hook), which is what grows with the batch. A gradient-free step
+only holds one layer's input and output at a time.
+"""
+
+import contextlib
+import copy
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import torch
+from torch import nn
+
+from .adaptation import StreamingAdapter
+
+ADAPTATION_MODES = ("full", "affine", "lora")
+
+
+class ParameterSubset:
+    """Trainable adapters on a model's ``nn.Linear`` layers, base weights frozen.
+
+    Args:
+        model: Model whose linear layers are adapted in place
+        mode: ``"affine"`` (per-output scale and shift) or ``"lora"``
+            (``W + B @ A`` with ``B`` starting at zero)
+        rank: Rank of the ``"lora"`` update
+        seed: Seed for the ``"lora"`` down-projections
+    """
+
+    def __init__(self, model: nn.Module, mode: str = "affine", rank: int = 4, seed: int = 0):
+        if mode not in ("affine", "lora"):
+            raise ValueError(f"mode must be 'affine' or 'lora', got {mode!r}")
+        self.model = model
+        self.mode = mode
+        self.rank = rank
+        self._generator = torch.Generator().manual_seed(seed)
+        self.layers = [m for m in model.modules() if isinstance(m, nn.Linear)]
+        if mode == "affine" and any(layer.bias is None for layer in self.layers):
+            raise ValueError("affine adapters fold into the bias; every Linear needs one")
+        model.requires_grad_(False)
+        self.adapters: List[Tuple[nn.Parameter, nn.Parameter]] = []
+        self._hooks = []
+        for layer in self.layers:
+            if mode == "affine":
+                pair = (nn.Parameter(torch.ones(layer.out_features)),
+                        nn.Parameter(torch.zeros(layer.out_features)))
+            else:
+                pair = (nn.Parameter(torch.empty(rank, layer.in_features)),
+                        nn.Parameter(torch.zeros(layer.out_features, rank)))
+            self.adapters.append(pair)
+            self._hooks.append(layer.register_forward_hook(self._hook(pair)))
+        self.reset()
+
+    def _hook(self, pair: Tuple[nn.Parameter, nn.Parameter]) -> Any:
+        if self.mode == "affine":
+            scale, shift = pair
+            return lambda module, inputs, output: output * scale + shift
+        down, up = pair
+        return lambda module, inputs, output: output + (inputs[0] @ down.t()) @ up.t()
+
+    def parameters(self) -> List[nn.Parameter]:
+        return [p for pair in self.adapters for p in pair]
+
+    @property
+    def numel(self) -> int:
+        return sum(p.numel() for p in self.parameters())
+
+    def reset(self) -> None:
+        """Return every adapter to the identity (fresh ``lora`` down-projections)."""
+        with torch.no_grad():
+            for layer, (first, second) in zip(self.layers, self.adapters):
+                if self.mode == "affine":
+                    first.fill_(1.0)
+                    second.zero_()
+                else:
+                    first.copy_(torch.randn(first.shape, generator=self._generator)
+                                / layer.in_features ** 0.5)
+                    second.zero_()
+
+    def merge(self) -> None:
+        """Fold the adapters into the base weights, then reset them to the identity."""
+        with torch.no_grad():
+            for layer, (first, second) in zip(self.layers, self.adapters):
+                if self.mode == "affine":
+                    layer.weight.mul_(first[:, None])
+                    layer.bias.mul_(first).add_(second)
+                else:
+                    layer.weight.add_(second @ first)
+        self.reset()
+
+    def state(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "rank": self.rank,
+                "adapters": [p.detach() for p in self.parameters()],
+                "generator": self._generator.get_state()}
+
+    def remove(self) -> None:
+        """Detach the hooks and make the base weights trainable again."""
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self.model.requires_grad_(True)
+
+
+@contextlib.contextmanager
+def saved_tensor_bytes(exclude: Iterable[torch.Tensor] = ()) -> Iterator[Dict[str, int]]:
+    """Count the bytes of distinct storages autograd saves for backward inside the block.
+
+    Storages of ``exclude`` (parameters, the input batch) are not counted:
+    they are alive whether or not autograd keeps a reference.
+    """
+    storages: Dict[int, int] = {t.untyped_storage().data_ptr(): 0 for t in exclude}
+    counter = {"bytes": 0}
+
+    def pack(tensor: torch.Tensor) -> torch.Tensor:
+        storage = tensor.untyped_storage()
+        if storage.data_ptr() not in storages:
+            storages[storage.data_ptr()] = storage.nbytes()
+            counter["bytes"] += storage.nbytes()
+        return tensor
+
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+        yield counter
+
+
+class LowMemoryAdapter(StreamingAdapter):
+    """Streaming adapter with a parameter subset, gradient-free updates and a memory ceiling.
+
+    Args:
+        model: Model to adapt (its weights are updated at the end of each stream)
+        learning_rate: SGD learning rate (or SPSA step size)
+        replay_capacity: Replay ring-buffer capacity
+        replay_batch_size: Replay samples mixed into every update
+        latency_window: Updates kept for latency percentiles
+        seed: Seed for replay sampling, ``lora`` init and SPSA perturbations
+        mode: ``"full"``, ``"affine"`` or ``"lora"``
+        rank: ``lora`` rank
+        memory_ceiling_bytes: Bound on the accounted tensor memory of one
+            update; None runs each update as a single batch
+        gradient_free: Use a two-forward-pass SPSA estimate instead of autograd
+        spsa_epsilon: SPSA perturbation size
+    """
+
+    def __init__(self,
+                 model: nn.Module,
+                 learning_rate: float = 0.01,
+                 replay_capacity: int = 1024,
+                 replay_batch_size: int = 32,
+                 latency_window: int = 1024,
+                 seed: int = 0,
+                 mode: str = "affine",
+                 rank: int = 4,
+                 memory_ceiling_bytes: Optional[int] = None,
+                 gradient_free: bool = False,
+                 spsa_epsilon: float = 1e-3):
+        if mode not in ADAPTATION_MODES:
+            raise ValueError(f"mode must be one of {ADAPTATION_MODES}, got {mode!r}")
+        super().__init__(model, learning_rate, replay_capacity, replay_batch_size,
+                         latency_window, seed)
+        self.mode = mode
+        self.subset = ParameterSubset(model, mode, rank, seed) if mode != "full" else None
+        self.trainable = (self.subset.parameters() if self.subset is not None
+                          else list(model.parameters()))
+        self.optimizer = torch.optim.SGD(self.trainable, lr=learning_rate)
+        self.memory_ceiling_bytes = memory_ceiling_bytes
+        self.gradient_free = gradient_free
+        self.spsa_epsilon = spsa_epsilon
+        self._generator = torch.Generator().manual_seed(seed)
+        self._sample_bytes: Dict[Tuple[int, ...], int] = {}
+        self.peak_step_bytes = 0
+        self.last_micro_batch = 0
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        # Rank only shapes "lora" subsets; reporting it otherwise would make
+        # equal configurations compare unequal
+        return {"mode": self.mode, "rank": self.subset.rank if self.mode == "lora" else None,
+                "memory_ceiling_bytes": self.memory_ceiling_bytes, "gradient_free": self.gradient_free}
+
+    def fingerprint(self) -> Dict[str, Any]:
+        fingerprint = super().fingerprint()
+        fingerprint["low_memory"] = {
+            "config": self.config,
+            "subset": self.subset.state() if self.subset is not None else None,
+            "generator": self._generator.get_state()
+        }
+        return fingerprint
+
+    @property
+    def trainable_numel(self) -> int:
+        return sum(p.numel() for p in self.trainable)
+
+    def _fixed_bytes(self) -> int:
+        # Gradients of the trainable parameters; plain SGD keeps no other state
+        if self.gradient_free:
+            return 0
+        return sum(p.numel() * p.element_size() for p in self.trainable)
+
+    def _resident(self, x: torch.Tensor) -> List[torch.Tensor]:
+        return [x, *self.model.parameters(), *self.trainable]
+
+    def _forward_bytes(self, probe: torch.Tensor) -> int:
+        # Without autograd only the widest layer's input and output coexist
+        widest = [0]
+
+        def hook(module: nn.Module, inputs: Tuple[Any, ...], output: Any) -> None:
+            tensors = [t for t in (*inputs, output) if isinstance(t, torch.Tensor)]
+            widest[0] = max(widest[0], sum(t.numel() * t.element_size() for t in tensors))
+
+        leaves = [m for m in self.model.modules() if not list(m.children())]
+        hooks = [m.register_forward_hook(hook) for m in leaves]
+        try:
+            with torch.no_grad():
+                self.model(probe)
+        finally:
+            for handle in hooks:
+                handle.remove()
+        return widest[0]
+
+    def _bytes_per_sample(self, x: torch.Tensor) -> int:
+        """Activation bytes per sample, measured once per input width on a 2-sample probe."""
+        key = tuple(x.shape[1:])
+        if key not in self._sample_bytes:
+            probe = x[:2].clone()
+            if self.gradient_free:
+                measured = self._forward_bytes(probe)
+            else:
+                with saved_tensor_bytes(self._resident(probe)) as counter:
+                    output = self.model(probe)
+                del output
+                measured = counter["bytes"]
+            self._sample_bytes[key] = max(1, -(-measured // probe.shape[0]))
+        return self._sample_bytes[key]
+
+    def micro_batch_size(self, x: torch.Tensor) -> int:
+        """Largest micro-batch whose accounted step memory fits the ceiling."""
+        if self.memory_ceiling_bytes is None:
+            return x.shape[0]
+        available = self.memory_ceiling_bytes - self._fixed_bytes()
+        per_sample = self._bytes_per_sample(x)
+        if available < per_sample:
+            raise ValueError(
+                f"memory ceiling of {self.memory_ceiling_bytes} bytes is below one sample's "
+                f"step memory ({self._fixed_bytes() + per_sample} bytes); use a smaller "
+                f"parameter subset or gradient_free"
+            )
+        return max(1, min(x.shape[0], available // per_sample))
+
+    def _chunks(self, x: torch.Tensor, y: torch.Tensor) -> Iterable[Tuple[torch.Tensor, torch.Tensor]]:
+        size = self.micro_batch_size(x)
+        self.last_micro_batch = size
+        for start in range(0, x.shape[0], size):
+            yield x[start:start + size], y[start:start + size]
+
+    def _sum_loss(self, x: torch.Tensor, y: torch.Tensor) -> float:
+        total = 0.0
+        for chunk_x, chunk_y in self._chunks(x, y):
+            total += torch.sum((self.model(chunk_x) - chunk_y) ** 2).item()
+        return total
+
+    def _spsa_step(self, x: torch.Tensor, y: torch.Tensor) -> float:
+        eps = self.spsa_epsilon
+        scale = 1.0 / y.numel()
+        with torch.no_grad():
+            directions = [torch.randint(0, 2, p.shape, generator=self._generator).to(p.dtype) * 2 - 1
+                          for p in self.trainable]
+            for p, d in zip(self.trainable, directions):
+                p.add_(d, alpha=eps)
+            plus = self._sum_loss(x, y) * scale
+            for p, d in zip(self.trainable, directions):
+                p.add_(d, alpha=-2 * eps)
+            minus = self._sum_loss(x, y) * scale
+            coefficient = (plus - minus) / (2 * eps)
+            lr = self.optimizer.param_groups[0]["lr"]
+            for p, d in zip(self.trainable, directions):
+                p.add_(d, alpha=eps - lr * coefficient)
+        # Forward activations exist only transiently, one micro-batch at a time
+        self.peak_step_bytes = max(self.peak_step_bytes,
+                                   self.last_micro_batch * self._bytes_per_sample(x))
+        return (plus + minus) / 2
+
+    def _gradient_step(self, x: torch.Tensor, y: torch.Tensor) -> float:
+        self.optimizer.zero_grad()
+        total, count = 0.0, y.numel()
+        peak_activations = 0
+        for chunk_x, chunk_y in self._chunks(x, y):
+            with saved_tensor_bytes(self._resident(x)) as counter:
+                loss = torch.sum((self.model(chunk_x) - chunk_y) ** 2) / count
+            peak_activations = max(peak_activations, counter["bytes"])
+            loss.backward()
+            total += loss.item()
+        self.optimizer.step()
+        self.peak_step_bytes = max(self.peak_step_bytes, self._fixed_bytes() + peak_activations)
+        return total
+
+    def update(self, observations: torch.Tensor, targets: torch.Tensor) -> float:
+        """One (micro-batched) update of the trainable subset; returns the batch loss."""
+        import time
+
+        start = time.perf_counter()
+        x, y = observations, targets
+        if len(self.replay) > 0 and self.replay_batch_size > 0:
+            replay_x, replay_y = self.replay.sample(self.replay_batch_size)
+            x, y = torch.cat([x, replay_x]), torch.cat([y, replay_y])
+        loss = self._spsa_step(x, y) if self.gradient_free else self._gradient_step(x, y)
+        self.latencies.append(time.perf_counter() - start)
+        self.total_updates += 1
+        return loss
+
+    def adapt_stream(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """:meth:`StreamingAdapter.adapt_stream`, then fold the adapters into the model."""
+        stats = super().adapt_stream(*args, **kwargs)
+        if self.subset is not None:
+            self.subset.merge()
+        return stats
+
+    def detach(self) -> StreamingAdapter:
+        """Plain full-parameter adapter over the same model and replay store."""
+        if self.subset is not None:
+            self.subset.merge()
+            self.subset.remove()
+        adapter = StreamingAdapter(self.model, self.optimizer.param_groups[0]["lr"],
+                                   self.replay.capacity, self.replay_batch_size,
+                                   self.latencies.maxlen)
+        adapter.replay = self.replay
+        adapter.latencies = self.latencies
+        adapter.total_updates, adapter.total_samples = self.total_updates, self.total_samples
+        return adapter
+
+    def memory_stats(self) -> Dict[str, Any]:
+        return {
+            **self.config,
+            "trainable_parameters": self.trainable_numel,
+            "total_parameters": sum(p.numel() for p in self.model.parameters()),
+            "micro_batch_size": self.last_micro_batch,
+            "peak_step_bytes": self.peak_step_bytes
+        }
+
+
+def memory_report(model: nn.Module,
+                  observations: torch.Tensor,
+                  targets: torch.Tensor,
+                  adaptation_steps: int,
+                  learning_rate: float = 0.01,
+                  configs: Optional[Dict[str, Dict[str, Any]]] = None,
+                  seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Peak step memory and loss of adaptation variants on copies of ``model``.
+
+    Every variant starts from the same weights and runs ``adaptation_steps``
+    updates on the same batch; ``"full"`` (full-parameter autograd in one
+    batch) is always included as the reference.
+
+    Returns:
+        Per variant: accounted peak step bytes, its ratio to ``"full"``,
+        trainable parameters, micro-batch size and the loss before/after
+    """
+    configs = dict(configs or {})
+    configs.setdefault("full", {"mode": "full"})
+    report = {}
+    for name, config in configs.items():
+        adapter = LowMemoryAdapter(copy.deepcopy(model), learning_rate, replay_batch_size=0,
+                                   seed=seed, **config)
+        initial = adapter.evaluate(observations, targets)
+        for _ in range(adaptation_steps):
+            adapter.update(observations, targets)
+        if adapter.subset is not None:
+            adapter.subset.merge()
+        report[name] = dict(adapter.memory_stats(), initial_loss=initial,
+                            final_loss=adapter.evaluate(observations, targets))
+    full = max(report["full"]["peak_step_bytes"], 1)
+    for entry in report.values():
+        entry["peak_vs_full"] = entry["peak_step_bytes"] / full
+    return report
@@ -0,0 +1,201 @@
+"""Batched, functional MAML across tasks using ``torch.func``."""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import torch
+from torch import nn
+from torch.func import functional_call, grad, grad_and_value, vmap
+
+from .early_stopping import StepScheduler
+from .utils import to_tensor
+
+MAML_MODES = ("maml", "fomaml", "reptile")
+
+
+class TaskBatch(NamedTuple):
+    """Support/query data for a group of tasks stacked along a leading task axis."""
+
+    support_x: torch.Tensor
+    support_y: torch.Tensor
+    query_x: torch.Tensor
+    query_y: torch.Tensor
+
+    @property
+    def num_tasks(self) -> int:
+        return self.support_x.shape[0]
+
+
+def collate_tasks(tasks: List[Dict[str, Any]]) -> List[Tuple[List[int], TaskBatch]]:
+    """Stack task dicts into contiguous batches, grouping tasks of equal shape.
+
+    Each task dict needs ``support_x``, ``support_y``, ``query_x`` and
+    ``query_y`` entries. Tasks whose tensors share shapes end up in the same
+    :class:`TaskBatch` so their inner loops run in a single vmapped pass.
+
+    Returns:
+        List of ``(task_indices, batch)`` pairs
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    converted = []
+    for index, task in enumerate(tasks):
+        arrays = tuple(to_tensor(task[key]) for key in TaskBatch._fields)
+        arrays = tuple(a.unsqueeze(-1) if a.dim() == 1 else a for a in arrays)
+        converted.append(arrays)
+        groups.setdefault(tuple(a.shape for a in arrays), []).append(index)
+
+    return [
+        (indices, TaskBatch(*(torch.stack([converted[i][j] for i in indices])
+                              for j in range(len(TaskBatch._fields)))))
+        for indices in groups.values()
+    ]
+
+
+class BatchedMAML:
+    """Meta-learner that runs every task's inner loop in one vmapped pass.
+
+    Modes:
+        ``maml``: full second-order meta-gradient through the inner loop
+        ``fomaml``: first-order MAML; inner gradients are detached so no
+        second-order graph is kept
+        ``reptile``: move the initialization towards the adapted parameters;
+        runs entirely without an outer autograd graph
+
+    Args:
+        model: Network whose initialization is meta-learned
+        inner_lr: Inner-loop (per-task) SGD step size
+        outer_lr: Adam learning rate for the ``maml``/``fomaml`` meta-update
+        adaptation_steps: Inner gradient steps per task
+        mode: One of :data:`MAML_MODES`
+        reptile_step: Interpolation factor towards the mean adapted
+            parameters in ``reptile`` mode (1.0 jumps all the way)
+        scheduler: Optional :class:`~multi_agent.core.early_stopping.StepScheduler`
+            that stops converged tasks early and hands their steps to the
+            others; without it every task runs ``adaptation_steps`` steps
+    """
+
+    def __init__(self,
+                 model: nn.Module,
+                 inner_lr: float = 0.01,
+                 outer_lr: float = 0.001,
+                 adaptation_steps: int = 5,
+                 mode: str = "maml",
+                 reptile_step: float = 0.5,
+                 scheduler: Optional[StepScheduler] = None):
+        if mode not in MAML_MODES:
+            raise ValueError(f"mode must be one of {MAML_MODES}, got {mode!r}")
+        if not 0.0 < reptile_step <= 1.0:
+            raise ValueError(f"reptile_step must be in (0, 1], got {reptile_step}")
+        self.model = model
+        self.inner_lr = inner_lr
+        self.outer_lr = outer_lr
+        self.adaptation_steps = adaptation_steps
+        self.mode = mode
+        self.reptile_step = reptile_step
+        self.scheduler = scheduler
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=outer_lr)
+
+    def _loss(self, params: Dict[str, torch.Tensor],
+              x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+        return torch.mean((functional_call(self.model, params, (x,)) - y) ** 2)
+
+    def adapt(self, batch: TaskBatch,
+              params: Optional[Dict[str, torch.Tensor]] = None
+              ) -> Tuple[Dict[str, torch.Tensor], torch.Tensor]:
+        """Run ``adaptation_steps`` inner updates for every task in ``batch``.
+
+        Returns:
+            Adapted parameters with a leading task axis, and query losses of
+            shape ``(num_tasks, adaptation_steps + 1)`` tracked at every step
+            (with a scheduler: one column per batched step, a stopped task
+            repeating its last loss)
+        """
+        if params is None:
+            params = dict(self.model.named_parameters())
+        if self.scheduler is not None:
+            return self._adapt_scheduled(batch, params)
+        first_order = self.mode != "maml"
+
+        def adapt_one(task_params, support_x, support_y, query_x, query_y):
+            curve = [self._loss(task_params, query_x, query_y)]
+            for _ in range(self.adaptation_steps):
+                grads = grad(self._loss)(task_params, support_x, support_y)
+                if first_order:
+                    grads = {name: g.detach() for name, g in grads.items()}
+                task_params = {name: p - self.inner_lr * grads[name]
+                               for name, p in task_params.items()}
+                curve.append(self._loss(task_params, query_x, query_y))
+            return task_params, torch.stack(curve)
+
+        return vmap(adapt_one, in_dims=(None, 0, 0, 0, 0))(params, *batch)
+
+    def _adapt_scheduled(self, batch: TaskBatch, params: Dict[str, torch.Tensor]
+                         ) -> Tuple[Dict[str, torch.Tensor], torch.Tensor]:
+        # Only the tasks the scheduler keeps active are gathered into each
+        # vmapped step; the others keep their parameters and last query loss
+        scheduler, first_order = self.scheduler, self.mode != "maml"
+        num_tasks = batch.num_tasks
+        task_params = {name: p.expand(num_tasks, *p.shape) for name, p in params.items()}
+        query = vmap(self._loss, in_dims=(None, 0, 0))(params, batch.query_x, batch.query_y)
+        curve = [query]
+        scheduler.start(num_tasks)
+
+        def step_one(p, support_x, support_y, query_x, query_y):
+            grads, loss = grad_and_value(self._loss)(p, support_x, support_y)
+            if first_order:
+                grads = {name: g.detach() for name, g in grads.items()}
+            norm = torch.sqrt(sum(torch.sum(g.detach() ** 2) for g in grads.values()))
+            p = {name: value - self.inner_lr * grads[name] for name, value in p.items()}
+            return p, loss, norm, self._loss(p, query_x, query_y)
+
+        active = scheduler.active()
+        while len(active):
+            gathered = {name: t[active] for name, t in task_params.items()}
+            stepped, loss, norm, active_query = vmap(step_one)(
+                gathered, *(t[active] for t in batch))
+            task_params = {name: t.index_copy(0, active, stepped[name])
+                           for name, t in task_params.items()}
+            query = query.index_copy(0, active, active_query)
+            curve.append(query)
+            scheduler.observe(active, loss, norm)
+            active = scheduler.active()
+        scheduler.finish()
+        return task_params, torch.stack(curve, dim=1)
+
+    def outer_step(self, batches: List[TaskBatch]) -> Dict[str, Any]:
+        """Perform one meta-update over all task batches.
+
+        Returns:
+            Meta loss (post-adaptation query loss) and per-task loss curves
+        """
+        num_tasks = sum(batch.num_tasks for batch in batches)
+        curves = []
+
+        if self.mode == "reptile":
+            params = dict(self.model.named_parameters())
+            deltas = {name: torch.zeros_like(p) for name, p in params.items()}
+            with torch.no_grad():
+                for batch in batches:
+                    adapted, curve = self.adapt(batch)
+                    for name, p in params.items():
+                        deltas[name] += (adapted[name] - p).sum(dim=0)
+                    curves.append(curve)
+                for name, p in params.items():
+                    p.add_(deltas[name], alpha=self.reptile_step / num_tasks)
+        else:
+            self.optimizer.zero_grad()
+            for batch in batches:
+                _, curve = self.adapt(batch)
+                # Weight each group by its share of tasks so the meta loss is a
+                # plain mean over tasks regardless of grouping
+                (curve[:, -1].sum() / num_tasks).backward()
+                curves.append(curve.detach())
+            self.optimizer.step()
+
+        # Scheduled groups can run different numbers of batched steps
+        length = max(curve.shape[1] for curve in curves)
+        curves = torch.cat([torch.cat([curve, curve[:, -1:].expand(-1, length - curve.shape[1])],
+                                      dim=1) for curve in curves])
+        return {
+            "meta_loss": curves[:, -1].mean().item(),
+            "curves": curves
+        }
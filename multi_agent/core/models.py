@@ -0,0 +1,32 @@
+"""Small function approximators shared by the meta-learning and adaptation engines."""
+
+from torch import nn
+
+
+class MLPRegressor(nn.Module):
+    """Feed-forward regressor used as the meta-learned model.
+
+    Kept deliberately simple (no normalization, no dropout) so it can be
+    evaluated functionally with ``torch.func`` and vmapped across tasks.
+    """
+
+    def __init__(self,
+                 input_dim: int,
+                 output_dim: int,
+                 hidden_dim: int = 64,
+                 num_layers: int = 2):
+        super().__init__()
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        self.hidden_dim = hidden_dim
+
+        layers = []
+        width = input_dim
+        for _ in range(num_layers):
+            layers += [nn.Linear(width, hidden_dim), nn.Tanh()]
+            width = hidden_dim
+        layers.append(nn.Linear(width, output_dim))
+        self.net = nn.Sequential(*layers)
+
+    def forward(self, x):
+        return self.net(x)
@@ -0,0 +1,183 @@
+"""Low-precision inference for :class:`~multi_agent.core.ssm.DiagonalSSM`.
+
+Only the input, output and skip projections run in reduced precision; the
+decay factors, the scan and the recurrent state stay in float32, so errors
+introduced by a projection are not compounded through the recurrence.
+
+``bf16`` casts weights to bfloat16 and computes the matmul in bfloat16.
+``int8`` stores weights as per-output-channel symmetric int8 and quantizes
+activations dynamically per row, accumulating in int32 (``torch._int_mm``
+where available). :func:`calibrate_ssm` measures each projection's error
+against float32 on sample data and keeps projections that exceed the
+tolerance in float32.
+"""
+
+import copy
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import torch
+from torch import nn
+
+from .ssm import DiagonalSSM
+
+PRECISIONS = ("fp32", "bf16", "int8")
+PROJECTIONS = ("in_proj", "out_proj", "skip")
+
+
+class LowPrecisionLinear(nn.Module):
+    """Inference-only ``nn.Linear`` computing in bfloat16 or int8.
+
+    Inputs and outputs are float32 tensors; only the matmul is low precision.
+
+    Args:
+        linear: Trained float32 layer (kept as the float32 reference)
+        precision: ``"bf16"`` or ``"int8"``
+    """
+
+    def __init__(self, linear: nn.Linear, precision: str):
+        super().__init__()
+        if precision not in ("bf16", "int8"):
+            raise ValueError(f"precision must be 'bf16' or 'int8', got {precision!r}")
+        self.precision = precision
+        self.in_features, self.out_features = linear.in_features, linear.out_features
+        weight = linear.weight.detach()
+        bias = linear.bias.detach().clone() if linear.bias is not None else None
+        self.register_buffer("bias", bias)
+        if precision == "bf16":
+            self.register_buffer("weight", weight.to(torch.bfloat16))
+        else:
+            scale = weight.abs().amax(dim=1).clamp_min(1e-12) / 127.0
+            quantized = torch.round(weight / scale[:, None]).clamp(-127, 127).to(torch.int8)
+            # Stored transposed and contiguous, the layout the int32 matmul wants
+            self.register_buffer("weight", quantized.t().contiguous())
+            self.register_buffer("weight_scale", scale)
+
+    def _int8(self, x: torch.Tensor) -> torch.Tensor:
+        rows = x.reshape(-1, self.in_features)
+        scale = rows.abs().amax(dim=1, keepdim=True).clamp_min(1e-12) / 127.0
+        quantized = torch.round(rows / scale).clamp(-127, 127).to(torch.int8)
+        if hasattr(torch, "_int_mm"):
+            accumulated = torch._int_mm(quantized, self.weight).float()
+        else:
+            # Exact while in_features * 127**2 fits the float32 mantissa
+            accumulated = quantized.float() @ self.weight.float()
+        out = accumulated * scale * self.weight_scale
+        return out.reshape(*x.shape[:-1], self.out_features)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.precision == "bf16":
+            out = (x.to(torch.bfloat16) @ self.weight.t()).float()
+        else:
+            out = self._int8(x)
+        return out if self.bias is None else out + self.bias
+
+    def extra_repr(self) -> str:
+        return (f"in_features={self.in_features}, out_features={self.out_features}, "
+                f"precision={self.precision}")
+
+
+def quantize_ssm(model: DiagonalSSM, precision: str) -> DiagonalSSM:
+    """Copy of ``model`` for inference with low-precision projections.
+
+    ``"fp32"`` returns an unmodified copy. The copy keeps the
+    :class:`DiagonalSSM` interface (``forward``, ``step``,
+    ``forward_chunked``) and is not trainable.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+    quantized = copy.deepcopy(model).eval()
+    quantized.requires_grad_(False)
+    if precision != "fp32":
+        for name in PROJECTIONS:
+            setattr(quantized, name, LowPrecisionLinear(getattr(model, name), precision))
+    return quantized
+
+
+def _relative_error(approx: torch.Tensor, exact: torch.Tensor) -> float:
+    return (torch.linalg.vector_norm(approx - exact)
+            / torch.linalg.vector_norm(exact).clamp_min(1e-12)).item()
+
+
+def calibrate_ssm(model: DiagonalSSM, quantized: DiagonalSSM, inputs: torch.Tensor,
+                  tolerance: float = 0.05) -> Dict[str, Any]:
+    """Check ``quantized`` against ``model`` on ``inputs`` and fall back where needed.
+
+    Each low-precision projection is compared with its float32 original on
+    the activations it sees for ``inputs`` (``(batch, length, input_dim)``);
+    projections whose relative error exceeds ``tolerance`` are reverted to
+    float32 in place.
+
+    Returns:
+        Per-projection precision and relative error, and the end-to-end
+        relative output error after the fallbacks
+    """
+    projections = {}
+    with torch.no_grad():
+        reference, _, states = model(inputs, return_states=True)
+        activations = {"in_proj": inputs, "skip": inputs, "out_proj": states}
+        for name in PROJECTIONS:
+            layer = getattr(quantized, name)
+            if not isinstance(layer, LowPrecisionLinear):
+                projections[name] = {"precision": "fp32", "relative_error": 0.0}
+                continue
+            original = getattr(model, name)
+            error = _relative_error(layer(activations[name]), original(activations[name]))
+            entry = {"precision": layer.precision, "relative_error": error}
+            if error > tolerance:
+                setattr(quantized, name, copy.deepcopy(original).requires_grad_(False))
+                entry["precision"] = "fp32"
+            projections[name] = entry
+        outputs, _ = quantized(inputs)
+    return {
+        "tolerance": tolerance,
+        "calibration_steps": inputs.shape[0] * inputs.shape[-2],
+        "projections": projections,
+        "output_relative_error": _relative_error(outputs, reference)
+    }
+
+
+def precision_report(model: DiagonalSSM,
+                     inputs: torch.Tensor,
+                     targets: Optional[torch.Tensor] = None,
+                     precisions: Iterable[str] = PRECISIONS,
+                     chunk_size: int = 1024,
+                     calibration_steps: int = 256,
+                     tolerance: float = 0.05,
+                     repeats: int = 3) -> Dict[str, Dict[str, Any]]:
+    """Accuracy versus speed of chunked inference at each precision.
+
+    Returns:
+        Per precision: steps per second (best of ``repeats``), speedup over
+        float32, relative deviation from the float32 outputs, MSE against
+        ``targets`` when given, and the calibrated projection precisions
+    """
+    def run(candidate: DiagonalSSM) -> torch.Tensor:
+        with torch.no_grad():
+            return torch.cat([outputs for _, outputs, _, _ in
+                              candidate.forward_chunked(inputs, chunk_size)], dim=-2)
+
+    reference = run(model)
+    steps = inputs.shape[0] * inputs.shape[-2]
+    report: Dict[str, Dict[str, Any]] = {}
+    for precision in precisions:
+        candidate = quantize_ssm(model, precision)
+        calibration = calibrate_ssm(model, candidate, inputs[:, :calibration_steps], tolerance)
+        best = float("inf")
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            outputs = run(candidate)
+            best = min(best, time.perf_counter() - start)
+        entry = {
+            "steps_per_second": steps / max(best, 1e-9),
+            "relative_error": _relative_error(outputs, reference),
+            "projections": {name: value["precision"]
+                            for name, value in calibration["projections"].items()}
+        }
+        if targets is not None:
+            entry["mse"] = torch.mean((outputs - targets) ** 2).item()
+        report[precision] = entry
+    if "fp32" in report:
+        for entry in report.values():
+            entry["speedup"] = entry["steps_per_second"] / report["fp32"]["steps_per_second"]
+    return report
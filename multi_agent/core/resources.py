@@ -0,0 +1,229 @@
+"""Core, memory and wall-clock budgets for concurrently running subtasks.
+
+:class:`ResourceAllocator` splits the host's cores (and optionally a memory
+pool and a wall-clock budget) between subtasks that run at the same time,
+in proportion to the work each needed in previous runs (core-seconds,
+smoothed), so a heavy MAML fit and a light SSM fit finish together instead
+of both spawning a full intra-op pool and oversubscribing the cores.
+
+Grants are enforced by the executor (see
+:class:`~multi_agent.workflows.executor.SubtaskExecutor`):
+
+* cores: torch intra-op threads of the thread or process running the
+  subtask (:func:`limit_threads`). With torch's OpenMP backend the setting
+  is per calling thread, so concurrent thread-pool subtasks keep separate
+  limits;
+* memory: a soft address-space limit on process-pool workers
+  (:func:`limit_process_memory`); allocations past it fail inside the tool.
+  Thread-pool subtasks share the parent's address space, so their memory
+  grants are advisory;
+* wall-clock: the subtask's timeout.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class ResourceGrant:
+    """Resources assigned to one subtask for one run.
+
+    Attributes:
+        cores: Intra-op threads the subtask may use
+        memory_bytes: Memory it may allocate, or None for no cap
+        wall_seconds: Wall-clock budget (its timeout), or None for no limit
+    """
+
+    cores: int
+    memory_bytes: Optional[int] = None
+    wall_seconds: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def available_cores() -> int:
+    """Cores this process may run on (its CPU affinity where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def available_memory() -> Optional[int]:
+    """Memory available to new allocations in bytes (Linux ``MemAvailable``), or None."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _address_space_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def limit_threads(cores: int) -> Iterator[None]:
+    """Run the block with ``cores`` torch intra-op threads in the calling thread."""
+    import torch
+
+    # Reading first completes torch's lazy per-thread initialization, which
+    # would otherwise overwrite the limit on the thread's first parallel op
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, cores))
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+@contextmanager
+def limit_process_memory(memory_bytes: Optional[int]) -> Iterator[bool]:
+    """Cap further allocations of this process at ``memory_bytes`` for the block.
+
+    Sets a soft ``RLIMIT_AS`` of the current address-space size plus
+    ``memory_bytes``; yields whether the cap could be applied (POSIX hosts
+    exposing ``/proc``).
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    current = _address_space_bytes()
+    if memory_bytes is None or resource is None or current is None:
+        yield False
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + memory_bytes
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        yield True
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+class ResourceAllocator:
+    """Splits cores, memory and wall-clock time between concurrent subtasks.
+
+    Each subtask's share is its expected work: ``weights`` when given,
+    otherwise an exponential moving average of the core-seconds it used in
+    earlier runs (:meth:`record`); subtasks without history get the mean
+    share. Every subtask gets at least one core, and the grants of one
+    :meth:`allocate` call never add up to more than ``total_cores`` unless
+    there are more subtasks than cores.
+
+    Args:
+        total_cores: Cores to hand out; defaults to :func:`available_cores`
+        total_memory_bytes: Memory pool split by share; None grants no caps
+        wall_budget_seconds: Longest any subtask may run; with history a
+            subtask gets ``headroom`` times its predicted time, up to this
+        weights: Fixed relative shares keyed by subtask name
+        smoothing: Weight of the newest run in the moving averages
+        headroom: Multiple of the predicted run time granted as wall-clock
+    """
+
+    def __init__(self,
+                 total_cores: Optional[int] = None,
+                 total_memory_bytes: Optional[int] = None,
+                 wall_budget_seconds: Optional[float] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 smoothing: float = 0.5,
+                 headroom: float = 3.0):
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError(f"smoothing must be in (0, 1], got {smoothing}")
+        self.total_cores = max(1, total_cores or available_cores())
+        self.total_memory_bytes = total_memory_bytes
+        self.wall_budget_seconds = wall_budget_seconds
+        self.weights = dict(weights or {})
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.work: Dict[str, float] = {}
+        self.seconds: Dict[str, float] = {}
+        self.runs: Dict[str, int] = {}
+        self.grants: Dict[str, ResourceGrant] = {}
+        self._lock = threading.Lock()
+
+    def _shares(self, names: Sequence[str]) -> List[float]:
+        demands = {name: self.weights.get(name, self.work.get(name)) for name in names}
+        known = [demand for demand in demands.values() if demand is not None]
+        default = sum(known) / len(known) if known else 1.0
+        demands = {name: max(demand if demand is not None else default, 1e-9)
+                   for name, demand in demands.items()}
+        total = sum(demands.values())
+        return [demands[name] / total for name in names]
+
+    def _cores(self, shares: List[float]) -> List[int]:
+        if len(shares) >= self.total_cores:
+            return [1] * len(shares)
+        ideal = [share * self.total_cores for share in shares]
+        cores = [max(1, int(value)) for value in ideal]
+        # Largest remainder first, never below one core
+        while sum(cores) < self.total_cores:
+            i = max(range(len(cores)), key=lambda j: ideal[j] - cores[j])
+            cores[i] += 1
+        while sum(cores) > self.total_cores:
+            i = max((j for j in range(len(cores)) if cores[j] > 1),
+                    key=lambda j: cores[j] - ideal[j])
+            cores[i] -= 1
+        return cores
+
+    def allocate(self, names: Sequence[str]) -> Dict[str, ResourceGrant]:
+        """Grants for subtasks ``names`` that will run at the same time."""
+        if not names:
+            return {}
+        with self._lock:
+            shares = self._shares(names)
+            grants = {}
+            for name, share, cores in zip(names, shares, self._cores(shares)):
+                wall = self.wall_budget_seconds
+                if wall is not None and name in self.work:
+                    wall = min(wall, self.headroom * self.work[name] / cores)
+                memory = (None if self.total_memory_bytes is None
+                          else int(self.total_memory_bytes * share))
+                grants[name] = ResourceGrant(cores, memory, wall)
+            self.grants.update(grants)
+            return grants
+
+    def record(self, name: str, elapsed: float, grant: ResourceGrant,
+               status: str = "success") -> None:
+        """Fold a finished run into ``name``'s expected work.
+
+        Only successful runs count: a timed-out or failed run says nothing
+        about how much work the subtask needs.
+        """
+        if status != "success":
+            return
+        with self._lock:
+            work = elapsed * grant.cores
+            previous = self.work.get(name)
+            self.work[name] = work if previous is None else (
+                self.smoothing * work + (1.0 - self.smoothing) * previous)
+            previous = self.seconds.get(name)
+            self.seconds[name] = elapsed if previous is None else (
+                self.smoothing * elapsed + (1.0 - self.smoothing) * previous)
+            self.runs[name] = self.runs.get(name, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        """Budgets, the latest grants and the observed work per subtask."""
+        with self._lock:
+            return {
+                "total_cores": self.total_cores,
+                "total_memory_bytes": self.total_memory_bytes,
+                "wall_budget_seconds": self.wall_budget_seconds,
+                "grants": {name: grant.as_dict() for name, grant in self.grants.items()},
+                "core_seconds": dict(self.work),
+                "mean_seconds": dict(self.seconds),
+                "runs": dict(self.runs)
+            }
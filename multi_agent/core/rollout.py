@@ -0,0 +1,176 @@
+"""Vectorized environment rollouts into preallocated buffers."""
+
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+import torch
+from gymnasium import spaces
+
+VECTORIZATION_MODES = ("sync", "async")
+
+
+class RolloutBuffer:
+    """Fixed-size ``(time, env)`` storage for batched trajectories.
+
+    Arrays are allocated once and written one vector step at a time, so a
+    rollout never builds per-step Python objects. Observations keep one extra
+    row: ``observations[t + 1]`` is the observation after ``actions[t]``.
+
+    Under gymnasium's next-step autoreset, the step after an episode ends
+    only resets the environment; such transitions are marked invalid in
+    :attr:`valid`.
+    """
+
+    def __init__(self, num_steps: int, num_envs: int, obs_dim: int, action_dim: int):
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+        self.observations = np.zeros((num_steps + 1, num_envs, obs_dim), dtype=np.float32)
+        self.actions = np.zeros((num_steps, num_envs, action_dim), dtype=np.float32)
+        self.rewards = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.terminated = np.zeros((num_steps, num_envs), dtype=bool)
+        self.truncated = np.zeros((num_steps, num_envs), dtype=bool)
+        self.valid = np.ones((num_steps, num_envs), dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.observations, self.actions, self.rewards,
+                                              self.terminated, self.truncated, self.valid))
+
+    def transitions(self) -> Dict[str, torch.Tensor]:
+        """Env-major ``(num_envs, num_steps, ...)`` tensor views, without copying.
+
+        Returns:
+            ``observations``, ``actions``, ``next_observations``, ``rewards``,
+            ``dones`` and ``valid``
+        """
+        as_tensor = torch.from_numpy
+        return {
+            "observations": as_tensor(self.observations[:-1]).transpose(0, 1),
+            "actions": as_tensor(self.actions).transpose(0, 1),
+            "next_observations": as_tensor(self.observations[1:]).transpose(0, 1),
+            "rewards": as_tensor(self.rewards).transpose(0, 1),
+            "dones": as_tensor(self.terminated | self.truncated).transpose(0, 1),
+            "valid": as_tensor(self.valid).transpose(0, 1)
+        }
+
+
+def _action_dim(space: spaces.Space) -> int:
+    if isinstance(space, spaces.Box):
+        return int(np.prod(space.shape))
+    if isinstance(space, spaces.Discrete):
+        return 1
+    raise TypeError(f"unsupported action space {space}")
+
+
+class VectorRollout:
+    """Collects batched trajectories from ``num_envs`` copies of an environment.
+
+    Args:
+        env_fn: Picklable zero-argument environment factory
+        num_envs: Number of parallel sub-environments
+        mode: ``"sync"`` (in-process ``SyncVectorEnv``) or ``"async"``
+            (one subprocess per environment via ``AsyncVectorEnv``)
+        seed: Seed for the environments and the default random policy
+        context: Multiprocessing start method for ``"async"``
+    """
+
+    def __init__(self,
+                 env_fn: Callable[[], gym.Env],
+                 num_envs: int = 8,
+                 mode: str = "sync",
+                 seed: int = 0,
+                 context: Optional[str] = "spawn"):
+        if mode not in VECTORIZATION_MODES:
+            raise ValueError(f"mode must be one of {VECTORIZATION_MODES}, got {mode!r}")
+        self.num_envs = num_envs
+        self.mode = mode
+        if mode == "sync":
+            self.env = gym.vector.SyncVectorEnv([env_fn] * num_envs, copy=False)
+        else:
+            self.env = gym.vector.AsyncVectorEnv([env_fn] * num_envs, copy=False,
+                                                 context=context)
+        self.action_space = self.env.single_action_space
+        self.obs_dim = int(np.prod(self.env.single_observation_space.shape))
+        self.action_dim = _action_dim(self.action_space)
+        self._rng = np.random.default_rng(seed)
+        self._obs, _ = self.env.reset(seed=seed)
+        self._done = np.zeros(num_envs, dtype=bool)
+        self.total_steps = 0
+
+    def __enter__(self) -> "VectorRollout":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.env.close()
+
+    @property
+    def num_cores(self) -> int:
+        """Cores the environments step on (one per worker in async mode)."""
+        if self.mode == "sync":
+            return 1
+        return max(1, min(self.num_envs, os.cpu_count() or 1))
+
+    def random_actions(self) -> np.ndarray:
+        """Uniformly random actions for every sub-environment in one draw."""
+        if isinstance(self.action_space, spaces.Discrete):
+            return self._rng.integers(self.action_space.n, size=self.num_envs)
+        return self._rng.uniform(self.action_space.low, self.action_space.high,
+                                 size=(self.num_envs,) + self.action_space.shape
+                                 ).astype(np.float32)
+
+    def collect(self,
+                num_steps: int,
+                policy: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                buffer: Optional[RolloutBuffer] = None) -> Tuple[RolloutBuffer, Dict[str, float]]:
+        """Step all environments ``num_steps`` times.
+
+        Episodes continue across calls. Pass a previously returned ``buffer``
+        of the same size to reuse its storage.
+
+        Args:
+            num_steps: Vector steps to take
+            policy: Maps an observation batch ``(num_envs, obs_dim)`` to an
+                action batch; defaults to uniformly random actions
+            buffer: Optional buffer to overwrite
+
+        Returns:
+            The filled buffer and throughput metrics (``env_steps``,
+            ``seconds``, ``steps_per_second``, ``steps_per_second_per_core``)
+        """
+        if buffer is None or buffer.num_steps != num_steps or buffer.num_envs != self.num_envs:
+            buffer = RolloutBuffer(num_steps, self.num_envs, self.obs_dim, self.action_dim)
+        action_shape = (self.num_envs,) + self.action_space.shape
+
+        obs = self._obs
+        start = time.perf_counter()
+        buffer.observations[0] = self._obs.reshape(self.num_envs, -1)
+        for t in range(num_steps):
+            actions = self.random_actions() if policy is None else policy(buffer.observations[t])
+            obs, rewards, terminated, truncated, _ = self.env.step(
+                np.asarray(actions).reshape(action_shape)
+            )
+            buffer.actions[t] = np.asarray(actions, dtype=np.float32).reshape(self.num_envs, -1)
+            buffer.observations[t + 1] = obs.reshape(self.num_envs, -1)
+            buffer.rewards[t] = rewards
+            buffer.terminated[t] = terminated
+            buffer.truncated[t] = truncated
+            buffer.valid[t] = ~self._done
+            self._done = terminated | truncated
+        elapsed = time.perf_counter() - start
+
+        self._obs = obs
+        env_steps = num_steps * self.num_envs
+        self.total_steps += env_steps
+        steps_per_second = env_steps / max(elapsed, 1e-9)
+        return buffer, {
+            "env_steps": env_steps,
+            "seconds": elapsed,
+            "steps_per_second": steps_per_second,
+            "steps_per_second_per_core": steps_per_second / self.num_cores
+        }
@@ -0,0 +1,269 @@
+"""Micro-batching server for single-step SSM inference across many streams.
+
+Each environment (stream) submits one input step at a time. A worker thread
+gathers concurrent requests until the batch is full or the oldest request
+has waited ``max_wait_ms``, runs one recurrent :meth:`DiagonalSSM.step` for
+the whole batch and resolves every request's future. Per-stream hidden
+states live in a :class:`StateTable`, one preallocated row (slot) per open
+stream, so a batch gathers and scatters its states with index ops.
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+import torch
+
+from .ssm import DiagonalSSM
+
+
+class StateTable:
+    """Slot-allocated float32 hidden states, one row per open stream.
+
+    Freed slots are reused; the table doubles when it runs out of slots.
+
+    Args:
+        state_dim: Width of each hidden state
+        capacity: Initial number of slots
+    """
+
+    def __init__(self, state_dim: int, capacity: int = 64):
+        self.states = torch.zeros(max(1, capacity), state_dim)
+        self._slots: Dict[Hashable, int] = {}
+        self._free = list(range(self.states.shape[0] - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, stream_id: Hashable) -> bool:
+        return stream_id in self._slots
+
+    @property
+    def capacity(self) -> int:
+        return self.states.shape[0]
+
+    def allocate(self, stream_id: Hashable, state: Optional[torch.Tensor] = None) -> int:
+        """Give ``stream_id`` a slot holding ``state`` (zeros by default)."""
+        if stream_id in self._slots:
+            raise KeyError(f"stream {stream_id!r} is already open")
+        if not self._free:
+            grown = self.states.new_zeros(self.capacity * 2, self.states.shape[1])
+            grown[:self.capacity] = self.states
+            self._free = list(range(grown.shape[0] - 1, self.capacity - 1, -1))
+            self.states = grown
+        slot = self._free.pop()
+        self.states[slot] = 0.0 if state is None else state
+        self._slots[stream_id] = slot
+        return slot
+
+    def release(self, stream_id: Hashable) -> torch.Tensor:
+        """Free the stream's slot; returns a copy of its last state."""
+        slot = self._slots.pop(stream_id)
+        self._free.append(slot)
+        return self.states[slot].clone()
+
+    def slot(self, stream_id: Hashable) -> int:
+        return self._slots[stream_id]
+
+    def state(self, stream_id: Hashable) -> torch.Tensor:
+        return self.states[self._slots[stream_id]].clone()
+
+
+class SSMInferenceServer:
+    """Batches concurrent single-step predictions through one SSM.
+
+    Usage::
+
+        with SSMInferenceServer(model, max_batch_size=128, max_wait_ms=2.0) as server:
+            server.open_stream("env-0")
+            prediction = server.predict("env-0", x_t)
+
+    A stream's requests are served in submission order; a second request
+    for a stream already in the forming batch waits for the next batch.
+
+    Args:
+        model: Trained (optionally :func:`quantize_ssm`-converted) SSM
+        max_batch_size: Most requests stepped together
+        max_wait_ms: Longest the oldest queued request waits for the batch
+            to fill before it is run anyway
+        capacity: Initial stream slots in the state table
+        latency_window: Recent requests kept for the latency percentiles
+    """
+
+    def __init__(self,
+                 model: DiagonalSSM,
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0,
+                 capacity: int = 64,
+                 latency_window: int = 10000):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.table = StateTable(model.state_dim, capacity)
+        self._pending: Deque[Tuple[Hashable, torch.Tensor, Future, float]] = collections.deque()
+        # Streams of the batch being stepped: their slots are written back
+        # after the step, so they must not be released (and reused) meanwhile
+        self._in_flight: set = set()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._latencies: Deque[float] = collections.deque(maxlen=latency_window)
+        self._batch_sizes: Deque[int] = collections.deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self._next_stream = 0
+
+    def start(self) -> "SSMInferenceServer":
+        with self._condition:
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._serve, name="ssm-inference",
+                                                daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Serve what is queued, then stop the worker."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> "SSMInferenceServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def open_stream(self, stream_id: Optional[Hashable] = None,
+                    state: Optional[torch.Tensor] = None) -> Hashable:
+        """Register a stream, optionally continuing from ``state``; returns its id."""
+        with self._condition:
+            if stream_id is None:
+                stream_id = self._next_stream
+                self._next_stream += 1
+            self.table.allocate(stream_id, state)
+        return stream_id
+
+    def close_stream(self, stream_id: Hashable) -> torch.Tensor:
+        """Free the stream's slot; returns its final hidden state.
+
+        Raises:
+            RuntimeError: If the stream has requests queued or being stepped
+        """
+        with self._condition:
+            if stream_id in self._in_flight or any(
+                    request[0] == stream_id for request in self._pending):
+                raise RuntimeError(f"stream {stream_id!r} has requests in flight")
+            return self.table.release(stream_id)
+
+    def submit(self, stream_id: Hashable, x_t: Any) -> Future:
+        """Queue one ``(input_dim,)`` step for ``stream_id``.
+
+        Returns:
+            Future resolving to the stream's ``(output_dim,)`` prediction
+        """
+        from .utils import to_tensor
+
+        future: Future = Future()
+        with self._condition:
+            if self._closed or self._thread is None:
+                raise RuntimeError("server is not running")
+            if stream_id not in self.table:
+                raise KeyError(f"unknown stream {stream_id!r}")
+            self._pending.append((stream_id, to_tensor(x_t).reshape(-1), future,
+                                  time.perf_counter()))
+            self._condition.notify_all()
+        return future
+
+    def predict(self, stream_id: Hashable, x_t: Any, timeout: Optional[float] = None
+                ) -> torch.Tensor:
+        """Blocking :meth:`submit`."""
+        return self.submit(stream_id, x_t).result(timeout)
+
+    async def apredict(self, stream_id: Hashable, x_t: Any) -> torch.Tensor:
+        """Async counterpart of :meth:`predict`."""
+        import asyncio
+        return await asyncio.wrap_future(self.submit(stream_id, x_t))
+
+    def _next_batch(self) -> List[Tuple[Hashable, torch.Tensor, Future, float]]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return []
+            deadline = self._pending[0][3] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, seen, deferred = [], set(), collections.deque()
+            while self._pending and len(batch) < self.max_batch_size:
+                request = self._pending.popleft()
+                if request[0] in seen:
+                    deferred.append(request)
+                else:
+                    seen.add(request[0])
+                    batch.append(request)
+            self._pending.extendleft(reversed(deferred))
+            self._in_flight = seen
+            return batch
+
+    def _serve(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                with self._condition:
+                    slots = torch.tensor([self.table.slot(request[0]) for request in batch])
+                    states = self.table.states[slots]
+                with torch.no_grad():
+                    outputs, states = self.model.step(torch.stack([r[1] for r in batch]), states)
+                with self._condition:
+                    self.table.states[slots] = states
+                    self._in_flight = set()
+            except Exception as e:  # a bad request fails its batch, not the server
+                with self._condition:
+                    self._in_flight = set()
+                for request in batch:
+                    request[2].set_exception(e)
+                continue
+            now = time.perf_counter()
+            for index, (_, _, future, submitted) in enumerate(batch):
+                self._latencies.append(now - submitted)
+                future.set_result(outputs[index])
+            self.requests += len(batch)
+            self.batches += 1
+            self._batch_sizes.append(len(batch))
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Submit-to-result latency in milliseconds over the recent window."""
+        if not self._latencies:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        window = sorted(self._latencies)
+        last = len(window) - 1
+        return {
+            "mean_ms": sum(window) / len(window) * 1000.0,
+            "p50_ms": window[round(0.5 * last)] * 1000.0,
+            "p99_ms": window[round(0.99 * last)] * 1000.0
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Latency percentiles, batch sizes and fill rate (mean batch / max batch)."""
+        mean_batch = (sum(self._batch_sizes) / len(self._batch_sizes)
+                      if self._batch_sizes else 0.0)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "open_streams": len(self.table),
+            "state_slots": self.table.capacity,
+            "mean_batch_size": mean_batch,
+            "batch_fill_rate": mean_batch / self.max_batch_size,
+            **self.latency_stats()
+        }
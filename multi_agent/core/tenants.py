@@ -0,0 +1,319 @@
+"""Per-tenant adapted models as low-rank deltas on one shared base model.
+
+:class:`TenantRegistry` serves many tenants (customers, tasks), each with its
+own adaptation of a shared meta-initialization. A tenant owns only a delta:
+a rank-``r`` update ``up @ down`` and a bias shift for every ``nn.Linear`` of
+the base model, so its memory is ``r * (in + out) + out`` floats per layer
+instead of a full copy of the weights.
+
+Deltas live in slot tables (one row per resident tenant, as in
+:class:`~multi_agent.core.serving.StateTable`). A batched forward gathers the
+rows of the tenants in the batch and applies them through forward hooks on
+the shared base layers, so requests for different tenants run in one call.
+With ``max_resident`` set, least-recently-used tenants are spilled to
+``spill_dir`` as safetensors files and loaded back on their next request.
+"""
+
+import collections
+import copy
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+from torch import nn
+
+from .checkpoint import _TASK_ID, load_tensors, save_tensors
+
+
+class TenantRegistry:
+    """Low-rank per-tenant deltas over a frozen shared base model.
+
+    Usage::
+
+        registry = TenantRegistry(meta_model, rank=4, max_resident=1000, spill_dir="tenants")
+        registry.adapt(["acme", "globex"], x, y)            # one call, two tenants
+        predictions = registry.forward(["acme", "globex"], x)
+
+    Args:
+        base_model: Shared meta-initialization (copied and frozen)
+        rank: Rank of each tenant's per-layer weight update
+        max_resident: Most tenants kept in memory; None keeps all
+        spill_dir: Directory cold tenants are written to (needed with
+            ``max_resident``)
+        capacity: Initial slots in the delta tables (doubled when full)
+        seed: Seed for the down-projections of new tenants
+    """
+
+    def __init__(self,
+                 base_model: nn.Module,
+                 rank: int = 4,
+                 max_resident: Optional[int] = None,
+                 spill_dir: Optional[str] = None,
+                 capacity: int = 64,
+                 seed: int = 0):
+        if max_resident is not None and spill_dir is None:
+            raise ValueError("max_resident needs a spill_dir to evict tenants to")
+        self.base = copy.deepcopy(base_model).requires_grad_(False)
+        self.rank = rank
+        self.max_resident = max_resident
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.layers = [m for m in self.base.modules() if isinstance(m, nn.Linear)]
+        if any(layer.bias is None for layer in self.layers):
+            raise ValueError("tenant bias shifts need every Linear to have a bias")
+        capacity = max(1, capacity)
+        # Per layer: down (slots, rank, in), up (slots, out, rank), bias (slots, out)
+        self.tables = [(torch.zeros(capacity, rank, layer.in_features),
+                        torch.zeros(capacity, layer.out_features, rank),
+                        torch.zeros(capacity, layer.out_features)) for layer in self.layers]
+        self._slots: "collections.OrderedDict[str, int]" = collections.OrderedDict()
+        self._free = list(range(capacity - 1, -1, -1))
+        self._spilled = set()
+        self._generator = torch.Generator().manual_seed(seed)
+        self._lock = threading.RLock()
+        self._active: Optional[List[Tuple[torch.Tensor, ...]]] = None
+        self.spills = 0
+        self.loads = 0
+        for index, layer in enumerate(self.layers):
+            layer.register_forward_hook(self._hook(index))
+
+    def _hook(self, index: int) -> Any:
+        def apply_delta(module: nn.Module, inputs: Tuple[torch.Tensor, ...],
+                        output: torch.Tensor) -> Optional[torch.Tensor]:
+            if self._active is None:
+                return None
+            down, up, bias = self._active[index]
+            h = inputs[0]
+            low = torch.einsum("n...i,nri->n...r", h, down)
+            shift = bias.reshape(bias.shape[0], *([1] * (h.dim() - 2)), bias.shape[1])
+            return output + torch.einsum("n...r,nor->n...o", low, up) + shift
+        return apply_delta
+
+    @property
+    def capacity(self) -> int:
+        return self.tables[0][0].shape[0]
+
+    def __len__(self) -> int:
+        return len(self._slots) + len(self._spilled)
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._slots or tenant_id in self._spilled
+
+    def tenant_ids(self) -> List[str]:
+        return sorted([*self._slots, *self._spilled])
+
+    def _spill_path(self, tenant_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{tenant_id}.safetensors")
+
+    def _allocate(self, tenant_id: str) -> int:
+        if not self._free:
+            capacity = self.capacity
+            self.tables = [tuple(torch.cat([table, torch.zeros_like(table)]) for table in tables)
+                           for tables in self.tables]
+            self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+        slot = self._free.pop()
+        self._slots[tenant_id] = slot
+        return slot
+
+    def _evict(self, keep: Sequence[str], room: int = 0) -> None:
+        """Spill least-recently-used tenants outside ``keep`` until ``room`` more fit."""
+        if self.max_resident is None:
+            return
+        for tenant_id in list(self._slots):
+            if len(self._slots) + room <= self.max_resident:
+                break
+            if tenant_id not in keep:
+                self._spill(tenant_id)
+
+    def _spill(self, tenant_id: str) -> None:
+        slot = self._slots.pop(tenant_id)
+        tensors = {}
+        for index, tables in enumerate(self.tables):
+            for name, table in zip(("down", "up", "bias"), tables):
+                tensors[f"{index}.{name}"] = table[slot]
+        save_tensors(self._spill_path(tenant_id), tensors,
+                     {"tenant_id": tenant_id, "rank": self.rank})
+        self._free.append(slot)
+        self._spilled.add(tenant_id)
+        self.spills += 1
+
+    def _load(self, tenant_id: str) -> int:
+        path = self._spill_path(tenant_id)
+        tensors, _ = load_tensors(path)
+        slot = self._allocate(tenant_id)
+        for index, tables in enumerate(self.tables):
+            for name, table in zip(("down", "up", "bias"), tables):
+                table[slot] = tensors[f"{index}.{name}"]
+        del tensors
+        os.remove(path)
+        self._spilled.discard(tenant_id)
+        self.loads += 1
+        return slot
+
+    def _create(self, tenant_id: str) -> None:
+        if not _TASK_ID.match(tenant_id):
+            raise ValueError(f"tenant ids may only contain letters, digits, '_', '.' and '-': "
+                             f"{tenant_id!r}")
+        if tenant_id in self:
+            raise KeyError(f"tenant {tenant_id!r} already exists")
+        slot = self._allocate(tenant_id)
+        for layer, (down, up, bias) in zip(self.layers, self.tables):
+            down[slot] = (torch.randn(down.shape[1:], generator=self._generator)
+                          / layer.in_features ** 0.5)
+            up[slot] = 0.0
+            bias[slot] = 0.0
+
+    def create(self, tenant_id: str) -> None:
+        """Register ``tenant_id`` with a zero delta (it starts as the base model)."""
+        with self._lock:
+            self._evict(keep=(), room=1)
+            self._create(tenant_id)
+
+    def remove(self, tenant_id: str) -> None:
+        with self._lock:
+            if tenant_id in self._slots:
+                self._free.append(self._slots.pop(tenant_id))
+            elif tenant_id in self._spilled:
+                self._spilled.discard(tenant_id)
+                os.remove(self._spill_path(tenant_id))
+            else:
+                raise KeyError(tenant_id)
+
+    def _resident_slots(self, tenant_ids: Sequence[str], create: bool) -> List[int]:
+        """Slots of the distinct ``tenant_ids`` in first-seen order, loading spilled ones."""
+        unique = list(dict.fromkeys(tenant_ids))
+        if self.max_resident is not None and len(unique) > self.max_resident:
+            raise ValueError(f"a batch touches {len(unique)} tenants but at most "
+                             f"{self.max_resident} can be resident")
+        for tenant_id in unique:
+            if tenant_id in self._slots:
+                self._slots.move_to_end(tenant_id)
+            elif tenant_id in self._spilled:
+                self._evict(keep=unique, room=1)
+                self._load(tenant_id)
+            elif create:
+                self._evict(keep=unique, room=1)
+                self._create(tenant_id)
+            else:
+                raise KeyError(tenant_id)
+        return [self._slots[tenant_id] for tenant_id in unique]
+
+    @staticmethod
+    def _rows(tenant_ids: Sequence[str]) -> torch.Tensor:
+        # Row i -> position of its tenant among the distinct tenants
+        position = {tenant_id: i for i, tenant_id in enumerate(dict.fromkeys(tenant_ids))}
+        return torch.tensor([position[tenant_id] for tenant_id in tenant_ids])
+
+    def _run(self, deltas: List[Tuple[torch.Tensor, ...]], rows: torch.Tensor,
+             x: torch.Tensor) -> torch.Tensor:
+        self._active = [tuple(t[rows] for t in delta) for delta in deltas]
+        try:
+            return self.base(x)
+        finally:
+            self._active = None
+
+    def forward(self, tenant_ids: Sequence[str], x: Any) -> torch.Tensor:
+        """Predictions for a batch whose row ``i`` belongs to ``tenant_ids[i]``.
+
+        Args:
+            tenant_ids: Tenant of every row of ``x``
+            x: Inputs of shape ``(len(tenant_ids), ..., input_dim)``
+
+        Returns:
+            Outputs of each row under its tenant's adapted model
+        """
+        from .utils import to_tensor
+
+        x = to_tensor(x)
+        if len(tenant_ids) != x.shape[0]:
+            raise ValueError(f"{len(tenant_ids)} tenant ids for {x.shape[0]} rows")
+        with self._lock, torch.no_grad():
+            slots = torch.tensor(self._resident_slots(tenant_ids, create=False))
+            rows = self._rows(tenant_ids)
+            deltas = [tuple(table[slots] for table in tables) for tables in self.tables]
+            return self._run(deltas, rows, x)
+
+    __call__ = forward
+
+    def adapt(self,
+              tenant_ids: Sequence[str],
+              observations: Any,
+              targets: Any,
+              steps: int = 5,
+              learning_rate: float = 0.01) -> Dict[str, Dict[str, float]]:
+        """Adapt the deltas of every tenant in the batch with SGD, in one pass per step.
+
+        Each tenant minimizes the mean squared error over its own rows; the
+        summed objective keeps their gradients independent. Unknown tenants
+        are created from the base model.
+
+        Returns:
+            Per tenant: ``initial_loss`` and ``final_loss`` on its rows
+        """
+        from .utils import to_tensor
+
+        x, y = to_tensor(observations), to_tensor(targets)
+        if y.dim() == 1:
+            y = y.unsqueeze(-1)
+        if not len(tenant_ids) == x.shape[0] == y.shape[0]:
+            raise ValueError("tenant_ids, observations and targets need one entry per row")
+        with self._lock:
+            unique = list(dict.fromkeys(tenant_ids))
+            slots = torch.tensor(self._resident_slots(tenant_ids, create=True))
+            rows = self._rows(tenant_ids)
+            counts = torch.bincount(rows, minlength=len(unique)).to(y.dtype)
+            deltas = [tuple(table[slots].requires_grad_() for table in tables)
+                      for tables in self.tables]
+
+            def tenant_losses() -> torch.Tensor:
+                errors = ((self._run(deltas, rows, x) - y) ** 2).reshape(len(rows), -1).mean(-1)
+                return torch.zeros(len(unique)).index_add(0, rows, errors) / counts
+
+            initial = tenant_losses().detach()
+            for _ in range(steps):
+                loss = tenant_losses().sum()
+                gradients = torch.autograd.grad(loss, [t for delta in deltas for t in delta])
+                with torch.no_grad():
+                    for tensor, gradient in zip((t for delta in deltas for t in delta), gradients):
+                        tensor.sub_(learning_rate * gradient)
+            with torch.no_grad():
+                final = tenant_losses()
+                for tables, delta in zip(self.tables, deltas):
+                    for table, tensor in zip(tables, delta):
+                        table[slots] = tensor
+        return {tenant_id: {"initial_loss": initial[i].item(), "final_loss": final[i].item()}
+                for i, tenant_id in enumerate(unique)}
+
+    def parameters(self, tenant_id: str) -> Dict[str, torch.Tensor]:
+        """The tenant's adapted model as a plain state dict (base plus its delta).
+
+        The result has the base model's parameter names, so it can be stored
+        with :class:`~multi_agent.core.checkpoint.CheckpointStore` or swapped
+        into an adapter.
+        """
+        with self._lock:
+            (slot,) = self._resident_slots([tenant_id], create=False)
+            merged = {name: p.detach().clone() for name, p in self.base.named_parameters()}
+            names = {id(p): name for name, p in self.base.named_parameters()}
+            for layer, (down, up, bias) in zip(self.layers, self.tables):
+                merged[names[id(layer.weight)]] += up[slot] @ down[slot]
+                merged[names[id(layer.bias)]] += bias[slot]
+            return merged
+
+    def memory(self) -> Dict[str, Any]:
+        """Bytes held per tenant against the size of a full model copy."""
+        delta = sum(table[0].numel() * table.element_size()
+                    for tables in self.tables for table in tables)
+        base = sum(p.numel() * p.element_size() for p in self.base.parameters())
+        return {
+            "resident_tenants": len(self._slots),
+            "spilled_tenants": len(self._spilled),
+            "delta_bytes_per_tenant": delta,
+            "model_bytes": base,
+            "resident_delta_bytes": len(self._slots) * delta,
+            "table_bytes": self.capacity * delta,
+            "spills": self.spills,
+            "loads": self.loads
+        }
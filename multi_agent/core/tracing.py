@@ -0,0 +1,330 @@
+"""Opt-in span tracing for the tool, agent and workflow hot paths.
+
+Spans record wall time, CPU time of the running thread, the process' peak
+resident memory and the bytes of tensors/arrays passed in and out. They go
+into an in-memory ring buffer on the process-wide :class:`Tracer` and can be
+exported as a Chrome trace (``chrome://tracing``, Perfetto).
+
+Tracing is off by default. While disabled, :func:`span` returns a shared
+no-op context manager and :func:`traced` functions call straight through
+after a single flag check, so instrumented code pays almost nothing.
+Spans recorded in worker processes stay in those processes.
+"""
+
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+
+def _peak_rss() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_SCALE
+
+
+def tensor_bytes(value: Any, depth: int = 3) -> int:
+    """Bytes held by tensors/arrays in ``value`` (searched ``depth`` containers deep)."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int) and not isinstance(value, (bytes, bytearray)):
+        return nbytes
+    if depth <= 0:
+        return 0
+    if isinstance(value, dict):
+        return sum(tensor_bytes(item, depth - 1) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(tensor_bytes(item, depth - 1) for item in value)
+    return 0
+
+
+class Span:
+    """One timed region; fields are filled in when the region exits."""
+
+    __slots__ = ("name", "category", "attributes", "start", "wall_seconds", "cpu_seconds",
+                 "peak_rss_bytes", "rss_growth_bytes", "tensor_bytes", "error", "thread_id",
+                 "thread_name", "process_id", "parent", "depth", "_cpu_start", "_rss_start")
+
+    def __init__(self, name: str, category: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.tensor_bytes = 0
+        self.error: Optional[str] = None
+        self.parent: Optional[str] = None
+        self.depth = 0
+        self.start = 0.0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = 0
+        self.rss_growth_bytes = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "start": self.start,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "rss_growth_bytes": self.rss_growth_bytes,
+            "tensor_bytes": self.tensor_bytes,
+            "error": self.error,
+            "thread": self.thread_name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "attributes": dict(self.attributes)
+        }
+
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def add_bytes(self, value: Any) -> None:
+        pass
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self.span = span
+
+    def add_bytes(self, value: Any) -> None:
+        """Count the tensor/array bytes in ``value`` as moved by this span."""
+        self.span.tensor_bytes += tensor_bytes(value)
+
+    def set(self, **attributes: Any) -> None:
+        self.span.attributes.update(attributes)
+
+    def __enter__(self) -> "_ActiveSpan":
+        span, stack = self.span, self._tracer._stack()
+        current = threading.current_thread()
+        span.thread_id, span.thread_name, span.process_id = current.ident, current.name, os.getpid()
+        span.parent = stack[-1].name if stack else None
+        span.depth = len(stack)
+        stack.append(span)
+        span._rss_start = _peak_rss()
+        span._cpu_start = time.thread_time()
+        span.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        span = self.span
+        span.wall_seconds = time.perf_counter() - span.start
+        span.cpu_seconds = time.thread_time() - span._cpu_start
+        span.peak_rss_bytes = _peak_rss()
+        span.rss_growth_bytes = span.peak_rss_bytes - span._rss_start
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        self._tracer._stack().remove(span)
+        self._tracer.record(span)
+
+
+class Tracer:
+    """Collects spans in a bounded ring buffer.
+
+    Args:
+        capacity: Spans kept; the oldest are dropped first
+        enabled: Whether :meth:`span` records anything
+    """
+
+    def __init__(self, capacity: int = 10000, enabled: bool = False):
+        self.enabled = enabled
+        self._spans: Deque[Span] = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.recorded = 0
+        # Maps perf_counter readings onto the wall clock for exported timestamps
+        self._epoch = time.time() - time.perf_counter()
+
+    @property
+    def capacity(self) -> int:
+        return self._spans.maxlen
+
+    @property
+    def dropped(self) -> int:
+        return self.recorded - len(self._spans)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, category: str = "app", **attributes: Any) -> Any:
+        """Context manager timing the enclosed block as span ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, Span(name, category, attributes))
+
+    def record(self, span: Span) -> None:
+        """Append a finished span (also used to import spans timed elsewhere)."""
+        with self._lock:
+            self._spans.append(span)
+            self.recorded += 1
+
+    def record_interval(self, name: str, category: str, start_time: float, end_time: float,
+                        **attributes: Any) -> None:
+        """Record a span from wall-clock (``time.time()``) start and end times."""
+        span = Span(name, category, attributes)
+        span.start = start_time - self._epoch
+        span.wall_seconds = max(end_time - start_time, 0.0)
+        current = threading.current_thread()
+        span.thread_id, span.thread_name, span.process_id = current.ident, current.name, os.getpid()
+        self.record(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self.recorded = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per span name and per category over the buffered spans.
+
+        Wall time of nested spans is counted at every level, so category
+        totals overlap when e.g. a tool span runs inside a workflow span.
+        """
+        by_name: Dict[str, Dict[str, Any]] = {}
+        by_category: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans():
+            for table, key in ((by_name, span.name), (by_category, span.category)):
+                entry = table.get(key)
+                if entry is None:
+                    entry = table[key] = {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                          "max_wall_seconds": 0.0, "tensor_bytes": 0,
+                                          "max_rss_growth_bytes": 0, "errors": 0}
+                entry["count"] += 1
+                entry["wall_seconds"] += span.wall_seconds
+                entry["cpu_seconds"] += span.cpu_seconds
+                entry["max_wall_seconds"] = max(entry["max_wall_seconds"], span.wall_seconds)
+                entry["tensor_bytes"] += span.tensor_bytes
+                entry["max_rss_growth_bytes"] = max(entry["max_rss_growth_bytes"],
+                                                    span.rss_growth_bytes)
+                entry["errors"] += span.error is not None
+        return {
+            "enabled": self.enabled,
+            "spans": sum(entry["count"] for entry in by_category.values()),
+            "dropped": self.dropped,
+            "peak_rss_bytes": _peak_rss(),
+            "by_category": by_category,
+            "by_name": by_name
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Buffered spans in the Chrome trace-event format."""
+        events, threads = [], {}
+        for span in self.spans():
+            threads[(span.process_id, span.thread_id)] = span.thread_name
+            args = {key: value if isinstance(value, (bool, int, float, str)) else repr(value)
+                    for key, value in span.attributes.items()}
+            args.update(cpu_ms=span.cpu_seconds * 1e3, tensor_bytes=span.tensor_bytes,
+                        rss_growth_bytes=span.rss_growth_bytes)
+            if span.error is not None:
+                args["error"] = span.error
+            events.append({
+                "name": span.name, "cat": span.category, "ph": "X",
+                "ts": (span.start + self._epoch) * 1e6, "dur": span.wall_seconds * 1e6,
+                "pid": span.process_id, "tid": span.thread_id, "args": args
+            })
+        for (pid, tid), name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write :meth:`chrome_trace` to ``path``; returns the number of spans written."""
+        trace = self.chrome_trace()
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(trace, f)
+        os.replace(temporary, path)
+        return sum(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer used by :func:`span` and :func:`traced`."""
+    return _TRACER
+
+
+def enable_tracing(capacity: Optional[int] = None) -> Tracer:
+    """Start recording spans (resizing the ring buffer if ``capacity`` is given)."""
+    if capacity is not None and capacity != _TRACER.capacity:
+        with _TRACER._lock:
+            _TRACER._spans = collections.deque(_TRACER._spans, maxlen=capacity)
+    _TRACER.enabled = True
+    return _TRACER
+
+
+def disable_tracing() -> None:
+    _TRACER.enabled = False
+
+
+def span(name: str, category: str = "app", **attributes: Any) -> Any:
+    """Span ``name`` on the process-wide tracer (a no-op while tracing is disabled)."""
+    if not _TRACER.enabled:
+        return _NULL_SPAN
+    return _ActiveSpan(_TRACER, Span(name, category, attributes))
+
+
+def traced(name: Optional[str] = None, category: str = "app",
+           measure_bytes: bool = True) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording every call of the function as a span.
+
+    Args:
+        name: Span name; defaults to the function's ``__qualname__``
+            (e.g. ``SSMTool._run``)
+        category: Span category (``tool``, ``agent``, ``workflow``, ...)
+        measure_bytes: Count the tensor/array bytes of arguments and result
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _TRACER.enabled:
+                return fn(*args, **kwargs)
+            with _ActiveSpan(_TRACER, Span(span_name, category, {})) as active:
+                if measure_bytes:
+                    active.add_bytes(args)
+                    active.add_bytes(kwargs)
+                result = fn(*args, **kwargs)
+                if measure_bytes:
+                    active.add_bytes(result)
+                return result
+
+        return wrapper
+
+    return decorate
+
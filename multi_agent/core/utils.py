@@ -0,0 +1,50 @@
+"""Shared helpers for the core compute engines."""
+
+from typing import Any
+
+import torch
+
+
+def to_tensor(data: Any, dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """Convert array-like data (tensor, NumPy array, nested lists) to a tensor.
+
+    Tensors that already have the requested dtype are returned without a copy,
+    and NumPy arrays share memory with the result where possible.
+    """
+    if isinstance(data, torch.Tensor):
+        return data if data.dtype == dtype else data.to(dtype)
+    if isinstance(data, (str, bytes)) or data is None:
+        raise TypeError(f"Expected array-like data, got {type(data).__name__}")
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover - numpy is a hard dependency
+        np = None
+    if np is not None and isinstance(data, np.ndarray):
+        return torch.as_tensor(data, dtype=dtype)
+    return torch.tensor(data, dtype=dtype)
+
+
+class RunningR2:
+    """Streaming coefficient of determination over chunks of predictions."""
+
+    def __init__(self):
+        self.sse = 0.0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.count = 0
+
+    def update(self, predictions: torch.Tensor, targets: torch.Tensor) -> None:
+        targets = targets.detach().double()
+        self.sse += torch.sum((predictions.detach().double() - targets) ** 2).item()
+        self.total += torch.sum(targets).item()
+        self.total_sq += torch.sum(targets ** 2).item()
+        self.count += targets.numel()
+
+    def value(self) -> float:
+        """R^2 clipped to ``[0, 1]``; 0.0 before any update."""
+        if self.count == 0:
+            return 0.0
+        variance = self.total_sq - self.total ** 2 / self.count
+        if variance <= 0.0:
+            return 1.0 if self.sse == 0.0 else 0.0
+        return float(min(1.0, max(0.0, 1.0 - self.sse / variance)))
@@ -1,7 +1,20 @@
 """Multi-Agent Tools - Interfaces to core SSM-MetaRL components."""
 
-from .ssm_tool import SSMTool
-from .maml_tool import MAMLTool
-from .adaptation_tool import AdaptationTool
+from typing import TYPE_CHECKING
 
-__all__ = ["SSMTool", "MAMLTool", "AdaptationTool"]
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__ = attach(__name__, {
+    "SSMTool": ".ssm_tool",
+    "MAMLTool": ".maml_tool",
+    "AdaptationTool": ".adaptation_tool",
+    "EnvironmentTool": ".environment_tool"
+})
+
+if TYPE_CHECKING:
+    from .ssm_tool import SSMTool
+    from .maml_tool import MAMLTool
+    from .adaptation_tool import AdaptationTool
+    from .environment_tool import EnvironmentTool
+
+__all__ = ["SSMTool", "MAMLTool", "AdaptationTool", "EnvironmentTool"]
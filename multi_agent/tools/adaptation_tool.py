@@ -1,66 +1,303 @@
 """Adaptation Tool - Interface to test-time adaptation components."""
 
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, ClassVar, Dict, Iterable, Optional, Tuple
 from crewai_tools import BaseTool
+from pydantic import PrivateAttr
+
+from ..core.cache import ResultCache, cached_run, default_cache
+from ..core.tracing import traced
 
 class AdaptationTool(BaseTool):
     name: str = "Test-Time Adaptation Tool"
     description: str = "Tool for online adaptation and real-time model optimization"
-    
-    def _run(self, 
+
+    # Adapter state persists across calls so adaptation is genuinely online;
+    # executors keep stateful tools in-process
+    stateful: ClassVar[bool] = True
+    _adapter: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+    _cancel: Any = PrivateAttr(default_factory=threading.Event)
+    # Results are keyed on the inputs *and* the adapter's contents; a hit
+    # installs the adapter state the call would have produced
+    _cache: Optional[ResultCache] = PrivateAttr(default_factory=default_cache)
+
+    @property
+    def adapter(self) -> Any:
+        """The underlying StreamingAdapter, or None before the first call."""
+        return self._adapter
+
+    def set_cache(self, cache: Optional[ResultCache]) -> None:
+        """Use ``cache`` for results; ``None`` disables caching."""
+        self._cache = cache
+
+    def _fingerprint(self) -> Any:
+        return None if self._adapter is None else self._adapter.fingerprint()
+
+    def _restore(self, adapter: Any) -> None:
+        self._adapter = adapter
+
+    def swap_parameters(self, parameters: Dict[str, Any], reset_replay: bool = True) -> None:
+        """Hot-swap the adapted model's parameters, e.g. to another task's.
+
+        Values are copied into the existing model in place, so the adapter,
+        its optimizer and its replay storage are reused; an adapter is only
+        built when none exists yet or the shapes differ.
+
+        Args:
+            parameters: ``MLPRegressor`` state dict to install
+            reset_replay: Drop replayed samples of the previous task
+        """
+        import torch
+        from ..core.utils import to_tensor
+
+        parameters = {name: to_tensor(value) for name, value in parameters.items()}
+        first, last = parameters["net.0.weight"], parameters[f"net.{len(parameters) - 2}.weight"]
+        with self._lock:
+            current = self._adapter
+            adapter = self._ensure_adapter(
+                first.shape[1], last.shape[0],
+                current.optimizer.param_groups[0]["lr"] if current is not None else 0.01,
+                current.replay.capacity if current is not None else 1024,
+                current.replay_batch_size if current is not None else 32,
+                first.shape[0], seed=0
+            )
+            with torch.no_grad():
+                for name, value in adapter.model.named_parameters():
+                    value.copy_(parameters[name])
+            if reset_replay:
+                adapter.replay.clear()
+
+    def cancel(self) -> None:
+        """Ask the adaptation call currently holding the adapter to stop early.
+
+        Used when a caller abandons a timed-out call, so the adapter lock is
+        released instead of blocking every later call.
+        """
+        self._cancel.set()
+
+    def _ensure_adapter(self, observation_dim: int, target_dim: int,
+                        learning_rate: float, replay_capacity: int,
+                        replay_batch_size: int, hidden_dim: int, seed: int) -> Any:
+        import torch
+        from ..core.adaptation import StreamingAdapter
+        from ..core.models import MLPRegressor
+
+        adapter = self._adapter
+        if (adapter is None
+                or adapter.model.input_dim != observation_dim
+                or adapter.model.output_dim != target_dim
+                or adapter.model.hidden_dim != hidden_dim
+                or adapter.replay.capacity != replay_capacity):
+            with torch.random.fork_rng(devices=[]):
+                torch.manual_seed(seed)
+                model = MLPRegressor(observation_dim, target_dim, hidden_dim)
+            adapter = StreamingAdapter(model, learning_rate, replay_capacity,
+                                       replay_batch_size, seed=seed)
+            self._adapter = adapter
+        adapter.set_learning_rate(learning_rate)
+        adapter.replay_batch_size = replay_batch_size
+        return adapter
+
+    def _configure_low_memory(self, adapter: Any, wanted: Optional[Dict[str, Any]],
+                              seed: int) -> Any:
+        """Switch ``adapter`` between plain and low-memory updates, keeping model and replay."""
+        from ..core.low_memory import LowMemoryAdapter
+
+        if getattr(adapter, "config", None) == wanted:
+            return adapter
+        if isinstance(adapter, LowMemoryAdapter):
+            adapter = adapter.detach()
+        if wanted is not None:
+            converted = LowMemoryAdapter(
+                adapter.model, adapter.optimizer.param_groups[0]["lr"], adapter.replay.capacity,
+                adapter.replay_batch_size, adapter.latencies.maxlen, seed=seed,
+                mode=wanted["mode"], rank=wanted["rank"] or 4,
+                memory_ceiling_bytes=wanted["memory_ceiling_bytes"],
+                gradient_free=wanted["gradient_free"])
+            converted.replay, converted.latencies = adapter.replay, adapter.latencies
+            converted.total_updates = adapter.total_updates
+            converted.total_samples = adapter.total_samples
+            adapter = converted
+        self._adapter = adapter
+        return adapter
+
+    @traced(category="tool")
+    @cached_run(fingerprint=lambda self: self._fingerprint(),
+                snapshot=lambda self: self._adapter,
+                restore=lambda self, adapter: self._restore(adapter),
+                lock=lambda self: self._lock,
+                measurements=("update_latency", "throughput.samples_per_second"))
+    def _run(self,
              observations: Any,
              targets: Any,
              learning_rate: float = 0.01,
              adaptation_steps: int = 5,
-             current_performance: Optional[float] = None) -> Dict[str, Any]:
+             current_performance: Optional[float] = None,
+             stream: Optional[Iterable[Tuple[Any, Any]]] = None,
+             replay_capacity: int = 1024,
+             replay_batch_size: int = 32,
+             hidden_dim: int = 64,
+             holdout: Optional[Tuple[Any, Any]] = None,
+             seed: int = 0,
+             adaptation_mode: str = "full",
+             lora_rank: int = 4,
+             memory_ceiling_mb: Optional[float] = None,
+             gradient_free: bool = False,
+             memory_report: bool = False,
+             early_stopping: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute test-time adaptation.
-        
+
         Args:
             observations: Current observation data
             targets: Target values for adaptation
             learning_rate: Learning rate for adaptation
-            adaptation_steps: Number of adaptation steps
-            current_performance: Current model performance
-            
+            adaptation_steps: Number of adaptation steps applied to each batch
+            current_performance: Current model performance, echoed back for
+                callers that track an external metric
+            stream: Optional iterator/generator of ``(observations, targets)``
+                mini-batches consumed after ``observations``/``targets``
+            replay_capacity: Number of samples kept in the replay ring buffer
+            replay_batch_size: Replay samples mixed into every update
+            hidden_dim: Hidden width of the adapted regressor
+            holdout: Optional ``(observations, targets)`` batch on which the
+                initial/final losses are measured; defaults to the first
+                batch adapted on
+            seed: Seed for initializing a new adapter and its replay sampling
+            adaptation_mode: Parameters updated: ``"full"``, ``"affine"``
+                (per-unit scale/shift) or ``"lora"`` (low-rank adapters);
+                subsets are folded into the model after the call
+            lora_rank: Rank of the ``"lora"`` adapters
+            memory_ceiling_mb: Bound on one update's accounted tensor memory;
+                updates are split into micro-batches that fit it
+            gradient_free: Update with a two-forward-pass SPSA estimate, no autograd
+                (no gradients or saved activations are kept)
+            memory_report: Compare peak step memory and loss with
+                full-parameter adaptation on the first batch (same steps)
+            early_stopping: Optional :class:`~multi_agent.core.early_stopping.StepScheduler`
+                settings (``tolerance``, ``patience``, ``grad_tolerance``,
+                ``max_steps``, ``reallocate``): each batch stops updating once
+                its loss plateaus and unused steps go to later, harder batches;
+                ``adaptation_steps`` becomes the per-batch budget
+
         Returns:
             Dictionary with adaptation results and metrics
         """
-        # This will interface with the core Adapter implementation
-        # from the original SSM-MetaRL-TestCompute repository
-        
         try:
-            # Placeholder for actual adaptation implementation
-            initial_performance = current_performance or 0.65
-            
-            # Simulate adaptation improvement
-            performance_improvement = min(0.25, adaptation_steps * 0.03)
-            final_performance = initial_performance + performance_improvement
-            
-            result = {
-                "status": "success",
-                "adaptation_config": {
-                    "learning_rate": learning_rate,
-                    "adaptation_steps": adaptation_steps
-                },
-                "performance_metrics": {
-                    "initial_performance": initial_performance,
-                    "final_performance": final_performance,
-                    "improvement": performance_improvement,
-                    "improvement_percentage": (performance_improvement / initial_performance) * 100
-                },
-                "adaptation_history": [
-                    initial_performance + (i * performance_improvement / adaptation_steps)
-                    for i in range(adaptation_steps + 1)
-                ],
-                "convergence_achieved": performance_improvement > 0.1,
-                "stability_score": 0.88
-            }
-            
+            import itertools
+            from ..core.utils import to_tensor
+
+            batches: Iterable[Tuple[Any, Any]] = []
+            if observations is not None and targets is not None:
+                batches = [(observations, targets)]
+            if stream is not None:
+                batches = itertools.chain(batches, stream)
+            batches = iter(batches)
+
+            first = next(batches, None)
+            if first is None:
+                raise ValueError("no observation/target data to adapt on")
+            x, y = to_tensor(first[0]), to_tensor(first[1])
+            # Concurrent calls (e.g. via _arun) share one adapter
+            with self._lock:
+                self._cancel.clear()
+                adapter = self._ensure_adapter(
+                    x.shape[-1], y.shape[-1] if y.dim() > 1 else 1,
+                    learning_rate, replay_capacity, replay_batch_size, hidden_dim, seed
+                )
+                low_memory = None
+                if (adaptation_mode != "full" or memory_ceiling_mb is not None
+                        or gradient_free):
+                    low_memory = {
+                        "mode": adaptation_mode,
+                        "rank": lora_rank if adaptation_mode == "lora" else None,
+                        "memory_ceiling_bytes": (None if memory_ceiling_mb is None
+                                                 else int(memory_ceiling_mb * 2 ** 20)),
+                        "gradient_free": gradient_free
+                    }
+                adapter = self._configure_low_memory(adapter, low_memory, seed)
+
+                report = None
+                if memory_report:
+                    from ..core.low_memory import memory_report as build_memory_report
+                    report = build_memory_report(
+                        adapter.model, *adapter._as_batch(x, y), adaptation_steps,
+                        learning_rate, {"configured": low_memory} if low_memory else None,
+                        seed=seed)
+
+                scheduler = None
+                if early_stopping is not None:
+                    from ..core.early_stopping import StepScheduler
+                    scheduler = StepScheduler(adaptation_steps, **early_stopping)
+
+                start = time.perf_counter()
+                stats = adapter.adapt_stream(itertools.chain([(x, y)], batches),
+                                             updates_per_batch=adaptation_steps,
+                                             should_stop=self._cancel.is_set,
+                                             reference=holdout,
+                                             scheduler=scheduler)
+                elapsed = time.perf_counter() - start
+
+                initial_loss, final_loss = stats["initial_loss"], stats["final_loss"]
+                improvement = initial_loss - final_loss
+                # Reference-batch loss after every update, comparable across the run
+                history = stats["reference_history"]
+                schedule = scheduler.report() if scheduler is not None else None
+
+                result = {
+                    # A cancelled call stopped mid-stream; never reuse its result
+                    "status": "cancelled" if self._cancel.is_set() else "success",
+                    "adaptation_config": {
+                        "learning_rate": learning_rate,
+                        "adaptation_steps": adaptation_steps,
+                        "replay_capacity": replay_capacity,
+                        "replay_batch_size": replay_batch_size
+                    },
+                    "performance_metrics": {
+                        "current_performance": current_performance,
+                        "initial_loss": initial_loss,
+                        "final_loss": final_loss,
+                        "improvement": improvement,
+                        "improvement_percentage": (improvement / initial_loss) * 100 if initial_loss else 0.0,
+                        "evaluated_on": "holdout" if holdout is not None else "first_batch"
+                    },
+                    "adaptation_history": history,
+                    "update_loss_history": stats["loss_history"],
+                    # Measured per batch by the scheduler when one is used
+                    "convergence_achieved": (
+                        schedule["tasks_converged"] == schedule["tasks"]
+                        if schedule is not None else
+                        len(history) >= 2
+                        and abs(history[-1] - history[-2]) <= 1e-2 * max(abs(history[-2]), 1e-12)
+                    ),
+                    "throughput": {
+                        "samples_per_second": stats["samples"] / max(elapsed, 1e-9),
+                        "batches": stats["batches"],
+                        "samples": stats["samples"],
+                        "updates": stats["updates"]
+                    },
+                    "update_latency": adapter.latency_stats(),
+                    "replay": {
+                        "size": len(adapter.replay),
+                        "capacity": adapter.replay.capacity,
+                        "nbytes": adapter.replay.nbytes
+                    },
+                    "memory": adapter.memory_stats() if low_memory is not None else None,
+                    "memory_report": report,
+                    "early_stopping": schedule
+                }
+
             return result
-            
+
         except Exception as e:
             return {
                 "status": "error",
                 "error_message": str(e),
                 "performance_improvement": 0.0
-            }
\ No newline at end of file
+            }
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Async counterpart of ``_run``; the computation runs on an executor thread."""
+        from ..core.aio import run_in_executor
+        return await run_in_executor(self._run, *args, **kwargs)
@@ -0,0 +1,120 @@
+"""Environment Tool - Interface to vectorized environment rollouts."""
+
+import collections
+import threading
+from typing import Any, ClassVar, Dict, Optional
+from crewai_tools import BaseTool
+from pydantic import PrivateAttr
+
+from ..core.tracing import traced
+
+class EnvironmentTool(BaseTool):
+    name: str = "Environment Rollout Tool"
+    description: str = "Tool for collecting batched trajectories from vectorized environments"
+
+    # Vector envs (and their worker processes) are reused across calls, so
+    # episodes continue and subprocess start-up is paid once; least recently
+    # used first, bounded by _max_runners
+    stateful: ClassVar[bool] = True
+    _runners: Any = PrivateAttr(default_factory=collections.OrderedDict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _max_runners: int = PrivateAttr(default=4)
+
+    def set_runner_limit(self, max_runners: int = 4) -> None:
+        """Keep at most ``max_runners`` vector environments; the least recently used are closed."""
+        with self._lock:
+            self._max_runners = max(1, max_runners)
+            self._evict(self._max_runners)
+
+    def _evict(self, keep: int) -> None:
+        # Async runners own worker processes, so evicted ones are closed
+        while len(self._runners) > keep:
+            _, runner = self._runners.popitem(last=False)
+            runner.close()
+
+    def close(self) -> None:
+        """Close every cached vector environment."""
+        with self._lock:
+            runners, self._runners = self._runners, collections.OrderedDict()
+        for runner in runners.values():
+            runner.close()
+
+    def _runner(self, env_id: str, num_envs: int, vectorization: str, seed: int,
+                env_kwargs: Dict[str, Any]) -> Any:
+        from ..core.envs import make_env_fn
+        from ..core.rollout import VectorRollout
+
+        key = (env_id, num_envs, vectorization, seed, tuple(sorted(env_kwargs.items())))
+        runner = self._runners.get(key)
+        if runner is None:
+            self._evict(self._max_runners - 1)
+            runner = VectorRollout(make_env_fn(env_id, **env_kwargs), num_envs,
+                                   vectorization, seed)
+            self._runners[key] = runner
+        else:
+            self._runners.move_to_end(key)
+        return runner
+
+    @traced(category="tool")
+    def _run(self,
+             env_id: str = "toy",
+             num_envs: int = 8,
+             num_steps: int = 128,
+             vectorization: str = "sync",
+             seed: int = 0,
+             env_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Collect a batch of trajectories.
+
+        Args:
+            env_id: ``"toy"`` for the built-in linear-dynamics environment or
+                any registered gymnasium id
+            num_envs: Number of parallel sub-environments
+            num_steps: Vector steps per sub-environment
+            vectorization: ``"sync"`` (in-process) or ``"async"`` (one
+                subprocess per environment)
+            seed: Seed for the environments and the random policy
+            env_kwargs: Extra keyword arguments for the environment
+
+        Returns:
+            Dictionary with the rollout buffer, tensor views of its
+            transitions and throughput metrics
+        """
+        try:
+            with self._lock:
+                runner = self._runner(env_id, num_envs, vectorization, seed, env_kwargs or {})
+                rollout, stats = runner.collect(num_steps)
+
+                transitions = rollout.transitions()
+                valid = transitions["valid"]
+                result = {
+                    "status": "success",
+                    "environment": {
+                        "env_id": env_id,
+                        "num_envs": num_envs,
+                        "vectorization": vectorization,
+                        "obs_dim": runner.obs_dim,
+                        "action_dim": runner.action_dim
+                    },
+                    "rollout": rollout,
+                    "transitions": transitions,
+                    "mean_reward": transitions["rewards"][valid].mean().item() if valid.any() else 0.0,
+                    "episodes_finished": int(transitions["dones"].sum()),
+                    "env_steps": stats["env_steps"],
+                    "steps_per_second": stats["steps_per_second"],
+                    "steps_per_second_per_core": stats["steps_per_second_per_core"],
+                    "buffer_nbytes": rollout.nbytes
+                }
+
+            return result
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error_message": str(e),
+                "env_steps": 0
+            }
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Async counterpart of ``_run``; the computation runs on an executor thread."""
+        from ..core.aio import run_in_executor
+        return await run_in_executor(self._run, *args, **kwargs)
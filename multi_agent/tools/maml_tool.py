@@ -1,49 +1,192 @@
 """MAML Tool - Interface to Meta-Learning components."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from crewai_tools import BaseTool
+from pydantic import PrivateAttr
+
+from ..core.cache import ResultCache, cached_run, default_cache
+from ..core.tracing import traced
 
 class MAMLTool(BaseTool):
     name: str = "MAML Optimizer"
     description: str = "Tool for Model-Agnostic Meta-Learning optimization and fast adaptation"
-    
-    def _run(self, 
-             tasks: List[Dict[str, Any]], 
+
+    # Identical calls (same tasks and hyperparameters) are served from here
+    _cache: Optional[ResultCache] = PrivateAttr(default_factory=default_cache)
+
+    def set_cache(self, cache: Optional[ResultCache]) -> None:
+        """Use ``cache`` for results; ``None`` disables caching."""
+        self._cache = cache
+
+    @traced(category="tool")
+    @cached_run(measurements=("distributed.rank_seconds",))
+    def _run(self,
+             tasks: Optional[List[Dict[str, Any]]],
              inner_lr: float = 0.01,
              outer_lr: float = 0.001,
-             adaptation_steps: int = 5) -> Dict[str, Any]:
+             adaptation_steps: int = 5,
+             meta_iterations: int = 1,
+             mode: str = "maml",
+             hidden_dim: int = 64,
+             seed: int = 0,
+             reptile_step: float = 0.5,
+             initial_parameters: Optional[Dict[str, Any]] = None,
+             distributed: Optional[Dict[str, Any]] = None,
+             task_sampler: Optional[Any] = None,
+             early_stopping: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute MAML optimization.
-        
+
         Args:
-            tasks: List of training tasks with support/query data
+            tasks: List of training tasks with ``support_x``, ``support_y``,
+                ``query_x`` and ``query_y`` arrays
             inner_lr: Inner loop learning rate
-            outer_lr: Outer loop learning rate  
+            outer_lr: Outer loop (Adam) learning rate for ``maml``/``fomaml``
             adaptation_steps: Number of gradient steps for adaptation
-            
+            meta_iterations: Number of outer (meta) updates
+            mode: ``"maml"``, ``"fomaml"`` (first-order) or ``"reptile"``
+            hidden_dim: Hidden width of the meta-learned regressor
+            seed: Seed for parameter initialization
+            reptile_step: Interpolation factor of the ``reptile`` meta-update
+            initial_parameters: Optional state dict (e.g. a checkpointed
+                meta-initialization) to start from instead of a random init
+            distributed: Optional data-parallel settings (``world_size``,
+                ``chunk_size``, ``straggler_timeout``, ``straggler_policy``,
+                ``timeout``). Inside an initialized ``torch.distributed``
+                group (e.g. under ``torchrun``) this call runs as the current
+                rank; otherwise ``world_size`` local gloo processes are spawned
+            task_sampler: Optional :class:`~multi_agent.core.task_sampler.TaskSampler`;
+                every meta-iteration then trains on its next prefetched
+                meta-batch and ``tasks`` may be None
+            early_stopping: Optional :class:`~multi_agent.core.early_stopping.StepScheduler`
+                settings (``tolerance``, ``patience``, ``grad_tolerance``,
+                ``max_steps``, ``reallocate``): tasks stop their inner loop once
+                converged and unused steps go to tasks still improving;
+                ``adaptation_steps`` becomes the per-task budget
+
         Returns:
             Dictionary with optimization results and metrics
         """
-        # This will interface with the core MetaMAML implementation
-        # from the original SSM-MetaRL-TestCompute repository
-        
         try:
-            # Placeholder for actual MAML implementation
+            import torch
+            from ..core.early_stopping import StepScheduler
+            from ..core.maml import BatchedMAML, collate_tasks
+            from ..core.models import MLPRegressor
+            from ..core.utils import to_tensor
+
+            if task_sampler is not None:
+                if distributed is not None:
+                    raise ValueError("task_sampler cannot be combined with distributed")
+                meta_batch = next(task_sampler)
+                batches = meta_batch.batches
+            elif not tasks:
+                raise ValueError("at least one task is required")
+            if distributed is not None and early_stopping is not None:
+                raise ValueError("early_stopping cannot be combined with distributed")
+            if distributed is not None:
+                return self._run_distributed(tasks, distributed, inner_lr=inner_lr,
+                                             outer_lr=outer_lr,
+                                             adaptation_steps=adaptation_steps,
+                                             meta_iterations=meta_iterations, mode=mode,
+                                             hidden_dim=hidden_dim, seed=seed,
+                                             reptile_step=reptile_step,
+                                             initial_parameters=initial_parameters)
+            if task_sampler is None:
+                batches = [batch for _, batch in collate_tasks(tasks)]
+
+            with torch.random.fork_rng(devices=[]):
+                torch.manual_seed(seed)
+                model = MLPRegressor(batches[0].support_x.shape[-1],
+                                     batches[0].support_y.shape[-1],
+                                     hidden_dim)
+            if initial_parameters is not None:
+                model.load_state_dict({name: to_tensor(value)
+                                       for name, value in initial_parameters.items()})
+            scheduler = (StepScheduler(adaptation_steps, **early_stopping)
+                         if early_stopping is not None else None)
+            learner = BatchedMAML(model, inner_lr, outer_lr, adaptation_steps, mode,
+                                  reptile_step, scheduler)
+
+            meta_loss_history = []
+            tasks_processed = 0
+            for iteration in range(meta_iterations):
+                if task_sampler is not None and iteration > 0:
+                    batches = next(task_sampler).batches
+                step = learner.outer_step(batches)
+                meta_loss_history.append(step["meta_loss"])
+                tasks_processed += sum(batch.num_tasks for batch in batches)
+            curves = step["curves"]
+
             result = {
                 "status": "success",
-                "optimized_parameters": {},
-                "meta_loss": 0.0,
-                "adaptation_performance": [],
-                "tasks_processed": len(tasks),
+                "optimized_parameters": {
+                    name: p.detach().clone() for name, p in model.named_parameters()
+                },
+                "meta_loss": meta_loss_history[-1],
+                "meta_loss_history": meta_loss_history,
+                "adaptation_performance": curves.mean(dim=0).tolist(),
+                "tasks_improved": (curves[:, -1] < curves[:, 0]).float().mean().item(),
+                "tasks_processed": len(tasks) if task_sampler is None else tasks_processed,
                 "inner_lr_used": inner_lr,
                 "outer_lr_used": outer_lr,
-                "adaptation_steps_used": adaptation_steps
+                "adaptation_steps_used": adaptation_steps,
+                "reptile_step_used": reptile_step if mode == "reptile" else None,
+                "mode": mode,
+                "warm_start": initial_parameters is not None
             }
-            
+            if task_sampler is not None:
+                result["sampler"] = task_sampler.metrics()
+            if scheduler is not None:
+                result["early_stopping"] = scheduler.report()
+
             return result
-            
+
         except Exception as e:
             return {
                 "status": "error",
                 "error_message": str(e),
                 "tasks_processed": 0
-            }
\ No newline at end of file
+            }
+
+    def _run_distributed(self, tasks: List[Dict[str, Any]], settings: Dict[str, Any],
+                         **kwargs: Any) -> Dict[str, Any]:
+        import torch.distributed as dist
+        from ..core.distributed import launch_local, meta_train
+
+        options = {key: settings[key] for key in
+                   ("chunk_size", "straggler_timeout", "straggler_policy")
+                   if key in settings}
+        if dist.is_available() and dist.is_initialized():
+            trained = meta_train(tasks, **kwargs, **options)
+        else:
+            trained = launch_local(settings.get("world_size", 2), tasks,
+                                   timeout=settings.get("timeout", 300.0), **kwargs, **options)
+
+        curve = trained["curve"]
+        history = trained["meta_loss_history"]
+        return {
+            "status": "success",
+            "optimized_parameters": trained["parameters"],
+            "meta_loss": history[-1],
+            "meta_loss_history": history,
+            "adaptation_performance": curve.tolist(),
+            "tasks_improved": trained["tasks_improved"],
+            "tasks_processed": trained["tasks_processed"][-1],
+            "inner_lr_used": kwargs["inner_lr"],
+            "outer_lr_used": kwargs["outer_lr"],
+            "adaptation_steps_used": kwargs["adaptation_steps"],
+            "reptile_step_used": kwargs["reptile_step"] if kwargs["mode"] == "reptile" else None,
+            "mode": kwargs["mode"],
+            "warm_start": kwargs["initial_parameters"] is not None,
+            "distributed": {
+                "world_size": trained["world_size"],
+                "tasks_processed_per_step": trained["tasks_processed"],
+                "tasks_dropped": trained["tasks_dropped"],
+                "chunks_reassigned": trained["chunks_reassigned"],
+                "rank_seconds": trained["rank_seconds"]
+            }
+        }
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Async counterpart of ``_run``; the computation runs on an executor thread."""
+        from ..core.aio import run_in_executor
+        return await run_in_executor(self._run, *args, **kwargs)
@@ -1,6 +1,16 @@
 """Multi-Agent Workflows - Collaborative task execution."""
 
-from .collaborative_learning import CollaborativeLearning
-from .emergent_optimization import EmergentOptimization
+from typing import TYPE_CHECKING
 
-__all__ = ["CollaborativeLearning", "EmergentOptimization"]
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__ = attach(__name__, {
+    "CollaborativeLearning": ".collaborative_learning",
+    "EmergentOptimization": ".emergent_optimization"
+})
+
+if TYPE_CHECKING:
+    from .collaborative_learning import CollaborativeLearning
+    from .emergent_optimization import EmergentOptimization
+
+__all__ = ["CollaborativeLearning", "EmergentOptimization"]
@@ -1,13 +1,30 @@
 """Collaborative Learning Workflow - Agents working together."""
 
-from typing import List, Dict, Any, Optional
-from crewai import Crew, Process
+import asyncio
+import time
+import weakref
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from ..agents import (
     MetaLearningAgent,
     AdaptationAgent,
     StateModelingAgent,
     CoordinatorAgent
 )
+from ..core.tracing import enable_tracing, get_tracer, span, traced
+from .executor import RunHandle, SubtaskExecutor
+from .subtasks import Subtask
+
+if TYPE_CHECKING:
+    from crewai import Crew
+
+EXECUTION_MODES = ("direct", "crew")
+
+
+def _is_array_like(data: Any) -> bool:
+    return hasattr(data, "shape") or (
+        isinstance(data, (list, tuple)) and len(data) > 0
+        and not isinstance(data[0], (str, bytes))
+    )
 
 class CollaborativeLearning:
     """Workflow for collaborative multi-agent learning.
@@ -15,6 +32,31 @@ class CollaborativeLearning:
     This workflow orchestrates multiple specialized agents to work together
     on complex reinforcement learning tasks, enabling emergent intelligence
     that exceeds individual agent capabilities.
+
+    Two execution modes are available (``config["execution_mode"]``):
+
+    - ``"direct"`` (default): the meta-learning, adaptation and state-modeling
+      subtasks are dispatched straight to the agents' tools as a static DAG
+      and aggregated by the coordinator, with no LLM round trips.
+    - ``"crew"``: the CrewAI hierarchical process plans and delegates the
+      subtasks through the coordinator's LLM.
+
+    In direct mode independent subtasks run concurrently on a
+    :class:`SubtaskExecutor` configured from ``config["executor"]`` (pool
+    kind, worker count, per-subtask timeouts), and the coordinator step runs
+    once all of them have joined. The coordinator's
+    :class:`~multi_agent.core.resources.ResourceAllocator`
+    (``config["resources"]`` on the coordinator) grants each subtask its
+    cores, memory and wall-clock budget and rebalances them after every run.
+
+    :meth:`asolve_task` is the asyncio-native entry point: tool work is
+    offloaded to executors, and at most ``config["max_concurrent_workflows"]``
+    runs are in flight at once; further callers wait for a slot.
+
+    ``config["tracing"]`` (``True`` or ``{"capacity": ..., "path": ...}``)
+    enables span tracing of the workflow phases, agent methods, tool calls
+    and (crew path) LLM calls; with ``path`` a Chrome trace is written after
+    every run.
     """
     
     def __init__(self, 
@@ -34,106 +76,375 @@ class CollaborativeLearning:
         
         self.agents = agents
         self.coordinator = coordinator or CoordinatorAgent()
-        
-        # Create CrewAI crew for orchestration
-        self.crew = Crew(
-            agents=[agent.agent for agent in self.agents] + [self.coordinator.agent],
+        self.executor = SubtaskExecutor(**self.config.get("executor", {}))
+        if self.executor.allocator is None:
+            # The coordinator's allocator budgets and rebalances every run
+            self.executor.allocator = self.coordinator.allocator
+        self.max_concurrent_workflows = self.config.get("max_concurrent_workflows", 64)
+        # One limiter per event loop: asyncio primitives cannot cross loops
+        self._limiters = weakref.WeakKeyDictionary()
+        tracing = self.config.get("tracing")
+        if tracing:
+            enable_tracing((tracing if isinstance(tracing, dict) else {}).get("capacity"))
+
+    def _export_trace(self) -> None:
+        tracing = self.config.get("tracing")
+        if isinstance(tracing, dict) and tracing.get("path"):
+            get_tracer().export_chrome_trace(tracing["path"])
+
+    def _share_llm_config(self) -> None:
+        # config["llm"]/["llm_cache"]/["verbose"] apply to every agent without
+        # its own setting, so one switch moves a whole run to a cached or
+        # replayed LLM
+        for agent in list(self.agents) + [self.coordinator]:
+            for key in ("llm", "llm_cache", "verbose"):
+                if key in self.config:
+                    agent.config.setdefault(key, self.config[key])
+
+    def build_crew(self, tasks: List[Any]) -> "Crew":
+        """CrewAI crew that runs ``tasks`` with the coordinator as manager."""
+        from crewai import Crew, Process
+
+        self._share_llm_config()
+        return Crew(
+            agents=[agent.agent for agent in self.agents],
+            tasks=tasks,
             process=Process.hierarchical,
             manager_agent=self.coordinator.agent,
-            verbose=True
+            verbose=self.config.get("verbose", True)
         )
+
+    def _find_agent(self, agent_type: type) -> Optional[Any]:
+        return next((agent for agent in self.agents if isinstance(agent, agent_type)), None)
     
     def solve_task(self, 
                    task: str,
                    collaboration_mode: str = "emergent",
+                   execution_mode: Optional[str] = None,
+                   run_handle: Optional[RunHandle] = None,
                    **kwargs) -> Dict[str, Any]:
         """Solve a complex task through agent collaboration.
         
         Args:
             task: Task description (e.g., "HalfCheetah-v4")
             collaboration_mode: How agents should collaborate
+            execution_mode: ``"direct"`` or ``"crew"``; defaults to
+                ``config["execution_mode"]``
+            run_handle: Optional :class:`~multi_agent.workflows.executor.RunHandle`
+                cancelling just this call's subtasks (direct mode); other
+                calls sharing the executor keep running
             **kwargs: Additional task parameters
             
         Returns:
-            Results including performance metrics and emergent strategies
+            Results including performance metrics. On the crew path tool
+            metrics are not observable, so ``improvement`` is None and
+            ``collaboration_effectiveness`` is the share of crew tasks that
+            produced output
         """
-        
-        # Create collaborative tasks for each agent
-        tasks = []
-        
-        # Meta-learning task
-        if any(isinstance(agent, MetaLearningAgent) for agent in self.agents):
-            meta_agent = next(agent for agent in self.agents 
-                            if isinstance(agent, MetaLearningAgent))
-            tasks.append(
-                meta_agent.create_adaptation_task(
-                    task_description=f"Meta-learning for {task}",
-                    support_data=kwargs.get('support_data'),
-                    query_data=kwargs.get('query_data')
+        mode = execution_mode or self.config.get("execution_mode", "direct")
+        if mode not in EXECUTION_MODES:
+            return {
+                "status": "error",
+                "error_message": f"execution_mode must be one of {EXECUTION_MODES}, got {mode!r}",
+                "improvement": 0.0
+            }
+        with span("CollaborativeLearning.solve_task", category="workflow", task=task,
+                  execution_mode=mode):
+            if mode == "direct":
+                result = self._solve_direct(task, run_handle, **kwargs)
+            else:
+                result = self._solve_crew(task, collaboration_mode, **kwargs)
+        self._export_trace()
+        return result
+
+    def _solve_crew(self, task: str, collaboration_mode: str, **kwargs) -> Dict[str, Any]:
+        """Plan and delegate the subtasks through the CrewAI hierarchical process."""
+        self._share_llm_config()
+
+        with span("CollaborativeLearning.build_tasks", category="workflow"):
+            # Create collaborative tasks for each agent
+            tasks = []
+
+            # Meta-learning task
+            if any(isinstance(agent, MetaLearningAgent) for agent in self.agents):
+                meta_agent = next(agent for agent in self.agents 
+                                if isinstance(agent, MetaLearningAgent))
+                tasks.append(
+                    meta_agent.create_adaptation_task(
+                        task_description=f"Meta-learning for {task}",
+                        support_data=kwargs.get('support_data'),
+                        query_data=kwargs.get('query_data')
+                    )
                 )
-            )
-        
-        # Adaptation task  
-        if any(isinstance(agent, AdaptationAgent) for agent in self.agents):
-            adapt_agent = next(agent for agent in self.agents 
-                             if isinstance(agent, AdaptationAgent))
-            tasks.append(
-                adapt_agent.create_optimization_task(
-                    current_performance=kwargs.get('current_performance', 0.0),
-                    target_performance=kwargs.get('target_performance', 0.9),
-                    environment_data=kwargs.get('environment_data')
+
+            # Adaptation task  
+            if any(isinstance(agent, AdaptationAgent) for agent in self.agents):
+                adapt_agent = next(agent for agent in self.agents 
+                                 if isinstance(agent, AdaptationAgent))
+                tasks.append(
+                    adapt_agent.create_optimization_task(
+                        current_performance=kwargs.get('current_performance', 0.0),
+                        target_performance=kwargs.get('target_performance', 0.9),
+                        environment_data=kwargs.get('environment_data')
+                    )
                 )
-            )
-        
-        # State modeling task
-        if any(isinstance(agent, StateModelingAgent) for agent in self.agents):
-            state_agent = next(agent for agent in self.agents 
-                             if isinstance(agent, StateModelingAgent))
-            tasks.append(
-                state_agent.create_modeling_task(
-                    sequence_data=kwargs.get('sequence_data'),
-                    prediction_horizon=kwargs.get('prediction_horizon', 10)
+
+            # State modeling task
+            if any(isinstance(agent, StateModelingAgent) for agent in self.agents):
+                state_agent = next(agent for agent in self.agents 
+                                 if isinstance(agent, StateModelingAgent))
+                tasks.append(
+                    state_agent.create_modeling_task(
+                        sequence_data=kwargs.get('sequence_data'),
+                        prediction_horizon=kwargs.get('prediction_horizon', 10)
+                    )
                 )
+
+            # Coordinator task
+            coordination_task = self.coordinator.create_coordination_task(
+                subtasks=tasks,
+                collaboration_mode=collaboration_mode
             )
-        
-        # Coordinator task
-        coordination_task = self.coordinator.create_coordination_task(
-            subtasks=tasks,
-            collaboration_mode=collaboration_mode
-        )
-        tasks.append(coordination_task)
+            tasks.append(coordination_task)
         
         # Execute collaborative workflow
         try:
-            results = self.crew.kickoff()
-            
+            from ..agents.llm_cache import trace_llm_calls
+
+            with span("CollaborativeLearning.crew_kickoff", category="workflow"), \
+                    trace_llm_calls(get_tracer()):
+                results = self.build_crew(tasks).kickoff()
+
             return {
                 "status": "success",
                 "results": results,
-                "improvement": self._calculate_improvement(),
-                "emergent_strategies": self._identify_emergent_strategies(),
-                "collaboration_effectiveness": self._measure_collaboration()
+                "improvement": None,
+                "collaboration_effectiveness": self._crew_effectiveness(results)
             }
             
         except Exception as e:
             return {
                 "status": "error",
                 "error_message": str(e),
-                "improvement": 0.0,
-                "emergent_strategies": 0
+                "improvement": 0.0
             }
     
-    def _calculate_improvement(self) -> float:
+    async def asolve_task(self,
+                          task: str,
+                          collaboration_mode: str = "emergent",
+                          execution_mode: Optional[str] = None,
+                          run_handle: Optional[RunHandle] = None,
+                          **kwargs) -> Dict[str, Any]:
+        """Async counterpart of :meth:`solve_task`.
+
+        Waits for a slot in the workflow's concurrency limiter before running,
+        which bounds the number of in-flight workflows per event loop
+        (backpressure). ``run_handle`` cancels just this call, as in
+        :meth:`solve_task`.
+        """
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = self._limiters[loop] = asyncio.Semaphore(self.max_concurrent_workflows)
+
+        queued = time.perf_counter()
+        async with limiter:
+            queue_seconds = time.perf_counter() - queued
+            mode = execution_mode or self.config.get("execution_mode", "direct")
+            if mode == "direct":
+                result = await self._asolve_direct(task, run_handle, **kwargs)
+                self._export_trace()
+            else:
+                from ..core.aio import run_in_executor
+                result = await run_in_executor(
+                    self.solve_task, task, collaboration_mode, mode, run_handle, **kwargs
+                )
+        result["queue_seconds"] = queue_seconds
+        return result
+
+    def build_subtasks(self, task: str, **kwargs) -> List[Subtask]:
+        """Build the static subtask DAG for the direct execution path.
+
+        The subtasks mirror the agents' ``create_*_task`` prompts but carry
+        concrete tool arguments. Subtasks whose inputs are missing, not
+        array-like or rejected while building the tool arguments are kept in
+        the graph and marked as skipped, so one bad input never fails the
+        whole run.
+        """
+        subtasks = []
+
+        meta_agent = self._find_agent(MetaLearningAgent)
+        if meta_agent is not None:
+            tasks = kwargs.get("meta_tasks") or self._meta_tasks(
+                kwargs.get("support_data"), kwargs.get("query_data")
+            )
+            subtask = Subtask("meta_learning", meta_agent.maml_tool)
+            if tasks is None:
+                subtask.skip_reason = "no array-like support/query data"
+            else:
+                try:
+                    subtask.kwargs = meta_agent.tool_kwargs(tasks)
+                except Exception as e:
+                    subtask.skip_reason = f"invalid meta-learning data: {e}"
+            subtasks.append(subtask)
+
+        adapt_agent = self._find_agent(AdaptationAgent)
+        if adapt_agent is not None:
+            environment_data = kwargs.get("environment_data")
+            observations, targets = kwargs.get("observations"), kwargs.get("targets")
+            stream = kwargs.get("stream")
+            if isinstance(environment_data, dict):
+                observations = environment_data.get("observations", observations)
+                targets = environment_data.get("targets", targets)
+                stream = environment_data.get("stream", stream)
+            elif isinstance(environment_data, tuple) and len(environment_data) == 2:
+                observations, targets = environment_data
+            subtask = Subtask("adaptation", adapt_agent.adaptation_tool)
+            if stream is None and not (_is_array_like(observations) and _is_array_like(targets)):
+                subtask.skip_reason = "no array-like observations/targets"
+            else:
+                try:
+                    subtask.kwargs = adapt_agent.tool_kwargs(observations, targets, stream)
+                except Exception as e:
+                    subtask.skip_reason = f"invalid adaptation data: {e}"
+            subtasks.append(subtask)
+
+        state_agent = self._find_agent(StateModelingAgent)
+        if state_agent is not None:
+            sequence = kwargs.get("sequence_data")
+            subtask = Subtask("state_modeling", state_agent.ssm_tool)
+            if not _is_array_like(sequence):
+                subtask.skip_reason = "no array-like sequence data"
+            else:
+                try:
+                    subtask.kwargs = state_agent.tool_kwargs(sequence)
+                    subtask.kwargs["prediction_steps"] = kwargs.get(
+                        "prediction_horizon", subtask.kwargs["prediction_steps"]
+                    )
+                except Exception as e:
+                    subtask.skip_reason = f"invalid sequence data: {e}"
+            subtasks.append(subtask)
+
+        return subtasks
+
+    @staticmethod
+    def _meta_tasks(support_data: Any, query_data: Any) -> Optional[List[Dict[str, Any]]]:
+        """Pair ``(x, y)`` support/query splits (one pair or a list of pairs) into task dicts."""
+        if isinstance(support_data, tuple) and isinstance(query_data, tuple):
+            support_data, query_data = [support_data], [query_data]
+        if not (isinstance(support_data, list) and isinstance(query_data, list)):
+            return None
+        pairs = list(zip(support_data, query_data))
+        if not pairs or not all(
+            isinstance(s, tuple) and isinstance(q, tuple) and len(s) == 2 and len(q) == 2
+            and all(_is_array_like(a) for a in s + q)
+            for s, q in pairs
+        ):
+            return None
+        return [
+            {"support_x": s[0], "support_y": s[1], "query_x": q[0], "query_y": q[1]}
+            for s, q in pairs
+        ]
+
+    def _solve_direct(self, task: str, run_handle: Optional[RunHandle] = None,
+                      **kwargs) -> Dict[str, Any]:
+        """Run the subtask DAG against the tools and aggregate with the coordinator."""
+        try:
+            start = time.perf_counter()
+            with span("CollaborativeLearning.build_subtasks", category="workflow"):
+                subtasks = self.build_subtasks(task, **kwargs)
+            with span("CollaborativeLearning.execute", category="workflow",
+                      subtasks=len(subtasks)):
+                records = self.executor.run(subtasks, run_handle)
+            return self._direct_result(task, records, time.perf_counter() - start)
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error_message": str(e),
+                "improvement": 0.0
+            }
+
+    async def _asolve_direct(self, task: str, run_handle: Optional[RunHandle] = None,
+                             **kwargs) -> Dict[str, Any]:
+        try:
+            start = time.perf_counter()
+            with span("CollaborativeLearning.build_subtasks", category="workflow"):
+                subtasks = self.build_subtasks(task, **kwargs)
+            # No span across the await: other workflows interleave on this thread
+            records = await self.executor.arun(subtasks, run_handle)
+            return self._direct_result(task, records, time.perf_counter() - start)
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error_message": str(e),
+                "improvement": 0.0
+            }
+
+    @traced("CollaborativeLearning.aggregate", category="workflow", measure_bytes=False)
+    def _direct_result(self, task: str,
+                       records: Dict[str, Dict[str, Any]],
+                       wall_seconds: float) -> Dict[str, Any]:
+        broker = self.coordinator.broker
+        for name, record in records.items():
+            broker.publish(f"subtask.{name}",
+                           {"status": record["status"], "elapsed": record.get("elapsed", 0.0)},
+                           sender=name)
+        broker.flush()
+        meta_agent = self._find_agent(MetaLearningAgent)
+        if meta_agent is not None and records.get("meta_learning", {}).get("status") == "success":
+            meta_agent.save_checkpoint(records["meta_learning"]["result"])
+        coordination = self.coordinator.coordinate(records)
+        coordination["wall_seconds"] = wall_seconds
+        if records and coordination["succeeded"] == len(records):
+            status = "success"
+        elif coordination["succeeded"] > 0:
+            status = "partial"
+        else:
+            status = "error"
+        result = {
+            "status": status,
+            "task": task,
+            "execution_mode": "direct",
+            "results": {
+                "subtasks": records,
+                "coordination": coordination
+            },
+            "improvement": self._calculate_improvement(records),
+            "collaboration_effectiveness": self._measure_collaboration(coordination)
+        }
+        if status == "error":
+            reasons = [f"{name}: {record.get('reason') or record['status']}"
+                       for name, record in records.items()]
+            result["error_message"] = "no subtask succeeded" + (
+                f" ({'; '.join(reasons)})" if reasons else ""
+            )
+        return result
+
+    def _calculate_improvement(self, subtask_results: Dict[str, Dict[str, Any]]) -> float:
         """Calculate performance improvement from collaboration."""
-        # Placeholder - would implement actual performance measurement
-        return 47.5  # Example improvement percentage
-    
-    def _identify_emergent_strategies(self) -> int:
-        """Identify novel strategies discovered through collaboration."""
-        # Placeholder - would analyze agent interactions for novel patterns
-        return 5  # Example number of emergent strategies
+        improvements = []
+        meta = subtask_results.get("meta_learning", {})
+        if meta.get("status") == "success":
+            curve = meta["result"]["adaptation_performance"]
+            if curve and curve[0] > 0:
+                improvements.append((curve[0] - curve[-1]) / curve[0] * 100)
+        adaptation = subtask_results.get("adaptation", {})
+        if adaptation.get("status") == "success":
+            improvements.append(
+                adaptation["result"]["performance_metrics"]["improvement_percentage"]
+            )
+        return sum(improvements) / len(improvements) if improvements else 0.0
     
-    def _measure_collaboration(self) -> float:
+    def _measure_collaboration(self, coordination: Dict[str, Any]) -> float:
         """Measure effectiveness of agent collaboration."""
-        # Placeholder - would measure inter-agent communication quality
-        return 0.85  # Example collaboration score
\ No newline at end of file
+        return coordination["success_rate"]
+
+    @staticmethod
+    def _crew_effectiveness(results: Any) -> float:
+        """Share of crew tasks that produced a non-empty output."""
+        outputs = getattr(results, "tasks_output", None) or []
+        if not outputs:
+            return 0.0
+        return sum(1 for output in outputs if str(getattr(output, "raw", "")).strip()) / len(outputs)
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""Emergent Optimization Workflow - Population-based training of agent teams."""
+
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..agents import MetaLearningAgent
+from ..core.tracing import span
+from .executor import EXECUTOR_KINDS, _init_process_worker
+
+# (low, high, log-scale) bounds of the hyperparameters every team tunes
+DEFAULT_SEARCH_SPACE: Dict[str, Tuple[float, float, bool]] = {
+    "inner_lr": (1e-3, 0.5, True),
+    "outer_lr": (1e-4, 1e-2, True),
+    "learning_rate": (1e-4, 0.1, True),
+    "adaptation_steps": (1, 10, False)
+}
+
+
+@dataclass
+class Member:
+    """One team of the population.
+
+    Attributes:
+        member_id: Index of the team
+        hyperparameters: Current MAML/adaptation hyperparameters
+        parameters: Shared-memory handles of the team's meta-parameters
+            (None before the first generation)
+        score: Latest validation loss after test-time adaptation (lower is better)
+        best_score: Best score the team has reached
+        stale: Generations since ``best_score`` last improved
+        active: False once the team has been stopped early
+        lineage: ``(generation, member_id)`` of every team it copied weights from
+    """
+
+    member_id: int
+    hyperparameters: Dict[str, Any]
+    parameters: Optional[Dict[str, Any]] = None
+    score: float = math.inf
+    best_score: float = math.inf
+    stale: int = 0
+    active: bool = True
+    lineage: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def train_member(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one generation of a team: meta-train, then adapt and score.
+
+    Meta-training continues from the team's parameters with ``MAMLTool``;
+    the score is the mean holdout loss after ``AdaptationTool`` adapts the
+    meta-initialization to each validation task's support set. Runs in a
+    worker process, so every input arrives as shared-memory handles or
+    plain values and tool caches are bypassed.
+    """
+    from ..communication.shared_memory import resolve
+    from ..tools.adaptation_tool import AdaptationTool
+    from ..tools.maml_tool import MAMLTool
+
+    start = time.perf_counter()
+    spec = resolve(spec)
+    hyperparameters = spec["hyperparameters"]
+    maml_tool = MAMLTool()
+    maml_tool.set_cache(None)
+    trained = maml_tool._run(
+        spec["tasks"],
+        inner_lr=hyperparameters["inner_lr"],
+        outer_lr=hyperparameters["outer_lr"],
+        adaptation_steps=hyperparameters["adaptation_steps"],
+        meta_iterations=spec["steps"],
+        mode=spec["mode"],
+        hidden_dim=spec["hidden_dim"],
+        seed=spec["seed"],
+        initial_parameters=spec["parameters"]
+    )
+    if trained["status"] != "success":
+        return {"member_id": spec["member_id"], "status": "error",
+                "error_message": trained["error_message"],
+                "elapsed": time.perf_counter() - start}
+
+    parameters = trained["optimized_parameters"]
+    losses = []
+    for task in spec["validation_tasks"]:
+        adaptation_tool = AdaptationTool()
+        adaptation_tool.set_cache(None)
+        adaptation_tool.swap_parameters(parameters)
+        adapted = adaptation_tool._run(
+            task["support_x"], task["support_y"],
+            learning_rate=hyperparameters["learning_rate"],
+            adaptation_steps=hyperparameters["adaptation_steps"],
+            hidden_dim=spec["hidden_dim"],
+            holdout=(task["query_x"], task["query_y"]),
+            seed=spec["seed"]
+        )
+        if adapted["status"] != "success":
+            return {"member_id": spec["member_id"], "status": "error",
+                    "error_message": adapted["error_message"],
+                    "elapsed": time.perf_counter() - start}
+        losses.append(adapted["performance_metrics"]["final_loss"])
+    return {
+        "member_id": spec["member_id"],
+        "status": "success",
+        "parameters": parameters,
+        "score": sum(losses) / len(losses),
+        "meta_loss": trained["meta_loss"],
+        "elapsed": time.perf_counter() - start
+    }
+
+
+class EmergentOptimization:
+    """Population-based training (PBT) over teams of meta-learning agents.
+
+    Each of ``population_size`` teams meta-trains its own initialization
+    with its own ``inner_lr``, ``outer_lr``, ``learning_rate`` (test-time
+    adaptation) and ``adaptation_steps``. Teams train concurrently, one per
+    worker process with a single intra-op thread each, so throughput grows
+    with the number of cores up to the population size.
+
+    After every ``exploit_interval`` generations the teams are ranked by
+    validation loss: each team in the bottom ``exploit_fraction`` copies
+    the weights and hyperparameters of a random team from the top fraction
+    (exploit) and perturbs the hyperparameters (explore). Parameters live
+    in a :class:`~multi_agent.communication.shared_memory.SharedTensorStore`
+    and workers receive handles, so copying a team's weights only copies a
+    handle and no process unpickles parameter tensors.
+
+    With ``early_stopping``, a team whose best score has not improved by
+    ``min_delta`` (relative) for ``patience`` generations and that is
+    dominated, i.e. worse than the population median, is stopped and stops
+    consuming compute; at least ``min_population`` teams keep running.
+
+    Config keys (all optional):
+        ``population_size`` (8), ``generations`` (5),
+        ``steps_per_generation`` meta-iterations per generation (5),
+        ``exploit_interval`` (1), ``exploit_fraction`` (0.25),
+        ``perturb_factors`` ((0.8, 1.25)), ``resample_probability`` (0.0)
+        chance of drawing a fresh value instead of perturbing,
+        ``search_space`` overrides of :data:`DEFAULT_SEARCH_SPACE`,
+        ``executor`` ``"process"`` (default) or ``"thread"``,
+        ``max_workers`` (CPU count), ``seed`` (0),
+        ``early_stopping`` ``{"patience", "min_delta", "min_population"}``;
+        ``mode`` and ``hidden_dim`` default to the meta-learning agent's config
+    """
+
+    def __init__(self,
+                 agents: Optional[List[Any]] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        self.agents = agents if agents is not None else [MetaLearningAgent()]
+        self.meta_agent = next((agent for agent in self.agents
+                                if isinstance(agent, MetaLearningAgent)), None)
+        agent_config = self.meta_agent.config if self.meta_agent is not None else {}
+        self.population_size = self.config.get("population_size", 8)
+        if self.population_size < 2:
+            raise ValueError(f"population_size must be at least 2, got {self.population_size}")
+        self.executor_kind = self.config.get("executor", "process")
+        if self.executor_kind not in EXECUTOR_KINDS:
+            raise ValueError(f"executor must be one of {EXECUTOR_KINDS}, "
+                             f"got {self.executor_kind!r}")
+        self.search_space = dict(DEFAULT_SEARCH_SPACE, **self.config.get("search_space", {}))
+        self.mode = self.config.get("mode", agent_config.get("mode", "maml"))
+        self.hidden_dim = self.config.get("hidden_dim", agent_config.get("hidden_dim", 64))
+        self._rng = random.Random(self.config.get("seed", 0))
+        self.population: List[Member] = []
+
+    def _sample(self, name: str) -> Any:
+        low, high, log = self.search_space[name]
+        if isinstance(low, int) and isinstance(high, int):
+            return self._rng.randint(low, high)
+        if log:
+            return math.exp(self._rng.uniform(math.log(low), math.log(high)))
+        return self._rng.uniform(low, high)
+
+    def _perturb(self, name: str, value: Any) -> Any:
+        low, high, _ = self.search_space[name]
+        if self._rng.random() < self.config.get("resample_probability", 0.0):
+            return self._sample(name)
+        factor = self._rng.choice(self.config.get("perturb_factors", (0.8, 1.25)))
+        if isinstance(low, int) and isinstance(high, int):
+            # Integer hyperparameters move by at least one step
+            step = max(1, round(abs(value * factor - value)))
+            return min(high, max(low, value + (step if factor > 1 else -step)))
+        return min(high, max(low, value * factor))
+
+    def _make_executor(self, workers: int) -> Executor:
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=workers)
+        return ProcessPoolExecutor(max_workers=workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_process_worker, initargs=(1,))
+
+    def _exploit_and_explore(self, generation: int) -> List[Dict[str, Any]]:
+        """Replace the bottom teams with perturbed copies of top teams."""
+        ranked = sorted((m for m in self.population if m.active), key=lambda m: m.score)
+        cutoff = max(1, int(len(ranked) * self.config.get("exploit_fraction", 0.25)))
+        if len(ranked) < 2 * cutoff:
+            return []
+        top, bottom = ranked[:cutoff], ranked[-cutoff:]
+        events = []
+        for member in bottom:
+            source = self._rng.choice(top)
+            # Handles are references into the shared store: no tensor is copied
+            member.parameters = dict(source.parameters)
+            member.hyperparameters = {name: self._perturb(name, value)
+                                      for name, value in source.hyperparameters.items()}
+            member.score, member.best_score, member.stale = source.score, source.score, 0
+            member.lineage.append((generation, source.member_id))
+            events.append({"member_id": member.member_id, "copied_from": source.member_id,
+                           "hyperparameters": dict(member.hyperparameters)})
+        return events
+
+    def _stop_dominated(self) -> List[int]:
+        settings = self.config.get("early_stopping")
+        if not settings:
+            return []
+        patience = settings.get("patience", 2)
+        min_population = max(2, settings.get("min_population", 2))
+        active = sorted((m for m in self.population if m.active), key=lambda m: m.score)
+        median = statistics.median(m.score for m in active)
+        stopped = []
+        for member in reversed(active):
+            if len(active) - len(stopped) <= min_population:
+                break
+            if member.stale >= patience and member.score > median:
+                member.active = False
+                stopped.append(member.member_id)
+        return stopped
+
+    @staticmethod
+    def _release_unreferenced(store: Any, previous: List[Dict[str, Any]],
+                              population: List[Member]) -> None:
+        from ..communication.shared_memory import handles_in
+
+        live = {handle.path for member in population for handle in handles_in(member.parameters)}
+        for handle in handles_in(previous):
+            if handle.path not in live:
+                store.release(handle)
+
+    def optimize(self, tasks: List[Dict[str, Any]],
+                 validation_tasks: Optional[List[Dict[str, Any]]] = None,
+                 generations: Optional[int] = None) -> Dict[str, Any]:
+        """Run population-based training.
+
+        Args:
+            tasks: Meta-training tasks (``support_x``, ``support_y``,
+                ``query_x``, ``query_y`` arrays)
+            validation_tasks: Tasks scored after test-time adaptation;
+                defaults to ``tasks``
+            generations: Overrides ``config["generations"]``
+
+        Returns:
+            The best team (hyperparameters, score, meta-parameters), a
+            per-generation history of scores, exploit/explore and stopping
+            events, and compute accounting
+        """
+        from ..communication.shared_memory import SharedTensorStore, resolve, share
+
+        generations = generations or self.config.get("generations", 5)
+        steps = self.config.get("steps_per_generation", 5)
+        interval = self.config.get("exploit_interval", 1)
+        min_delta = (self.config.get("early_stopping") or {}).get("min_delta", 1e-3)
+        workers = min(self.population_size, self.config.get("max_workers") or os.cpu_count() or 1)
+        seed = self.config.get("seed", 0)
+
+        self.population = [
+            Member(member_id, {name: self._sample(name) for name in self.search_space})
+            for member_id in range(self.population_size)
+        ]
+        history = []
+        member_generations = 0
+        worker_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            with SharedTensorStore() as store, self._make_executor(workers) as pool:
+                # Task data is published once and mapped by every worker
+                shared_tasks = share(tasks, store)
+                shared_validation = (shared_tasks if validation_tasks is None
+                                     else share(validation_tasks, store))
+                for generation in range(generations):
+                    active = [member for member in self.population if member.active]
+                    with span("EmergentOptimization.generation", category="workflow",
+                              generation=generation, members=len(active)):
+                        futures = [pool.submit(train_member, {
+                            "member_id": member.member_id,
+                            "hyperparameters": dict(member.hyperparameters),
+                            "parameters": member.parameters,
+                            "tasks": shared_tasks,
+                            "validation_tasks": shared_validation,
+                            "steps": steps,
+                            "mode": self.mode,
+                            "hidden_dim": self.hidden_dim,
+                            "seed": seed + 1000 * member.member_id + generation
+                        }) for member in active]
+                        outcomes = [future.result() for future in futures]
+
+                    previous = [member.parameters for member in self.population]
+                    errors = {}
+                    for outcome in outcomes:
+                        member = self.population[outcome["member_id"]]
+                        worker_seconds += outcome["elapsed"]
+                        member_generations += 1
+                        if outcome["status"] != "success":
+                            # A failed team drops out rather than failing the run
+                            member.active = False
+                            errors[member.member_id] = outcome["error_message"]
+                            continue
+                        member.parameters = store.put_dict(outcome["parameters"])
+                        member.score = outcome["score"]
+                        if member.score < member.best_score * (1 - min_delta):
+                            member.best_score, member.stale = member.score, 0
+                        else:
+                            member.best_score = min(member.best_score, member.score)
+                            member.stale += 1
+                    if not any(member.active for member in self.population):
+                        raise RuntimeError(f"every team failed: {errors}")
+
+                    record = {
+                        "generation": generation,
+                        "scores": {m.member_id: m.score for m in self.population if m.active},
+                        "best_score": min(m.score for m in self.population if m.active),
+                        "errors": errors,
+                        "stopped": self._stop_dominated(),
+                        "exploited": []
+                    }
+                    if (generation + 1) % interval == 0 and generation + 1 < generations:
+                        record["exploited"] = self._exploit_and_explore(generation)
+                    history.append(record)
+                    self._release_unreferenced(store, previous, self.population)
+
+                best = min((m for m in self.population if m.active), key=lambda m: m.score)
+                # Cloned out of the store, which is deleted on exit
+                best_parameters = {name: tensor.clone()
+                                   for name, tensor in resolve(best.parameters).items()}
+        except Exception as e:
+            return {
+                "status": "error",
+                "error_message": str(e),
+                "history": history
+            }
+
+        wall_seconds = time.perf_counter() - start
+        possible = generations * self.population_size
+        result = {
+            "status": "success",
+            "best": {
+                "member_id": best.member_id,
+                "hyperparameters": dict(best.hyperparameters),
+                "score": best.score,
+                "lineage": list(best.lineage),
+                "parameters": best_parameters
+            },
+            "population": [{
+                "member_id": m.member_id,
+                "hyperparameters": dict(m.hyperparameters),
+                "score": m.score,
+                "active": m.active
+            } for m in self.population],
+            "history": history,
+            "compute": {
+                "workers": workers,
+                "member_generations": member_generations,
+                "member_generations_saved": possible - member_generations,
+                "wall_seconds": wall_seconds,
+                "worker_seconds": worker_seconds,
+                # Share of the workers' capacity spent training teams
+                "parallel_efficiency": worker_seconds / (wall_seconds * workers)
+                if wall_seconds > 0 else 0.0
+            }
+        }
+        if self.meta_agent is not None:
+            result["checkpoint_id"] = self.meta_agent.save_checkpoint(
+                {"status": "success", "optimized_parameters": best_parameters, "mode": self.mode}
+            )
+        return result
+
@@ -0,0 +1,536 @@
+"""Concurrent execution of independent workflow subtasks."""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator as IteratorType, List, Optional, Set, Tuple
+
+from ..core.resources import ResourceAllocator, ResourceGrant, limit_process_memory, limit_threads
+from .subtasks import Subtask, arun_subtask, run_subtask, topological_order
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+def _init_process_worker(num_threads: int) -> None:
+    # Keep each worker's intra-op pool small so N workers don't oversubscribe cores
+    import torch
+    torch.set_num_threads(num_threads)
+
+
+def _run_in_process(name: str, tool_type: type, kwargs: Dict[str, Any],
+                    grant: Optional[ResourceGrant] = None) -> Dict[str, Any]:
+    # Tool instances are not picklable, so the worker builds its own instance
+    subtask = Subtask(name, tool_type(), kwargs)
+    if grant is None:
+        return run_subtask(subtask)
+    with limit_threads(grant.cores), limit_process_memory(grant.memory_bytes):
+        return run_subtask(subtask)
+
+
+def _run_in_thread(subtask: Subtask, grant: Optional[ResourceGrant] = None) -> Dict[str, Any]:
+    if grant is None:
+        return run_subtask(subtask)
+    with limit_threads(grant.cores):
+        return run_subtask(subtask)
+
+
+_intra_op_lock = threading.Lock()
+_intra_op_users = 0
+_intra_op_default = 1
+
+
+@contextmanager
+def _cap_intra_op_threads(parallelism: int) -> IteratorType[None]:
+    """Split torch's intra-op pool between ``parallelism`` concurrent subtasks.
+
+    Thread-kind subtasks share one process, so each would otherwise spawn a
+    full intra-op pool and oversubscribe the cores. Overlapping runs share
+    the cap; the original setting is restored when the last one exits.
+    """
+    global _intra_op_users, _intra_op_default
+    if parallelism <= 1:
+        yield
+        return
+
+    import torch
+    with _intra_op_lock:
+        if _intra_op_users == 0:
+            _intra_op_default = torch.get_num_threads()
+        _intra_op_users += 1
+        torch.set_num_threads(max(1, _intra_op_default // parallelism))
+    try:
+        yield
+    finally:
+        with _intra_op_lock:
+            _intra_op_users -= 1
+            if _intra_op_users == 0:
+                torch.set_num_threads(_intra_op_default)
+
+
+def _abandon(subtask: Subtask) -> None:
+    stop = getattr(subtask.tool, "cancel", None)
+    if callable(stop):
+        stop()
+
+
+class RunHandle:
+    """Cancellation state of one :meth:`SubtaskExecutor.run`/``arun`` call.
+
+    An executor may serve several runs at once (e.g. concurrent
+    ``asolve_task`` calls), so each run keeps its own cancel flag and
+    in-flight work; cancelling a handle only affects the run it was passed
+    to. Use a fresh handle per run.
+    """
+
+    def __init__(self) -> None:
+        self._cancelled = threading.Event()
+        self._running: Dict[Future, Subtask] = {}
+        self._async_running: Dict[asyncio.Future, Subtask] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Cancel the run: pending subtasks are skipped, in-flight ones abandoned.
+
+        Safe to call from any thread, also before the run starts.
+        """
+        self._cancelled.set()
+        for future, subtask in list(self._running.items()):
+            if not future.cancel():
+                _abandon(subtask)
+        loop = self._loop
+        if loop is not None:
+            for task in list(self._async_running):
+                loop.call_soon_threadsafe(task.cancel)
+
+
+class SubtaskExecutor:
+    """Runs a subtask DAG with independent subtasks executing concurrently.
+
+    Subtasks are submitted as soon as their dependencies finish, either to a
+    thread pool (I/O-bound or GIL-releasing tensor work) or to a process pool
+    (CPU-bound tool calls). Each subtask may have its own timeout; a subtask
+    that times out is cancelled if it has not started and abandoned otherwise,
+    and its dependents are skipped.
+
+    Process-pool subtasks run on a fresh tool instance in the worker, so
+    in-tool state would not be carried back to the caller. Subtasks whose
+    tool declares ``stateful = True`` (e.g. the AdaptationTool's online
+    adapter), that advance an SSMTool ``session_id`` or whose arguments cannot be pickled (iterators and generators
+    such as a ``stream``) are therefore always routed to the thread pool.
+
+    Pools are created on first use and kept for the executor's lifetime;
+    call :meth:`shutdown` (or use the executor as a context manager) to
+    release them. Process workers are started with the ``spawn`` method so
+    they never inherit locks held by the parent's threads.
+
+    A timed-out process-pool subtask is stopped by terminating the pool's
+    workers; the pool is then recreated and any other in-flight process
+    subtasks are resubmitted. A thread cannot be killed, so abandoned
+    thread-pool work keeps running until it returns. Tools that expose a
+    ``cancel()`` method (such as AdaptationTool) are asked to stop early so
+    they release any lock that later calls would otherwise queue behind.
+    One executor may serve several runs at once; each keeps its own
+    :class:`RunHandle`, so cancelling one run leaves the others untouched.
+
+    While several thread-kind subtasks run at once, torch's intra-op thread
+    pool is divided between them to avoid oversubscribing the cores. With an
+    ``allocator`` the split follows its grants instead: subtasks that can run
+    at the same time (same dependency depth) share the cores by expected
+    work, process workers get a memory cap, the wall-clock grant bounds the
+    timeout, and every finished run is fed back so the next run rebalances.
+    Records then carry the subtask's grant under ``"resources"``.
+
+    Tensors and arrays of at least ``share_threshold`` bytes in the
+    arguments of process-kind subtasks are published once to a
+    :class:`~multi_agent.communication.shared_memory.SharedTensorStore` and
+    sent as handles, so workers map them zero-copy instead of unpickling
+    a copy; they are released when the subtask finishes.
+
+    Args:
+        kind: Default pool for subtasks, ``"thread"`` or ``"process"``
+        max_workers: Pool size; defaults to the executor's own default for
+            threads and to the CPU count for processes
+        kinds: Per-subtask pool overrides, keyed by subtask name
+        timeout: Default per-subtask timeout in seconds (None for no limit)
+        timeouts: Per-subtask timeouts, keyed by subtask name
+        share_threshold: Minimum array size in bytes sent to process workers
+            through shared memory (None to always pickle)
+        allocator: Optional :class:`~multi_agent.core.resources.ResourceAllocator`
+            assigning cores, memory and wall-clock budgets per subtask
+    """
+
+    def __init__(self,
+                 kind: str = "thread",
+                 max_workers: Optional[int] = None,
+                 kinds: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 share_threshold: Optional[int] = 1 << 20,
+                 allocator: Optional[ResourceAllocator] = None):
+        for value in [kind] + list((kinds or {}).values()):
+            if value not in EXECUTOR_KINDS:
+                raise ValueError(f"executor kind must be one of {EXECUTOR_KINDS}, got {value!r}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.kinds = kinds or {}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.share_threshold = share_threshold
+        self.allocator = allocator
+        self._store: Any = None
+        self._runs: Set[RunHandle] = set()
+        self._pool_lock = threading.Lock()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "SubtaskExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release the worker pools; they are recreated if the executor is reused."""
+        with self._pool_lock:
+            pools = [self._thread_pool, self._process_pool]
+            self._thread_pool = self._process_pool = None
+            store, self._store = self._store, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        if store is not None:
+            store.close()
+
+    def cancel(self) -> None:
+        """Cancel every run in progress; see :meth:`RunHandle.cancel` to cancel just one.
+
+        Safe to call from any thread.
+        """
+        with self._pool_lock:
+            runs = list(self._runs)
+        for handle in runs:
+            handle.cancel()
+
+    @contextmanager
+    def _track(self, handle: Optional[RunHandle]) -> IteratorType[RunHandle]:
+        handle = handle or RunHandle()
+        with self._pool_lock:
+            self._runs.add(handle)
+        try:
+            yield handle
+        finally:
+            with self._pool_lock:
+                self._runs.discard(handle)
+
+    def kind_of(self, subtask: Subtask) -> str:
+        """Pool a subtask will actually run on, after stateful/unpicklable routing."""
+        kind = self.kinds.get(subtask.name, self.kind)
+        if kind == "process" and (
+            getattr(type(subtask.tool), "stateful", False)
+            or subtask.kwargs.get("session_id") is not None
+            or any(isinstance(value, Iterator) for value in subtask.kwargs.values())
+        ):
+            return "thread"
+        return kind
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.max_workers)
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                workers = self.max_workers or os.cpu_count() or 1
+                threads = max(1, (os.cpu_count() or 1) // workers)
+                self._process_pool = ProcessPoolExecutor(
+                    workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_worker,
+                    initargs=(threads,)
+                )
+            return self._process_pool
+
+    def _shared_kwargs(self, subtask: Subtask) -> Tuple[Dict[str, Any], Callable[[], None]]:
+        """Process-worker arguments with large arrays swapped for shared-memory handles.
+
+        Returns the arguments and a callback releasing the published arrays.
+        """
+        if self.share_threshold is None:
+            return subtask.kwargs, lambda: None
+        from ..communication.shared_memory import SharedTensorStore, handles_in, share
+
+        with self._pool_lock:
+            if self._store is None:
+                self._store = SharedTensorStore()
+            store = self._store
+        kwargs = share(subtask.kwargs, store, self.share_threshold)
+
+        def release() -> None:
+            for handle in handles_in(kwargs):
+                store.release(handle)
+        return kwargs, release
+
+    def _kill_process_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Terminate a pool whose worker is stuck on timed-out work."""
+        with self._pool_lock:
+            if self._process_pool is pool:
+                self._process_pool = None
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+    def _thread_parallelism(self, subtasks: List[Subtask]) -> int:
+        count = sum(1 for subtask in subtasks
+                    if subtask.skip_reason is None and self.kind_of(subtask) == "thread")
+        return min(count, self.max_workers) if self.max_workers else count
+
+    def _grants(self, subtasks: List[Subtask]) -> Dict[str, ResourceGrant]:
+        """Allocator grants, one allocation per dependency depth (``subtasks`` in topological order)."""
+        if self.allocator is None:
+            return {}
+        depth: Dict[str, int] = {}
+        levels: Dict[int, List[str]] = {}
+        for subtask in subtasks:
+            depth[subtask.name] = 1 + max((depth[dep] for dep in subtask.depends_on), default=-1)
+            if subtask.skip_reason is None:
+                levels.setdefault(depth[subtask.name], []).append(subtask.name)
+        grants = {}
+        for names in levels.values():
+            grants.update(self.allocator.allocate(names))
+        return grants
+
+    def _timeout(self, subtask: Subtask, grant: Optional[ResourceGrant]) -> Optional[float]:
+        limits = [self.timeouts.get(subtask.name, self.timeout),
+                  grant.wall_seconds if grant is not None else None]
+        limits = [limit for limit in limits if limit is not None]
+        return min(limits) if limits else None
+
+    def _finished(self, subtask: Subtask, record: Dict[str, Any],
+                  grant: Optional[ResourceGrant]) -> Dict[str, Any]:
+        if grant is not None and record["status"] != "skipped":
+            record["resources"] = grant.as_dict()
+            self.allocator.record(subtask.name, record.get("elapsed", 0.0), grant,
+                                  record["status"])
+        return record
+
+    def _submit(self, subtask: Subtask, grant: Optional[ResourceGrant] = None) -> Future:
+        if self.kind_of(subtask) == "process":
+            kwargs, release = self._shared_kwargs(subtask)
+            future = self._get_process_pool().submit(
+                _run_in_process, subtask.name, type(subtask.tool), kwargs, grant
+            )
+            future.add_done_callback(lambda _: release())
+            return future
+        return self._get_thread_pool().submit(_run_in_thread, subtask, grant)
+
+    def run(self, subtasks: List[Subtask],
+            handle: Optional[RunHandle] = None) -> Dict[str, Dict[str, Any]]:
+        """Execute ``subtasks`` respecting dependencies and return their run records.
+
+        Args:
+            subtasks: Subtask DAG to execute
+            handle: Optional :class:`RunHandle` through which another thread
+                can cancel just this run
+        """
+        with self._track(handle) as handle:
+            return self._run(subtasks, handle)
+
+    def _run(self, subtasks: List[Subtask], handle: RunHandle) -> Dict[str, Dict[str, Any]]:
+        cancelled = handle._cancelled
+        ordered = topological_order(subtasks)
+        records: Dict[str, Dict[str, Any]] = {}
+        running = handle._running
+        deadlines: Dict[Future, float] = {}
+        killed = set()
+        waiting = list(ordered)
+        grants = self._grants(ordered)
+
+        def submit(subtask: Subtask) -> None:
+            future = self._submit(subtask, grants.get(subtask.name))
+            running[future] = subtask
+            timeout = self._timeout(subtask, grants.get(subtask.name))
+            if timeout is not None:
+                deadlines[future] = time.monotonic() + timeout
+
+        # With grants every subtask sets its own intra-op threads
+        with _cap_intra_op_threads(0 if grants else self._thread_parallelism(ordered)):
+            while waiting or running:
+                for subtask in list(waiting):
+                    if not all(dep in records for dep in subtask.depends_on):
+                        continue
+                    waiting.remove(subtask)
+                    failed = [dep for dep in subtask.depends_on
+                              if records[dep]["status"] != "success"]
+                    if cancelled.is_set() or failed:
+                        reason = "cancelled" if cancelled.is_set() \
+                            else f"dependencies did not succeed: {failed}"
+                        records[subtask.name] = {"status": "skipped", "reason": reason,
+                                                 "elapsed": 0.0}
+                        continue
+                    if subtask.skip_reason is not None:
+                        records[subtask.name] = run_subtask(subtask)
+                        continue
+                    submit(subtask)
+
+                if not running:
+                    continue
+                wait_for = None
+                if deadlines:
+                    wait_for = max(0.0, min(deadlines.values()) - time.monotonic())
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    subtask = running.pop(future)
+                    deadlines.pop(future, None)
+                    try:
+                        records[subtask.name] = self._finished(subtask, future.result(),
+                                                               grants.get(subtask.name))
+                    except CancelledError:
+                        records[subtask.name] = {"status": "skipped", "reason": "cancelled",
+                                                 "elapsed": 0.0}
+                    except BrokenProcessPool as e:
+                        if future in killed and not cancelled.is_set():
+                            # Collateral of terminating a timed-out sibling
+                            submit(subtask)
+                            continue
+                        records[subtask.name] = {"status": "error",
+                                                 "result": {"error_message": str(e)},
+                                                 "elapsed": 0.0}
+                    except Exception as e:
+                        records[subtask.name] = {"status": "error",
+                                                 "result": {"error_message": str(e)},
+                                                 "elapsed": 0.0}
+
+                now = time.monotonic()
+                for future, deadline in list(deadlines.items()):
+                    if deadline <= now and future in running:
+                        subtask = running.pop(future)
+                        deadlines.pop(future)
+                        if not future.cancel():
+                            if self.kind_of(subtask) == "process":
+                                pool = self._process_pool
+                                killed.update(other for other in running
+                                              if self.kind_of(running[other]) == "process")
+                                if pool is not None:
+                                    self._kill_process_pool(pool)
+                            else:
+                                _abandon(subtask)
+                        records[subtask.name] = self._finished(subtask, {
+                            "status": "timeout",
+                            "elapsed": self._timeout(subtask, grants.get(subtask.name))
+                        }, grants.get(subtask.name))
+
+        return {subtask.name: records[subtask.name] for subtask in ordered}
+
+    async def arun(self, subtasks: List[Subtask],
+                   handle: Optional[RunHandle] = None) -> Dict[str, Dict[str, Any]]:
+        """Async counterpart of :meth:`run` for use inside an event loop.
+
+        Thread-kind subtasks go through each tool's ``_arun`` (on the thread
+        pool under the subtask's core grant with an ``allocator``);
+        process-kind subtasks are awaited on the process pool. Timed-out
+        subtasks are abandoned (process workers terminated) without blocking
+        the loop. ``handle`` cancels just this run, as in :meth:`run`.
+        """
+        with self._track(handle) as handle:
+            return await self._arun(subtasks, handle)
+
+    async def _arun(self, subtasks: List[Subtask],
+                    handle: RunHandle) -> Dict[str, Dict[str, Any]]:
+        cancelled = handle._cancelled
+        handle._loop = loop = asyncio.get_running_loop()
+        ordered = topological_order(subtasks)
+        grants = self._grants(ordered)
+        pending: Dict[str, asyncio.Future] = {}
+        running = handle._async_running
+
+        async def in_process(subtask: Subtask, timeout: Optional[float]) -> Dict[str, Any]:
+            while True:
+                pool = self._get_process_pool()
+                kwargs, release = self._shared_kwargs(subtask)
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(pool, _run_in_process, subtask.name,
+                                             type(subtask.tool), kwargs,
+                                             grants.get(subtask.name)),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._kill_process_pool(pool)
+                    raise
+                except BrokenProcessPool:
+                    # Resubmit if a timed-out sibling's pool was terminated
+                    if self._process_pool is pool or cancelled.is_set():
+                        raise
+                finally:
+                    release()
+
+        async def in_thread(subtask: Subtask) -> Dict[str, Any]:
+            grant = grants.get(subtask.name)
+            if grant is None:
+                return await arun_subtask(subtask)
+            return await loop.run_in_executor(self._get_thread_pool(), _run_in_thread,
+                                              subtask, grant)
+
+        async def execute(subtask: Subtask) -> Dict[str, Any]:
+            return self._finished(subtask, await attempt(subtask), grants.get(subtask.name))
+
+        async def attempt(subtask: Subtask) -> Dict[str, Any]:
+            try:
+                dependencies = [await asyncio.shield(pending[dep])
+                                for dep in subtask.depends_on]
+                if cancelled.is_set():
+                    return {"status": "skipped", "reason": "cancelled", "elapsed": 0.0}
+                if any(record["status"] != "success" for record in dependencies):
+                    return {"status": "skipped", "elapsed": 0.0,
+                            "reason": f"dependencies did not succeed: {subtask.depends_on}"}
+                if subtask.skip_reason is not None:
+                    return run_subtask(subtask)
+
+                timeout = self._timeout(subtask, grants.get(subtask.name))
+                try:
+                    if self.kind_of(subtask) == "process":
+                        return await in_process(subtask, timeout)
+                    return await asyncio.wait_for(in_thread(subtask), timeout)
+                except asyncio.TimeoutError:
+                    _abandon(subtask)
+                    return {"status": "timeout", "elapsed": timeout}
+                except BrokenProcessPool as e:
+                    return {"status": "error", "result": {"error_message": str(e)},
+                            "elapsed": 0.0}
+            except asyncio.CancelledError:
+                if not cancelled.is_set():
+                    raise
+                _abandon(subtask)
+                return {"status": "skipped", "reason": "cancelled", "elapsed": 0.0}
+
+        try:
+            with _cap_intra_op_threads(0 if grants else self._thread_parallelism(ordered)):
+                for subtask in ordered:
+                    task = asyncio.ensure_future(execute(subtask))
+                    pending[subtask.name] = task
+                    running[task] = subtask
+                records = await asyncio.gather(*pending.values())
+        finally:
+            running.clear()
+
+        return dict(zip(pending, records))
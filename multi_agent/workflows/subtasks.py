@@ -0,0 +1,86 @@
+"""Subtask graph used by the direct (LLM-free) execution path."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Subtask:
+    """A single tool invocation in the workflow DAG.
+
+    Attributes:
+        name: Unique subtask name (e.g. ``"meta_learning"``)
+        tool: Tool instance whose ``_run`` performs the work
+        kwargs: Keyword arguments for ``tool._run``
+        depends_on: Names of subtasks that must finish first
+        skip_reason: Set when the subtask cannot run (e.g. missing data)
+    """
+
+    name: str
+    tool: Any
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    skip_reason: Optional[str] = None
+
+
+def _resolved_kwargs(subtask: Subtask) -> Dict[str, Any]:
+    # Shared-memory handles in the arguments are mapped in zero-copy
+    from ..communication.shared_memory import resolve
+    return resolve(subtask.kwargs)
+
+
+def run_subtask(subtask: Subtask) -> Dict[str, Any]:
+    """Invoke a subtask's tool and wrap the outcome with timing information."""
+    if subtask.skip_reason is not None:
+        return {"status": "skipped", "reason": subtask.skip_reason, "elapsed": 0.0}
+
+    start = time.perf_counter()
+    try:
+        result = subtask.tool._run(**_resolved_kwargs(subtask))
+    except Exception as e:
+        result = {"status": "error", "error_message": str(e)}
+    return {
+        "status": result.get("status", "success"),
+        "result": result,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+async def arun_subtask(subtask: Subtask) -> Dict[str, Any]:
+    """Async counterpart of :func:`run_subtask` using the tool's ``_arun``."""
+    if subtask.skip_reason is not None:
+        return {"status": "skipped", "reason": subtask.skip_reason, "elapsed": 0.0}
+
+    start = time.perf_counter()
+    try:
+        result = await subtask.tool._arun(**_resolved_kwargs(subtask))
+    except Exception as e:
+        result = {"status": "error", "error_message": str(e)}
+    return {
+        "status": result.get("status", "success"),
+        "result": result,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def topological_order(subtasks: List[Subtask]) -> List[Subtask]:
+    """Order subtasks so every dependency precedes its dependents."""
+    by_name = {subtask.name: subtask for subtask in subtasks}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(subtask: Subtask) -> None:
+        if subtask.name in done:
+            return
+        if subtask.name in visiting:
+            raise ValueError(f"dependency cycle through subtask {subtask.name!r}")
+        visiting.add(subtask.name)
+        for dependency in subtask.depends_on:
+            visit(by_name[dependency])
+        visiting.discard(subtask.name)
+        done.add(subtask.name)
+        ordered.append(subtask)
+
+    for subtask in subtasks:
+        visit(subtask)
+    return ordered
@@ -0,0 +1,60 @@
+"""Tests for streaming test-time adaptation."""
+
+import torch
+
+from multi_agent.core.adaptation import ReplayBuffer, StreamingAdapter
+from multi_agent.core.models import MLPRegressor
+
+
+def test_replay_buffer_wraps_around():
+    buffer = ReplayBuffer(capacity=5)
+    buffer.add(torch.arange(3.0).unsqueeze(-1), torch.zeros(3, 1))
+    buffer.add(torch.arange(3.0, 7.0).unsqueeze(-1), torch.zeros(4, 1))
+
+    assert len(buffer) == 5
+    # Samples 0 and 1 were overwritten by 5 and 6
+    assert sorted(buffer._observations.squeeze(-1).tolist()) == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert buffer.nbytes == 2 * 5 * 4
+
+
+def test_replay_buffer_keeps_newest_of_oversized_batch():
+    buffer = ReplayBuffer(capacity=4)
+    buffer.add(torch.arange(10.0).unsqueeze(-1), torch.zeros(10, 1))
+
+    assert len(buffer) == 4
+    assert sorted(buffer._observations.squeeze(-1).tolist()) == [6.0, 7.0, 8.0, 9.0]
+    observations, _ = buffer.sample(16)
+    assert observations.shape == (16, 1)
+    assert set(observations.squeeze(-1).tolist()) <= {6.0, 7.0, 8.0, 9.0}
+
+
+def _stream(num_batches, batch_size=16, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    for _ in range(num_batches):
+        x = torch.randn(batch_size, 3, generator=generator)
+        yield x, x.sum(dim=-1, keepdim=True)
+
+
+def test_adapt_stream_reports_losses_on_a_fixed_batch():
+    torch.manual_seed(0)
+    adapter = StreamingAdapter(MLPRegressor(3, 1, 16), learning_rate=0.05,
+                               replay_capacity=64, replay_batch_size=8)
+    holdout = next(_stream(1, batch_size=64, seed=1))
+
+    stats = adapter.adapt_stream(_stream(20), updates_per_batch=2, reference=holdout)
+
+    assert stats["batches"] == 20
+    assert stats["updates"] == 40
+    assert len(stats["reference_history"]) == 40
+    assert stats["final_loss"] == adapter.evaluate(*holdout)
+    assert stats["final_loss"] == stats["reference_history"][-1]
+    assert stats["final_loss"] < stats["initial_loss"]
+    assert len(adapter.replay) == 64
+
+
+def test_adapt_stream_stops_when_asked():
+    adapter = StreamingAdapter(MLPRegressor(3, 1, 16))
+    stats = adapter.adapt_stream(_stream(10), should_stop=lambda: True)
+
+    assert stats["batches"] == 0
+    assert stats["initial_loss"] is None
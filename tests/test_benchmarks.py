@@ -0,0 +1,64 @@
+"""Tests for the benchmark suite and its baseline comparison."""
+
+import json
+
+from experiments.multi_agent_benchmarks import suite
+
+
+def _report(results):
+    return {"results": results}
+
+
+def test_compare_flags_slowdowns_in_the_right_direction():
+    params = {"sequence_length": 256, "state_dim": 16}
+    baseline = _report({"ssm": [{"params": params, "metrics": {
+        "min_seconds": 0.1, "steps_per_second": 1000.0, "peak_rss_bytes": 2 ** 30}}]})
+    faster = _report({"ssm": [{"params": dict(params), "metrics": {
+        "min_seconds": 0.05, "steps_per_second": 2000.0, "peak_rss_bytes": 2 ** 29}}]})
+    slower = _report({"ssm": [{"params": dict(params), "metrics": {
+        "min_seconds": 0.2, "steps_per_second": 500.0, "peak_rss_bytes": 2 ** 30}}]})
+
+    assert suite.compare(faster, baseline) == []
+    regressions = suite.compare(slower, baseline)
+    assert {r["metric"] for r in regressions} == {"min_seconds", "steps_per_second"}
+    assert all(r["params"] == params for r in regressions)
+
+
+def test_compare_ignores_noise_and_unmatched_entries():
+    baseline = _report({"maml": [{"params": {"num_tasks": 2}, "metrics": {
+        "min_seconds": 0.0002, "peak_rss_bytes": 4096}}]})
+    current = _report({
+        "maml": [{"params": {"num_tasks": 2}, "metrics": {
+            "min_seconds": 0.0008, "peak_rss_bytes": 65536}}],
+        "ssm": [{"params": {"state_dim": 16}, "metrics": {"median_seconds": 5.0}}]
+    })
+
+    assert suite.compare(current, baseline) == []
+
+
+def test_compare_reports_benchmarks_that_errored():
+    baseline = _report({"adaptation": [{"params": {"batch_size": 16},
+                                        "metrics": {"median_seconds": 0.1}}]})
+    current = _report({"adaptation": [{"params": {"batch_size": 16},
+                                       "metrics": {"error": "boom"}}]})
+
+    assert suite.compare(current, baseline)[0]["metric"] == "error"
+
+
+def test_main_writes_json_and_checks_baseline(tmp_path, monkeypatch):
+    monkeypatch.setitem(suite.GRIDS["quick"], "ssm",
+                        {"sequence_length": [64], "state_dim": [8]})
+    output = tmp_path / "report.json"
+
+    assert suite.main(["ssm", "--quick", "--repeats", "1", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    (entry,) = report["results"]["ssm"]
+    assert entry["params"] == {"sequence_length": 64, "state_dim": 8}
+    assert entry["metrics"]["steps_per_second"] > 0
+    assert "torch" in report["environment"]
+
+    entry["metrics"]["min_seconds"] = 1e-9
+    entry["metrics"]["steps_per_second"] = 1e12
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert suite.main(["ssm", "--quick", "--repeats", "1", "--baseline", str(baseline)]) == 1
@@ -0,0 +1,150 @@
+"""Tests for memory-mapped checkpoints and per-task deltas."""
+
+import os
+
+import pytest
+import torch
+
+from multi_agent.core.checkpoint import CheckpointStore, load_tensors, read_index, save_tensors
+from multi_agent.core.models import MLPRegressor
+
+
+def _parameters(seed=0, hidden_dim=16):
+    torch.manual_seed(seed)
+    return {name: p.detach().clone()
+            for name, p in MLPRegressor(3, 1, hidden_dim).named_parameters()}
+
+
+def test_tensors_round_trip_through_a_mapped_file(tmp_path):
+    path = str(tmp_path / "t.safetensors")
+    tensors = {"w": torch.randn(4, 3), "b": torch.randn(3).to(torch.bfloat16),
+               "i": torch.arange(5, dtype=torch.int32), "empty": torch.zeros(0, 2)}
+    save_tensors(path, tensors, {"note": "x"})
+
+    loaded, metadata = load_tensors(path)
+    assert metadata == {"note": "x"}
+    for name, tensor in tensors.items():
+        assert loaded[name].dtype == tensor.dtype
+        assert torch.equal(loaded[name], tensor)
+
+    # Copy-on-write: writes stay private to the caller
+    loaded["w"].zero_()
+    assert torch.equal(load_tensors(path)[0]["w"], tensors["w"])
+    index, _, start = read_index(path)
+    assert start % 8 == 0 and index["w"]["dtype"] == "F32"
+
+
+def test_task_deltas_reconstruct_exactly_and_stay_small(tmp_path):
+    store = CheckpointStore(str(tmp_path), delta_dtype=None)
+    meta = _parameters()
+    store.save_meta(meta)
+
+    head_only = {name: value.clone() for name, value in meta.items()}
+    head_only["net.4.bias"] += 0.5
+    sparse = {name: value.clone() for name, value in meta.items()}
+    sparse["net.0.weight"][0, 0] += 1.0
+    dense = _parameters(seed=1)
+
+    sizes = {task_id: store.save_task(task_id, params)
+             for task_id, params in [("head", head_only), ("sparse", sparse), ("dense", dense)]}
+    for task_id, params in [("head", head_only), ("sparse", sparse), ("dense", dense)]:
+        loaded = store.load_task(task_id)
+        assert all(torch.equal(loaded[name], params[name]) for name in params)
+
+    assert sizes["head"] < sizes["sparse"] < sizes["dense"]
+    assert store.task_ids() == ["dense", "head", "sparse"]
+    assert store.nbytes()["num_tasks"] == 3
+
+
+def test_tasks_keep_loading_against_their_own_meta_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path), delta_dtype=None)
+    store.save_meta(_parameters())
+    target = _parameters(seed=1)
+    store.save_task("a", target)
+    store.save_meta(_parameters(seed=2))
+    store.save_meta(_parameters(seed=3))
+
+    # Only the base task "a" refers to was kept
+    assert store.nbytes()["num_bases"] == 1
+    loaded = store.load_task("a")
+    assert all(torch.equal(loaded[name], target[name]) for name in target)
+
+    store.delete_task("a")
+    store.save_meta(_parameters(seed=4))
+    assert store.nbytes()["num_bases"] == 0
+
+    store.save_task("b", target)
+    os.remove(store.meta_path)
+    store.save_meta(_parameters(seed=5))
+    with pytest.raises(ValueError):
+        store.load_task("b")
+    with pytest.raises(KeyError):
+        store.load_task("missing")
+    with pytest.raises(ValueError):
+        store.task_path("../escape")
+
+
+def test_default_deltas_are_half_precision_and_compact(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    meta = _parameters(hidden_dim=128)
+    store.save_meta(meta)
+    target = {name: value + 0.01 * torch.randn_like(value) for name, value in meta.items()}
+    size = store.save_task("a", target)
+
+    loaded = store.load_task("a")
+    assert all(torch.allclose(loaded[name], target[name], atol=1e-4) for name in target)
+    assert size < 0.6 * store.nbytes()["meta"]
+
+    # Dropping small changes leaves a sparse delta
+    thresholded = CheckpointStore(str(tmp_path / "thresholded"), delta_tolerance=0.02)
+    thresholded.save_meta(meta)
+    assert thresholded.save_task("a", target) < 0.5 * size
+
+
+def test_adaptation_agent_hot_swaps_tasks(tmp_path):
+    from multi_agent.agents.adaptation_agent import AdaptationAgent
+    from multi_agent.agents.meta_learning_agent import MetaLearningAgent
+
+    config = {"checkpoint_dir": str(tmp_path), "cache": False}
+    meta_agent = MetaLearningAgent(config)
+    x = torch.randn(32, 3)
+    task = {"support_x": x[:16], "support_y": x[:16, :1], "query_x": x[16:], "query_y": x[16:, :1]}
+    meta_agent.optimize_initialization([task])
+    assert meta_agent.checkpoints.meta_parameters() is not None
+    assert meta_agent.tool_kwargs([task])["initial_parameters"] is not None
+
+    agent = AdaptationAgent(dict(config, hidden_dim=64))
+    assert agent.swap_task("a")["source"] == "meta"
+    agent.adapt_online(x, x[:, :1])
+    agent.save_task()
+    adapted = {n: p.detach().clone() for n, p in agent.adaptation_tool.adapter.model.named_parameters()}
+
+    agent.swap_task("b")
+    model = agent.adaptation_tool.adapter.model
+    assert not torch.equal(model.net[0].weight, adapted["net.0.weight"])
+
+    swap = agent.swap_task("a")
+    assert swap["source"] == "task"
+    assert agent.adaptation_tool.adapter.model is model
+    # Half-precision deltas round-trip to within their rounding error
+    assert all(torch.allclose(p, adapted[n], atol=1e-5) for n, p in model.named_parameters())
+    assert len(agent.adaptation_tool.adapter.replay) == 0
+
+
+def test_adaptation_agent_swaps_to_tasks_of_an_older_meta_checkpoint(tmp_path):
+    from multi_agent.agents.adaptation_agent import AdaptationAgent
+
+    agent = AdaptationAgent({"checkpoint_dir": str(tmp_path), "cache": False})
+    agent.checkpoints.save_meta(_parameters(hidden_dim=64))
+    agent.swap_task("old")
+    agent.adapt_online(torch.randn(32, 3), torch.randn(32, 1))
+    agent.save_task()
+    adapted = {n: p.detach().clone() for n, p in agent.adaptation_tool.adapter.model.named_parameters()}
+
+    # Retraining saves new meta checkpoints; the old task still resolves
+    agent.checkpoints.save_meta(_parameters(seed=1, hidden_dim=64))
+    agent.checkpoints.save_meta(_parameters(seed=2, hidden_dim=64))
+    agent.swap_task("new")
+    assert agent.swap_task("old")["source"] == "task"
+    model = agent.adaptation_tool.adapter.model
+    assert all(torch.allclose(p, adapted[n], atol=1e-5) for n, p in model.named_parameters())
@@ -0,0 +1,83 @@
+"""Tests for data-parallel meta-training over local gloo processes."""
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.distributed import DistributedMAML, _launch
+from multi_agent.core.maml import BatchedMAML, collate_tasks
+from multi_agent.core.models import MLPRegressor
+from multi_agent.tools.maml_tool import MAMLTool
+
+
+def _tasks(count=6, seed=0):
+    rng = np.random.default_rng(seed)
+    tasks = []
+    for _ in range(count):
+        slope = rng.standard_normal((3, 1)).astype(np.float32)
+        x = rng.uniform(-1, 1, size=(16, 3)).astype(np.float32)
+        tasks.append({"support_x": x[:8], "support_y": x[:8] @ slope,
+                      "query_x": x[8:], "query_y": x[8:] @ slope})
+    return tasks
+
+
+@pytest.mark.parametrize("mode", ["maml", "reptile"])
+def test_single_rank_matches_batched_outer_step(mode):
+    tasks = _tasks()
+    models = []
+    for _ in range(2):
+        torch.manual_seed(0)
+        models.append(MLPRegressor(3, 1, 8))
+    reference = BatchedMAML(models[0], adaptation_steps=2, mode=mode)
+    expected = reference.outer_step([batch for _, batch in collate_tasks(tasks)])
+
+    trainer = DistributedMAML(BatchedMAML(models[1], adaptation_steps=2, mode=mode), tasks,
+                              chunk_size=4)
+    step = trainer.outer_step()
+
+    assert step["meta_loss"] == pytest.approx(expected["meta_loss"], rel=1e-5)
+    assert step["tasks_processed"] == 6 and step["tasks_dropped"] == 0
+    for (_, p), (_, q) in zip(models[0].named_parameters(), models[1].named_parameters()):
+        assert torch.allclose(p, q, atol=1e-6)
+
+
+def test_two_ranks_match_a_single_process_run():
+    kwargs = {"adaptation_steps": 2, "meta_iterations": 2, "hidden_dim": 8, "mode": "fomaml"}
+    tool = MAMLTool()
+    tool.set_cache(None)
+    local = tool._run(_tasks(), **kwargs)
+    sharded = tool._run(_tasks(), distributed={"world_size": 2, "chunk_size": 2}, **kwargs)
+
+    assert sharded["status"] == "success", sharded.get("error_message")
+    assert sharded["distributed"]["world_size"] == 2
+    assert sharded["distributed"]["tasks_processed_per_step"] == [6, 6]
+    assert sharded["meta_loss_history"] == pytest.approx(local["meta_loss_history"], rel=1e-4)
+    for name, value in local["optimized_parameters"].items():
+        assert torch.allclose(sharded["optimized_parameters"][name], value, atol=1e-5)
+
+
+def _slow_rank(rank, *args):
+    # Delays every chunk on rank 1 to make it a straggler
+    import time
+    from multi_agent.core import distributed
+
+    if rank == 1:
+        run_chunk = distributed.DistributedMAML._run_chunk
+
+        def slow_chunk(self, chunk_id, accumulators):
+            time.sleep(2.0)
+            run_chunk(self, chunk_id, accumulators)
+        distributed.DistributedMAML._run_chunk = slow_chunk
+    distributed._spawned_rank(rank, *args)
+
+
+@pytest.mark.parametrize("policy, processed, dropped, reassigned",
+                         [("drop", 4, 2, 0), ("reassign", 6, 0, 2)])
+def test_straggler_chunks_are_dropped_or_reassigned(policy, processed, dropped, reassigned):
+    # Rank 1 owns chunks 1, 3, 5 but only finishes chunk 1 before the timeout
+    stats = _launch(_slow_rank, 2, _tasks(), timeout=300.0, adaptation_steps=1, hidden_dim=8,
+                    chunk_size=1, straggler_timeout=1.0, straggler_policy=policy)
+
+    assert stats["tasks_processed"] == [processed]
+    assert (stats["tasks_dropped"], stats["chunks_reassigned"]) == (dropped, reassigned)
+    assert stats["rank_seconds"][0][1] >= 2.0
@@ -0,0 +1,84 @@
+"""Tests for convergence-aware adaptation step scheduling."""
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.early_stopping import StepScheduler
+from multi_agent.core.maml import BatchedMAML, collate_tasks
+from multi_agent.core.models import MLPRegressor
+from multi_agent.core.task_sampler import SinusoidTasks
+from multi_agent.tools.adaptation_tool import AdaptationTool
+from multi_agent.tools.maml_tool import MAMLTool
+
+
+def _tasks(n=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [SinusoidTasks()(rng) for _ in range(n)]
+
+
+def test_scheduler_stops_plateaued_tasks_and_reallocates():
+    scheduler = StepScheduler(adaptation_steps=4, tolerance=0.01, patience=1)
+    scheduler.start(2)
+    step = 0
+    while len(active := scheduler.active()):
+        # Task 0 plateaus immediately; task 1 keeps halving its loss
+        step += 1
+        scheduler.observe(active, torch.tensor([1.0, 0.5 ** step])[active])
+
+    assert scheduler.steps.tolist() == [2, 6]
+    report = scheduler.report()
+    assert report["fixed_schedule_steps"] == 8 and report["steps_taken"] == 8
+    assert report["steps_freed"] == 2 and report["steps_reallocated"] == 2
+    assert report["tasks_converged"] == 1
+
+
+@pytest.mark.parametrize("mode", ["maml", "reptile"])
+def test_scheduled_maml_matches_fixed_schedule_without_early_stops(mode):
+    batches = [batch for _, batch in collate_tasks(_tasks())]
+    steps = []
+    for scheduler in (None, StepScheduler(5, tolerance=-1.0, reallocate=False)):
+        torch.manual_seed(0)
+        learner = BatchedMAML(MLPRegressor(1, 1, 16), adaptation_steps=5, mode=mode,
+                              scheduler=scheduler)
+        steps.append(learner.outer_step(batches))
+
+    fixed, scheduled = steps
+    assert torch.allclose(fixed["curves"], scheduled["curves"], atol=1e-5)
+    assert scheduled["meta_loss"] == pytest.approx(fixed["meta_loss"], rel=1e-5)
+
+
+def test_maml_tool_reports_steps_saved_against_the_fixed_schedule():
+    tasks = _tasks(16)
+    tool = MAMLTool()
+    tool.set_cache(None)
+    common = dict(adaptation_steps=10, meta_iterations=2, mode="fomaml", hidden_dim=16)
+    saving = tool._run(tasks, early_stopping={"tolerance": 0.02, "reallocate": False}, **common)
+    reallocating = tool._run(tasks, early_stopping={"tolerance": 0.02}, **common)
+
+    assert saving["status"] == "success", saving.get("error_message")
+    report = saving["early_stopping"]
+    assert report["fixed_schedule_steps"] == 2 * 16 * 10
+    assert report["steps_saved"] == report["steps_freed"] > 0
+    assert report["steps_taken"] + report["steps_saved"] == report["fixed_schedule_steps"]
+
+    report = reallocating["early_stopping"]
+    assert report["steps_taken"] <= report["fixed_schedule_steps"]
+    assert report["steps_reallocated"] > 0
+    assert len(reallocating["adaptation_performance"]) > 11  # hard tasks ran past 10 steps
+
+
+def test_adaptation_tool_stops_each_batch_on_convergence():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((32, 3)).astype(np.float32)
+    y = x.sum(-1, keepdims=True)
+    tool = AdaptationTool()
+    tool.set_cache(None)
+    result = tool._run(x, y, learning_rate=0.05, adaptation_steps=20, replay_batch_size=0,
+                       stream=[(x, y)] * 3, early_stopping={"tolerance": 0.05, "patience": 2})
+
+    assert result["status"] == "success", result.get("error_message")
+    report = result["early_stopping"]
+    assert report["tasks"] == 4 and report["steps_taken"] == result["throughput"]["updates"]
+    assert report["steps_saved"] > 0
+    assert result["convergence_achieved"] == (report["tasks_converged"] == 4)
@@ -0,0 +1,93 @@
+"""Tests for the population-based EmergentOptimization workflow."""
+
+import math
+
+import numpy as np
+import pytest
+
+from multi_agent.agents import MetaLearningAgent
+from multi_agent.workflows.emergent_optimization import EmergentOptimization, Member
+
+SMALL = {"population_size": 3, "generations": 2, "steps_per_generation": 1, "hidden_dim": 8,
+         "executor": "thread", "search_space": {"adaptation_steps": (1, 2, False)}}
+
+
+def _tasks(count=3, seed=0):
+    rng = np.random.default_rng(seed)
+    tasks = []
+    for _ in range(count):
+        slope = rng.standard_normal((3, 1)).astype(np.float32)
+        x = rng.uniform(-1, 1, size=(24, 3)).astype(np.float32)
+        tasks.append({"support_x": x[:12], "support_y": x[:12] @ slope,
+                      "query_x": x[12:], "query_y": x[12:] @ slope})
+    return tasks
+
+
+def test_population_trains_and_reports_the_best_team():
+    result = EmergentOptimization(config=SMALL).optimize(_tasks())
+
+    assert result["status"] == "success"
+    assert len(result["history"]) == 2
+    final_scores = result["history"][-1]["scores"]
+    assert result["best"]["score"] == min(final_scores.values())
+    assert result["best"]["parameters"]["net.0.weight"].shape == (8, 3)
+    assert result["compute"]["member_generations"] == 6
+    # Exploit/explore runs between generations, never after the last one
+    assert len(result["history"][0]["exploited"]) == 1 and result["history"][1]["exploited"] == []
+
+
+def test_runs_are_deterministic_for_a_seed():
+    first = EmergentOptimization(config=SMALL).optimize(_tasks())
+    second = EmergentOptimization(config=SMALL).optimize(_tasks())
+
+    assert first["history"] == second["history"]
+    assert first["best"]["hyperparameters"] == second["best"]["hyperparameters"]
+
+
+def test_exploit_copies_handles_and_perturbs_within_bounds():
+    optimization = EmergentOptimization(config={"population_size": 4, "exploit_fraction": 0.25})
+    optimization.population = [
+        Member(i, {"inner_lr": 0.1, "outer_lr": 1e-3, "learning_rate": 0.01, "adaptation_steps": 10},
+               parameters={"w": f"handle-{i}"}, score=float(i))
+        for i in range(4)
+    ]
+
+    (event,) = optimization._exploit_and_explore(generation=3)
+
+    loser = optimization.population[3]
+    assert event == {"member_id": 3, "copied_from": 0, "hyperparameters": loser.hyperparameters}
+    assert loser.parameters == {"w": "handle-0"} and loser.lineage == [(3, 0)]
+    assert loser.hyperparameters["adaptation_steps"] in (9, 10)
+    assert loser.hyperparameters["inner_lr"] in (pytest.approx(0.08), pytest.approx(0.125))
+
+
+def test_dominated_stale_teams_are_stopped():
+    optimization = EmergentOptimization(config={"population_size": 4,
+                                                "early_stopping": {"patience": 2}})
+    optimization.population = [Member(i, {}, score=float(i), stale=stale)
+                               for i, stale in enumerate([3, 0, 2, 1])]
+
+    # Team 0 is stale but leads; team 3 is dominated but still improving
+    assert optimization._stop_dominated() == [2]
+    assert [m.active for m in optimization.population] == [True, True, False, True]
+
+
+def test_best_team_is_checkpointed_through_the_meta_agent(tmp_path):
+    agent = MetaLearningAgent({"checkpoint_dir": str(tmp_path), "hidden_dim": 8})
+    result = EmergentOptimization(agents=[agent], config=dict(SMALL, generations=1)).optimize(
+        _tasks())
+
+    assert result["checkpoint_id"] is not None
+    restored = agent.checkpoints.meta_parameters()
+    for name, value in result["best"]["parameters"].items():
+        assert restored[name].equal(value)
+
+
+def test_process_pool_matches_thread_pool():
+    config = dict(SMALL, population_size=2, generations=1)
+    threaded = EmergentOptimization(config=config).optimize(_tasks())
+    processes = EmergentOptimization(config=dict(config, executor="process")).optimize(_tasks())
+
+    assert processes["status"] == "success"
+    assert processes["history"] == threaded["history"]
+    assert math.isfinite(processes["best"]["score"])
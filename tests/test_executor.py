@@ -0,0 +1,179 @@
+"""Tests for the concurrent subtask executor."""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from multi_agent.workflows.executor import SubtaskExecutor
+from multi_agent.workflows.subtasks import Subtask
+
+
+class SleepTool:
+    """Minimal tool double: sleeps, optionally fails, records call order."""
+
+    def __init__(self, log=None):
+        self.log = log if log is not None else []
+        self.stopped = threading.Event()
+
+    def _run(self, label="", seconds=0.0, fail=False):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not self.stopped.is_set():
+            time.sleep(0.01)
+        self.log.append(label)
+        if fail:
+            raise RuntimeError(f"{label} failed")
+        return {"status": "success", "label": label}
+
+    async def _arun(self, label="", seconds=0.0, fail=False):
+        await asyncio.sleep(seconds)
+        return self._run(label, 0.0, fail)
+
+    def cancel(self):
+        self.stopped.set()
+
+
+class StatefulTool(SleepTool):
+    stateful = True
+
+
+def _subtask(name, tool, depends_on=(), **kwargs):
+    kwargs.setdefault("label", name)
+    return Subtask(name, tool, kwargs, list(depends_on))
+
+
+def test_dependents_run_after_their_dependencies():
+    log = []
+    tool = SleepTool(log)
+    subtasks = [
+        _subtask("report", tool, depends_on=["fit", "score"]),
+        _subtask("fit", tool, seconds=0.1),
+        _subtask("score", tool, seconds=0.05),
+    ]
+    with SubtaskExecutor() as executor:
+        records = executor.run(subtasks)
+
+    assert list(records) == ["fit", "score", "report"]
+    assert all(record["status"] == "success" for record in records.values())
+    assert log[-1] == "report"
+
+
+def test_failed_dependency_skips_dependents():
+    tool = SleepTool()
+    subtasks = [_subtask("fit", tool, fail=True), _subtask("report", tool, depends_on=["fit"])]
+    with SubtaskExecutor() as executor:
+        records = executor.run(subtasks)
+
+    assert records["fit"]["status"] == "error"
+    assert records["report"]["status"] == "skipped"
+    assert "fit" in records["report"]["reason"]
+
+
+def test_timeout_abandons_subtask_and_skips_dependents():
+    slow, fast = SleepTool(), SleepTool()
+    subtasks = [
+        _subtask("slow", slow, seconds=5.0),
+        _subtask("fast", fast),
+        _subtask("after", fast, depends_on=["slow"]),
+    ]
+    with SubtaskExecutor(timeouts={"slow": 0.1}) as executor:
+        start = time.monotonic()
+        records = executor.run(subtasks)
+
+    assert time.monotonic() - start < 2.0
+    assert records["slow"]["status"] == "timeout"
+    assert records["fast"]["status"] == "success"
+    assert records["after"]["status"] == "skipped"
+    assert slow.stopped.is_set()
+
+
+def test_cancel_skips_pending_subtasks():
+    tool = SleepTool()
+    subtasks = [_subtask("first", tool, seconds=5.0), _subtask("second", tool, depends_on=["first"])]
+    with SubtaskExecutor() as executor:
+        threading.Timer(0.1, executor.cancel).start()
+        records = executor.run(subtasks)
+
+    assert records["second"] == {"status": "skipped", "reason": "cancelled", "elapsed": 0.0}
+    assert tool.stopped.is_set()
+
+
+def test_stateful_and_streaming_subtasks_stay_on_threads():
+    executor = SubtaskExecutor(kind="process")
+
+    assert executor.kind_of(_subtask("plain", SleepTool())) == "process"
+    assert executor.kind_of(_subtask("stateful", StatefulTool())) == "thread"
+    stream = (batch for batch in range(3))
+    assert executor.kind_of(Subtask("stream", SleepTool(), {"stream": stream})) == "thread"
+
+
+def test_invalid_kind_is_rejected():
+    with pytest.raises(ValueError):
+        SubtaskExecutor(kind="gpu")
+
+
+def test_arun_respects_dependencies_and_timeouts():
+    tool = SleepTool()
+    subtasks = [
+        _subtask("slow", tool, seconds=5.0),
+        _subtask("fit", tool, seconds=0.05),
+        _subtask("report", tool, depends_on=["fit"]),
+        _subtask("after", tool, depends_on=["slow"]),
+    ]
+    executor = SubtaskExecutor(timeouts={"slow": 0.1})
+    records = asyncio.run(executor.arun(subtasks))
+
+    assert records["slow"]["status"] == "timeout"
+    assert records["fit"]["status"] == "success"
+    assert records["report"]["status"] == "success"
+    assert records["after"]["status"] == "skipped"
+
+
+def test_process_timeout_terminates_worker():
+    tool = SleepTool()
+    with SubtaskExecutor(kind="process", max_workers=1, timeouts={"stuck": 1.0}) as executor:
+        pool = executor._get_process_pool()
+        records = executor.run([_subtask("stuck", tool, seconds=60.0)])
+        assert records["stuck"]["status"] == "timeout"
+        assert executor._process_pool is not pool
+
+        deadline = time.monotonic() + 5.0
+        while multiprocessing.active_children() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not multiprocessing.active_children()
+
+        # A fresh pool serves the next run
+        records = executor.run([_subtask("quick", tool)])
+        assert records["quick"]["status"] == "success"
+
+
+def test_cancelling_one_concurrent_workflow_leaves_the_other_running():
+    from multi_agent.workflows import CollaborativeLearning
+    from multi_agent.workflows.executor import RunHandle
+
+    class SleepWorkflow(CollaborativeLearning):
+        def build_subtasks(self, task, tool=None, **kwargs):
+            return [_subtask("first", tool, seconds=0.5),
+                    _subtask("second", tool, depends_on=["first"])]
+
+    workflow = SleepWorkflow(agents=[])
+    cancelled_tool, other_tool = SleepTool(), SleepTool()
+    handle = RunHandle()
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.1, handle.cancel)
+        return await asyncio.gather(
+            workflow.asolve_task("cancelled", run_handle=handle, tool=cancelled_tool),
+            workflow.asolve_task("other", tool=other_tool)
+        )
+
+    cancelled, other = asyncio.run(main())
+
+    records = cancelled["results"]["subtasks"]
+    assert records["first"]["status"] == records["second"]["status"] == "skipped"
+    assert cancelled_tool.stopped.is_set()
+    records = other["results"]["subtasks"]
+    assert records["first"]["status"] == records["second"]["status"] == "success"
+    assert other["status"] == "success" and not other_tool.stopped.is_set()
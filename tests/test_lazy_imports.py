@@ -0,0 +1,49 @@
+"""Tests for lazy package imports and deferred CrewAI construction."""
+
+import subprocess
+import sys
+
+import pytest
+
+from experiments.multi_agent_benchmarks.import_time import measure
+
+
+def test_package_import_loads_no_heavy_dependency():
+    stage = measure("import multi_agent, multi_agent.agents, multi_agent.tools, "
+                    "multi_agent.workflows", repeats=1)
+
+    assert stage["heavy_modules_loaded"] == []
+
+
+def test_agent_construction_defers_crewai():
+    stage = measure("from multi_agent import CoordinatorAgent; CoordinatorAgent()", repeats=1)
+
+    assert stage["heavy_modules_loaded"] == []
+
+
+def test_lazy_attributes_resolve_and_cache():
+    code = (
+        "import multi_agent, multi_agent.agents as agents\n"
+        "cls = multi_agent.CoordinatorAgent\n"
+        "assert cls is agents.CoordinatorAgent\n"
+        "assert 'CoordinatorAgent' in vars(multi_agent)\n"
+        "assert 'CollaborativeLearning' in dir(multi_agent)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_unknown_attribute_raises():
+    import multi_agent
+
+    with pytest.raises(AttributeError):
+        multi_agent.NotAnAgent
+
+
+def test_agent_is_built_on_first_use():
+    from multi_agent.agents.coordinator_agent import CoordinatorAgent
+
+    coordinator = CoordinatorAgent()
+    assert coordinator._agent is None
+    agent = coordinator.agent
+    assert coordinator.agent is agent
+    assert "crewai" in sys.modules
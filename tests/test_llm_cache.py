@@ -0,0 +1,130 @@
+"""Tests for the LLM response cache and offline replay."""
+
+import threading
+import time
+
+import pytest
+from pydantic import PrivateAttr
+
+from multi_agent.agents.llm_cache import (CachedLLM, LLMResponseCache, StubLLM, build_llm,
+                                          normalize_prompt)
+
+
+class CountingLLM(StubLLM):
+    """Stub that counts calls and can be slowed down."""
+
+    delay: float = 0.0
+    _calls: list = PrivateAttr(default_factory=list)
+
+    def call(self, messages, *args, **kwargs):
+        self._calls.append(messages)
+        time.sleep(self.delay)
+        return super().call(messages, *args, **kwargs)
+
+
+def test_normalize_prompt_hides_volatile_fields():
+    first = "Run at 2025-01-02T03:04:05Z\n    id 123e4567-e89b-12d3-a456-426614174000 <obj at 0x7f3a2b1c9d40>"
+    second = "Run at 2026-10-17 11:00:00.123   id 00000000-0000-0000-0000-000000000000 <obj at 0x55aa11bb22cc>"
+
+    assert normalize_prompt(first) == normalize_prompt(second)
+    assert normalize_prompt("Current Performance: 0.65") != normalize_prompt("Current Performance: 0.7")
+
+
+def test_response_cache_persists_and_expires(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    LLMResponseCache(path).put("k", "answer")
+
+    assert LLMResponseCache(path).get("k") == "answer"
+
+    expiring = LLMResponseCache(path, ttl=0.05)
+    time.sleep(0.1)
+    assert expiring.get("k") is None
+    assert expiring.metrics()["expired"] == 1
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = LLMResponseCache(max_entries=2)
+    cache.put("a", "1")
+    time.sleep(0.01)
+    cache.put("b", "2")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_equivalent_prompts_reach_the_llm_once():
+    inner = CountingLLM(model="counting")
+    llm = CachedLLM(llm=inner)
+
+    first = llm.call("Plan the run started 2025-01-02T03:04:05")
+    second = llm.call([{"role": "user", "content": "Plan   the run started 2026-10-17T00:00:00"}])
+    assert llm.call("Plan the run started 2025-01-02T03:04:05") == first
+    assert len(inner._calls) == 2  # str and message-list prompts differ in role prefix
+    assert second != "" and llm.metrics()["hits"] == 1
+
+
+def test_concurrent_identical_prompts_are_deduplicated():
+    inner = CountingLLM(model="counting", delay=0.2)
+    llm = CachedLLM(llm=inner)
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(llm.call("same prompt")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(inner._calls) == 1
+    assert len(set(responses)) == 1
+    assert llm.metrics()["deduplicated"] == 3
+
+
+def test_replay_serves_recordings_without_the_llm():
+    cache = LLMResponseCache()
+    recorder = CachedLLM(cache=cache, llm=CountingLLM(model="counting"))
+    recorded = recorder.call("what next?")
+
+    replay = CachedLLM(cache=cache, model="counting", mode="replay", strict=True)
+    assert replay.call("what next?") == recorded
+    with pytest.raises(LookupError):
+        replay.call("never recorded")
+
+    lenient = CachedLLM(cache=cache, model="counting", mode="replay")
+    assert lenient.call("never recorded").startswith("Thought:")
+    assert lenient.metrics()["replay_misses"] == 1
+
+
+def test_build_llm_shares_one_cache_per_path(tmp_path):
+    settings = {"path": str(tmp_path / "llm.sqlite"), "mode": "replay"}
+    first = build_llm({"llm": "gpt-4o-mini", "llm_cache": settings})
+    second = build_llm({"llm": "gpt-4o-mini", "llm_cache": settings})
+
+    assert first.cache is second.cache
+    assert first.model == "gpt-4o-mini" and first.llm is None
+    assert build_llm({}) is None
+
+
+def test_crew_run_replays_offline(tmp_path):
+    from multi_agent.workflows import CollaborativeLearning
+
+    path = str(tmp_path / "llm.sqlite")
+    inner = CountingLLM(model="counting")
+    recorded = CollaborativeLearning(config={
+        "execution_mode": "crew", "verbose": False,
+        "llm": inner, "llm_cache": {"path": path}
+    }).solve_task("HalfCheetah-v4")
+    assert recorded["status"] == "success"
+    assert inner._calls
+
+    replayed = CollaborativeLearning(config={
+        "execution_mode": "crew", "verbose": False,
+        "llm": "counting", "llm_cache": {"path": path, "mode": "replay", "strict": True}
+    })
+    result = replayed.solve_task("HalfCheetah-v4")
+    assert result["status"] == "success"
+    assert str(result["results"]) == str(recorded["results"])
+    assert replayed.coordinator.agent.llm.metrics()["replay_misses"] == 0
@@ -0,0 +1,111 @@
+"""Tests for low-memory (parameter-subset, micro-batched, gradient-free) adaptation."""
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.low_memory import LowMemoryAdapter, ParameterSubset, memory_report
+from multi_agent.core.models import MLPRegressor
+from multi_agent.tools.adaptation_tool import AdaptationTool
+
+
+def _data(n=64, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, 4)).astype(np.float32)
+    return torch.as_tensor(x), torch.as_tensor(np.tanh(x).sum(-1, keepdims=True))
+
+
+@pytest.mark.parametrize("mode", ["affine", "lora"])
+def test_subset_folds_into_a_plain_state_dict(mode):
+    torch.manual_seed(0)
+    model = MLPRegressor(4, 1, 16)
+    subset = ParameterSubset(model, mode, rank=2)
+    x, _ = _data()
+    with torch.no_grad():
+        before = model(x)
+        for p in subset.parameters():
+            p.add_(0.1 * torch.randn(p.shape))
+        adapted = model(x)
+    subset.merge()
+
+    with torch.no_grad():
+        assert torch.allclose(model(x), adapted, atol=1e-5)
+        assert not torch.allclose(adapted, before)
+    assert set(model.state_dict()) == {"net.0.weight", "net.0.bias", "net.2.weight",
+                                       "net.2.bias", "net.4.weight", "net.4.bias"}
+    assert not any(p.requires_grad for p in model.parameters())
+    subset.remove()
+    assert all(p.requires_grad for p in model.parameters())
+
+
+def test_micro_batching_matches_a_single_batch_update():
+    x, y = _data()
+    adapters = []
+    for ceiling in (None, 4_000):
+        torch.manual_seed(0)
+        adapter = LowMemoryAdapter(MLPRegressor(4, 1, 16), replay_batch_size=0, mode="lora",
+                                   rank=2, memory_ceiling_bytes=ceiling)
+        adapter.update(x, y)
+        adapters.append(adapter)
+
+    whole, micro = adapters
+    assert micro.last_micro_batch < whole.last_micro_batch == 64
+    assert micro.peak_step_bytes <= 4_000 < whole.peak_step_bytes
+    for p, q in zip(whole.trainable, micro.trainable):
+        assert torch.allclose(p, q, atol=1e-6)
+
+
+def test_ceiling_below_one_sample_is_rejected():
+    adapter = LowMemoryAdapter(MLPRegressor(4, 1, 16), mode="full", memory_ceiling_bytes=1024)
+    with pytest.raises(ValueError, match="memory ceiling"):
+        adapter.update(*_data())
+
+
+def test_memory_report_against_full_adaptation():
+    # Small batches on a wide model: gradients, not activations, dominate
+    torch.manual_seed(0)
+    x, y = _data(n=8)
+    report = memory_report(MLPRegressor(4, 1, 128), x, y, adaptation_steps=20, learning_rate=0.05,
+                           configs={"affine": {"mode": "affine"},
+                                    "spsa": {"mode": "affine", "gradient_free": True}})
+
+    assert report["full"]["peak_vs_full"] == 1.0
+    assert report["affine"]["trainable_parameters"] < report["full"]["trainable_parameters"]
+    assert report["affine"]["peak_step_bytes"] < report["full"]["peak_step_bytes"]
+    assert report["spsa"]["peak_vs_full"] < report["affine"]["peak_vs_full"]
+    for entry in report.values():
+        assert entry["final_loss"] < entry["initial_loss"]
+
+
+def test_tool_switches_modes_and_reports_memory():
+    x, y = _data()
+    tool = AdaptationTool()
+    tool.set_cache(None)
+    result = tool._run(x, y, adaptation_steps=5, hidden_dim=16, adaptation_mode="lora",
+                       lora_rank=2, memory_ceiling_mb=0.004, memory_report=True)
+
+    assert result["status"] == "success", result.get("error_message")
+    assert result["memory"]["mode"] == "lora" and result["memory"]["micro_batch_size"] < 64
+    assert result["memory"]["peak_step_bytes"] <= 0.004 * 2 ** 20
+    assert set(result["memory_report"]) == {"full", "configured"}
+    assert result["performance_metrics"]["final_loss"] < result["performance_metrics"]["initial_loss"]
+
+    # Back to full-parameter updates on the same (already adapted) model
+    plain = tool._run(x, y, adaptation_steps=1, hidden_dim=16)
+    assert plain["memory"] is None
+    assert all(p.requires_grad for p in tool.adapter.model.parameters())
+    assert plain["performance_metrics"]["initial_loss"] == pytest.approx(
+        result["performance_metrics"]["final_loss"], rel=1e-4)
+
+
+@pytest.mark.parametrize("mode, kwargs", [("affine", {}), ("affine", {"gradient_free": True}),
+                                          ("lora", {"lora_rank": 2})])
+def test_repeated_calls_reuse_the_low_memory_adapter(mode, kwargs):
+    x, y = _data()
+    tool = AdaptationTool()
+    tool.set_cache(None)
+    tool._run(x, y, adaptation_steps=1, hidden_dim=16, adaptation_mode=mode, **kwargs)
+    adapter, optimizer = tool.adapter, tool.adapter.optimizer
+    tool._run(x, y, adaptation_steps=1, hidden_dim=16, adaptation_mode=mode, **kwargs)
+
+    assert tool.adapter is adapter and tool.adapter.optimizer is optimizer
@@ -0,0 +1,85 @@
+"""Tests for the batched MAML meta-learner."""
+
+import pytest
+import torch
+
+from multi_agent.core.maml import BatchedMAML, collate_tasks
+from multi_agent.core.models import MLPRegressor
+
+
+def _linear_tasks(num_tasks, support=10, query=10, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    tasks = []
+    for _ in range(num_tasks):
+        slope = torch.randn(1, generator=generator)
+        xs = torch.rand(support + query, 1, generator=generator) * 2 - 1
+        ys = slope * xs
+        tasks.append({"support_x": xs[:support], "support_y": ys[:support],
+                      "query_x": xs[support:], "query_y": ys[support:]})
+    return tasks
+
+
+def test_collate_groups_tasks_by_shape():
+    tasks = _linear_tasks(3) + _linear_tasks(2, support=5)
+    groups = collate_tasks(tasks)
+
+    assert [indices for indices, _ in groups] == [[0, 1, 2], [3, 4]]
+    assert groups[0][1].support_x.shape == (3, 10, 1)
+    assert groups[1][1].num_tasks == 2
+
+
+def test_collate_promotes_1d_arrays():
+    task = {"support_x": [0.1, 0.2], "support_y": [0.2, 0.4],
+            "query_x": [0.3], "query_y": [0.6]}
+    (_, batch), = collate_tasks([task])
+
+    assert batch.support_x.shape == (1, 2, 1)
+    assert batch.query_y.shape == (1, 1, 1)
+
+
+def test_adapt_curves_cover_every_step():
+    torch.manual_seed(0)
+    learner = BatchedMAML(MLPRegressor(1, 1, 16), inner_lr=0.1, adaptation_steps=4)
+    (_, batch), = collate_tasks(_linear_tasks(5))
+
+    adapted, curves = learner.adapt(batch)
+
+    assert curves.shape == (5, 5)
+    assert adapted["net.0.weight"].shape == (5, 16, 1)
+    assert (curves[:, -1] < curves[:, 0]).all()
+
+
+@pytest.mark.parametrize("mode", ["maml", "fomaml", "reptile"])
+def test_meta_training_reduces_loss(mode):
+    torch.manual_seed(0)
+    learner = BatchedMAML(MLPRegressor(1, 1, 16), inner_lr=0.1, outer_lr=0.01,
+                          adaptation_steps=3, mode=mode)
+    batches = [batch for _, batch in collate_tasks(_linear_tasks(8))]
+
+    first = learner.outer_step(batches)["meta_loss"]
+    for _ in range(30):
+        last = learner.outer_step(batches)["meta_loss"]
+
+    assert last < first
+
+
+def test_reptile_moves_by_reptile_step():
+    torch.manual_seed(0)
+    model = MLPRegressor(1, 1, 8)
+    learner = BatchedMAML(model, inner_lr=0.1, adaptation_steps=2,
+                          mode="reptile", reptile_step=1.0)
+    (_, batch), = collate_tasks(_linear_tasks(1))
+
+    with torch.no_grad():
+        adapted, _ = learner.adapt(batch)
+    learner.outer_step([batch])
+
+    for name, p in model.named_parameters():
+        assert torch.allclose(p, adapted[name][0], atol=1e-6)
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        BatchedMAML(MLPRegressor(1, 1), mode="sgd")
+    with pytest.raises(ValueError):
+        BatchedMAML(MLPRegressor(1, 1), mode="reptile", reptile_step=0.0)
@@ -0,0 +1,154 @@
+"""Tests for the inter-agent message broker."""
+
+import threading
+import time
+
+import pytest
+
+from multi_agent.communication.message_broker import ConnectionTransport, MessageBroker
+
+
+def test_topic_routing_with_patterns():
+    broker = MessageBroker()
+    exact = broker.subscribe("adaptation.gradients")
+    wildcard = broker.subscribe("adaptation.*")
+    other = broker.subscribe("ssm.states")
+
+    broker.publish("adaptation.gradients", 1, sender="adapt")
+    broker.publish("adaptation.loss", 2)
+    broker.publish("meta.loss", 3)
+
+    assert [m.payload for m in exact.drain()] == [1]
+    assert [m.payload for m in wildcard.drain()] == [1, 2]
+    assert other.drain() == []
+    assert broker.metrics()["unrouted"] == 1
+
+
+def test_registered_topic_types_are_enforced():
+    broker = MessageBroker()
+    broker.register_topic("adaptation.loss", float)
+
+    with pytest.raises(TypeError):
+        broker.publish("adaptation.loss", "high")
+    broker.publish("adaptation.loss", 0.5)
+
+
+@pytest.mark.parametrize("overflow,expected", [("drop_oldest", [3, 4]), ("drop_newest", [1, 2])])
+def test_drop_policies_bound_the_queue(overflow, expected):
+    broker = MessageBroker()
+    subscription = broker.subscribe("t", maxsize=2, overflow=overflow)
+    for value in range(1, 5):
+        broker.publish("t", value)
+
+    assert [m.payload for m in subscription.drain()] == expected
+    assert subscription.dropped == 2
+    assert subscription.max_depth == 2
+
+
+def test_block_policy_applies_backpressure():
+    broker = MessageBroker(publish_timeout=5.0)
+    subscription = broker.subscribe("t", maxsize=1, overflow="block")
+    broker.publish("t", 1)
+
+    threading.Timer(0.2, subscription.get).start()
+    start = time.monotonic()
+    broker.publish("t", 2)
+
+    assert time.monotonic() - start >= 0.15
+    assert [m.payload for m in subscription.drain()] == [2]
+    assert subscription.dropped == 0
+
+
+def test_block_policy_drops_after_timeout():
+    broker = MessageBroker(publish_timeout=0.05)
+    subscription = broker.subscribe("t", maxsize=1)
+    broker.publish("t", 1)
+    broker.publish("t", 2)
+
+    assert subscription.dropped == 1
+
+
+def test_coalescing_merges_high_frequency_updates():
+    broker = MessageBroker()
+    gradients = broker.subscribe("grad.*", coalesce_key=lambda m: m.topic,
+                                 merge=lambda old, new: old + new)
+    for step in range(10):
+        broker.publish("grad.layer0", 1.0)
+        broker.publish("grad.layer1", float(step))
+
+    batch = gradients.drain()
+    assert [(m.topic, m.payload, m.merged) for m in batch] == [
+        ("grad.layer0", 10.0, 9), ("grad.layer1", 45.0, 9)
+    ]
+    assert gradients.coalesced == 18
+    # Once consumed, the next update starts a fresh message
+    broker.publish("grad.layer0", 1.0)
+    assert gradients.drain()[0].merged == 0
+
+
+def test_publisher_batching_and_flush():
+    broker = MessageBroker(max_batch=3, flush_interval=60.0)
+    subscription = broker.subscribe("t")
+    broker.publish("t", 1)
+    broker.publish("t", 2)
+    assert len(subscription) == 0
+
+    broker.publish("t", 3)
+    assert len(subscription) == 3
+    broker.publish("t", 4)
+    broker.flush()
+    assert [m.payload for m in subscription.drain()] == [1, 2, 3, 4]
+
+    broker.publish_many("t", [5, 6])
+    assert len(subscription) == 2
+    assert broker.metrics()["batches_sent"] == 3
+
+
+def test_connection_transport_carries_batches_between_brokers():
+    left, right = ConnectionTransport.pair()
+    sender, receiver = MessageBroker(transport=left), MessageBroker(transport=right)
+    subscription = receiver.subscribe("rollouts")
+
+    sender.publish_many("rollouts", [{"step": i} for i in range(5)], sender="env")
+    received = []
+    while len(received) < 5:
+        batch = subscription.get_batch(timeout=5.0)
+        assert batch
+        received.extend(batch)
+
+    assert [m.payload["step"] for m in received] == list(range(5))
+    assert received[0].sender == "env"
+    sender.close()
+    receiver.close()
+
+
+def test_metrics_report_depth_latency_and_drops():
+    broker = MessageBroker()
+    subscription = broker.subscribe("t", maxsize=2, overflow="drop_newest")
+    for value in range(3):
+        broker.publish("t", value)
+    subscription.get()
+
+    metrics = broker.metrics()
+    assert metrics["published"] == 3
+    assert metrics["delivered"] == 1
+    assert metrics["dropped"] == 1
+    assert metrics["queue_depth"] == 1
+    assert metrics["max_queue_depth"] == 2
+    assert metrics["p99_latency_ms"] >= 0.0
+
+
+def test_coordinator_monitoring_uses_broker_metrics():
+    from multi_agent.agents.coordinator_agent import CoordinatorAgent
+
+    coordinator = CoordinatorAgent()
+    coordinator.broker.publish("subtask.ssm", {"status": "success"})
+    coordinator.broker.publish("subtask.maml", {"status": "error"})
+    coordinator.coordinate({"ssm": {"status": "success", "elapsed": 0.1}})
+
+    report = coordinator.monitor_collaboration(agents=[object(), object()])
+    assert report["active_agents"] == 2
+    assert report["messages_published"] == 2
+    assert report["messages_received"] == 2
+    assert report["queue_depth"] == 0
+    assert report["delivery_rate"] == 1.0
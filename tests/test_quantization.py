@@ -0,0 +1,72 @@
+"""Tests for bf16/int8 inference of the diagonal SSM."""
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.quantization import (LowPrecisionLinear, calibrate_ssm, precision_report,
+                                           quantize_ssm)
+from multi_agent.core.ssm import DiagonalSSM
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return DiagonalSSM(state_dim=16, input_dim=4, output_dim=3)
+
+
+@pytest.mark.parametrize("precision, tolerance", [("bf16", 2e-2), ("int8", 3e-2)])
+def test_low_precision_linear_tracks_float32(precision, tolerance):
+    torch.manual_seed(0)
+    linear = torch.nn.Linear(32, 8)
+    x = torch.randn(5, 7, 32)
+
+    out = LowPrecisionLinear(linear, precision)(x)
+
+    assert out.dtype == torch.float32 and out.shape == (5, 7, 8)
+    exact = linear(x).detach()
+    assert torch.linalg.vector_norm(out - exact) / torch.linalg.vector_norm(exact) < tolerance
+
+
+@pytest.mark.parametrize("precision", ["bf16", "int8"])
+def test_state_stays_float32_and_matches_reference(model, precision):
+    quantized = quantize_ssm(model, precision)
+    x = torch.randn(2, 50, 4)
+    calibration = calibrate_ssm(model, quantized, x)
+
+    assert all(entry["precision"] == precision for entry in calibration["projections"].values())
+    assert calibration["output_relative_error"] < 0.05
+    outputs, state = quantized(x)
+    _, h = quantized.step(x[:, 0], quantized.init_state(2))
+    assert state.dtype == h.dtype == torch.float32
+    assert quantized.log_rate.dtype == torch.float32
+    assert isinstance(model.in_proj, torch.nn.Linear)  # the trained model is untouched
+
+
+def test_calibration_falls_back_to_float32_over_tolerance(model):
+    quantized = quantize_ssm(model, "int8")
+    calibration = calibrate_ssm(model, quantized, torch.randn(1, 20, 4), tolerance=0.0)
+
+    assert all(entry["precision"] == "fp32" for entry in calibration["projections"].values())
+    assert calibration["output_relative_error"] < 1e-6
+    assert isinstance(quantized.out_proj, torch.nn.Linear)
+
+
+def test_precision_report_and_agent_config():
+    from multi_agent.agents import StateModelingAgent
+
+    t = np.linspace(0, 8 * np.pi, 200, dtype=np.float32)
+    sequence = np.stack([np.sin(t), np.cos(t)], axis=-1)
+    agent = StateModelingAgent({"precision": "int8", "precision_report": True, "state_dim": 16,
+                                "cache": False})
+    result = agent.ssm_tool._run(**agent.tool_kwargs(sequence))
+
+    assert result["status"] == "success", result.get("error_message")
+    assert result["precision"] == "int8" and result["calibration"]["calibration_steps"] == 199
+    report = result["precision_report"]
+    assert set(report) == {"fp32", "bf16", "int8"}
+    assert report["fp32"]["speedup"] == 1.0 and report["fp32"]["relative_error"] == 0.0
+    for entry in report.values():
+        assert entry["steps_per_second"] > 0 and np.isfinite(entry["mse"])
+    assert report["int8"]["relative_error"] < 0.1
+    assert result["predictions"].shape == (10, 2)
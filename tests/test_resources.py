@@ -0,0 +1,106 @@
+"""Tests for the coordinator's resource allocator and its enforcement."""
+
+import time
+
+import pytest
+
+from multi_agent.core.resources import ResourceAllocator, ResourceGrant
+from multi_agent.workflows.executor import SubtaskExecutor
+from multi_agent.workflows.subtasks import Subtask
+
+
+class ThreadCountTool:
+    """Reports the torch intra-op threads it runs with."""
+
+    def _run(self, seconds=0.0):
+        import torch
+        time.sleep(seconds)
+        return {"status": "success", "threads": torch.get_num_threads()}
+
+
+class AllocatingTool:
+    """Allocates and touches ``megabytes`` of tensor memory."""
+
+    def _run(self, megabytes=64):
+        import torch
+        try:
+            block = torch.ones(megabytes * 2 ** 18)
+            return {"status": "success", "sum": block.sum().item()}
+        except Exception as e:
+            return {"status": "error", "error_message": str(e)}
+
+
+def test_cores_follow_observed_work_and_never_oversubscribe():
+    allocator = ResourceAllocator(total_cores=8, wall_budget_seconds=60.0)
+    first = allocator.allocate(["maml", "ssm"])
+    assert first["maml"].cores == first["ssm"].cores == 4
+    assert first["maml"].wall_seconds == 60.0
+
+    # MAML needed three times the core-seconds of the SSM fit
+    allocator.record("maml", 3.0, first["maml"])
+    allocator.record("ssm", 1.0, first["ssm"])
+    allocator.record("ssm", 100.0, first["ssm"], status="timeout")  # ignored
+    grants = allocator.allocate(["maml", "ssm", "adaptation"])
+    cores = {name: grant.cores for name, grant in grants.items()}
+    assert sum(cores.values()) == 8
+    assert cores["maml"] > cores["adaptation"] > cores["ssm"] >= 1
+    assert grants["ssm"].wall_seconds == pytest.approx(3.0 * 4.0 / cores["ssm"])
+
+    crowded = ResourceAllocator(total_cores=2).allocate(["a", "b", "c"])
+    assert [grant.cores for grant in crowded.values()] == [1, 1, 1]
+
+
+def test_thread_subtasks_run_with_their_own_core_grant():
+    import torch
+
+    before = torch.get_num_threads()
+    allocator = ResourceAllocator(total_cores=4, weights={"heavy": 3.0, "light": 1.0})
+    tool = ThreadCountTool()
+    subtasks = [Subtask("heavy", tool, {"seconds": 0.2}), Subtask("light", tool, {"seconds": 0.2}),
+                Subtask("after", tool, depends_on=["heavy"])]
+    with SubtaskExecutor(allocator=allocator) as executor:
+        records = executor.run(subtasks)
+
+    assert records["heavy"]["result"]["threads"] == records["heavy"]["resources"]["cores"] == 3
+    assert records["light"]["result"]["threads"] == 1
+    # A later dependency level gets the whole machine
+    assert records["after"]["result"]["threads"] == 4
+    assert torch.get_num_threads() == before
+    assert allocator.report()["runs"] == {"heavy": 1, "light": 1, "after": 1}
+
+
+def test_wall_clock_grant_bounds_the_timeout():
+    allocator = ResourceAllocator(total_cores=1, wall_budget_seconds=0.2)
+    with SubtaskExecutor(allocator=allocator) as executor:
+        records = executor.run([Subtask("slow", ThreadCountTool(), {"seconds": 2.0})])
+    assert records["slow"]["status"] == "timeout"
+    assert records["slow"]["elapsed"] == 0.2
+    assert "slow" not in allocator.work
+
+
+def test_process_workers_are_held_to_their_memory_grant():
+    allocator = ResourceAllocator(total_cores=1, total_memory_bytes=32 * 2 ** 20)
+    with SubtaskExecutor(kind="process", max_workers=1, allocator=allocator) as executor:
+        records = executor.run([Subtask("big", AllocatingTool(), {"megabytes": 256}),
+                                Subtask("small", AllocatingTool(), {"megabytes": 4},
+                                        depends_on=["big"])])
+        assert records["big"]["status"] == "error"
+        assert records["big"]["resources"]["memory_bytes"] == 32 * 2 ** 20
+
+        # The cap is lifted after each subtask
+        allocator.total_memory_bytes = None
+        assert executor.run([Subtask("big", AllocatingTool(), {"megabytes": 256})])[
+            "big"]["status"] == "success"
+
+
+def test_coordinator_owns_the_workflow_allocator():
+    from multi_agent.agents import CoordinatorAgent
+    from multi_agent.workflows import CollaborativeLearning
+
+    coordinator = CoordinatorAgent({"resources": {"total_cores": 2}})
+    workflow = CollaborativeLearning(agents=[], coordinator=coordinator)
+    assert workflow.executor.allocator is coordinator.allocator
+    coordinator.allocator.record("ssm", 1.0, ResourceGrant(cores=2))
+    report = coordinator.monitor_collaboration([])["resources"]
+    assert report["total_cores"] == 2 and report["core_seconds"] == {"ssm": 2.0}
+    assert CoordinatorAgent({"resources": False}).allocator is None
@@ -0,0 +1,124 @@
+"""Tests for the content-addressed tool result cache."""
+
+import numpy as np
+import torch
+
+from multi_agent.core.cache import ResultCache, content_hash
+
+
+def test_content_hash_follows_contents_not_identity():
+    data = torch.arange(12.0).reshape(3, 4)
+
+    assert content_hash({"x": data, "lr": 0.1}) == content_hash({"lr": 0.1, "x": data.clone()})
+    assert content_hash(data) != content_hash(data.double())
+    assert content_hash(data) != content_hash(data.reshape(4, 3))
+    assert content_hash({"x": data, "lr": 0.1}) != content_hash({"x": data, "lr": 0.2})
+    assert content_hash(np.ones(3)) == content_hash(np.ones(3))
+
+
+def test_memory_tier_is_byte_bounded_lru():
+    cache = ResultCache(max_bytes=3 * 4096)
+    for name in "abc":
+        cache.put(name, torch.zeros(1000))
+    cache.get("a")
+    cache.put("d", torch.zeros(1000))
+
+    assert "b" not in cache
+    assert "a" in cache and "d" in cache
+    metrics = cache.metrics()
+    assert metrics["evictions"] == 1
+    assert metrics["bytes"] <= cache.max_bytes
+
+
+def test_hits_are_private_copies():
+    cache = ResultCache()
+    value = {"weights": torch.ones(3)}
+    cache.put("k", value)
+    value["weights"].add_(1)
+
+    first = cache.get("k")
+    first["weights"].mul_(0)
+    assert torch.equal(cache.get("k")["weights"], torch.ones(3))
+    assert cache.metrics()["hits"] == 2
+    assert cache.get("missing") is None
+    assert cache.metrics()["misses"] == 1
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ResultCache(directory=str(tmp_path)).put("k", {"weights": torch.arange(4.0)})
+
+    cache = ResultCache(directory=str(tmp_path))
+    loaded = cache.get("k")
+    loaded["weights"].zero_()
+
+    assert torch.equal(ResultCache(directory=str(tmp_path)).get("k")["weights"], torch.arange(4.0))
+    assert cache.metrics()["disk_hits"] == 1
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_disk_bytes=6000)
+    for name in "abc":
+        cache.put(name, torch.zeros(1000))
+
+    metrics = cache.metrics()
+    assert metrics["disk_evictions"] >= 1
+    assert metrics["disk_bytes"] <= 6000
+
+
+def test_ssm_tool_reuses_identical_calls():
+    from multi_agent.tools.ssm_tool import SSMTool
+
+    tool = SSMTool()
+    tool.set_cache(ResultCache())
+    sequence = torch.sin(torch.linspace(0, 6, 64)).unsqueeze(-1)
+    kwargs = dict(state_dim=8, input_dim=1, prediction_steps=4)
+
+    first = tool._run(sequence, **kwargs)
+    second = tool._run(sequence.clone(), **kwargs)
+    assert torch.equal(first["predictions"], second["predictions"])
+    assert tool._cache.metrics()["hits"] == 1
+
+    second["predictions"].zero_()
+    assert torch.equal(tool._run(sequence, **kwargs)["predictions"], first["predictions"])
+
+    tool._run(sequence, **dict(kwargs, state_dim=16))
+    assert tool._cache.metrics()["misses"] == 2
+
+
+def test_adaptation_tool_hit_restores_adapter_state():
+    from multi_agent.tools.adaptation_tool import AdaptationTool
+
+    cache = ResultCache()
+    x = torch.randn(32, 3, generator=torch.Generator().manual_seed(0))
+    y = x.sum(dim=-1, keepdim=True)
+    computed, replayed = AdaptationTool(), AdaptationTool()
+    computed.set_cache(cache)
+    replayed.set_cache(cache)
+
+    first = computed._run(x, y, hidden_dim=8)
+    hit = replayed._run(x, y, hidden_dim=8)
+    assert hit["performance_metrics"] == first["performance_metrics"]
+    assert cache.metrics()["hits"] == 1
+    # Timings describe the original run, so a hit never reports them as fresh
+    assert hit["cached"] and "cached" not in first
+    assert hit["update_latency"] is None and hit["throughput"]["samples_per_second"] is None
+    assert first["update_latency"]["mean_ms"] > 0
+    assert content_hash(replayed.adapter.fingerprint()) == content_hash(computed.adapter.fingerprint())
+
+    # The next call starts from the advanced state, so it is a fresh key
+    second = computed._run(x, y, hidden_dim=8)
+    assert second["performance_metrics"]["initial_loss"] < first["performance_metrics"]["initial_loss"]
+    assert cache.metrics()["misses"] == 2
+
+
+def test_streams_bypass_the_cache():
+    from multi_agent.tools.adaptation_tool import AdaptationTool
+
+    tool = AdaptationTool()
+    tool.set_cache(ResultCache())
+    x = torch.randn(8, 2)
+    result = tool._run(None, None, stream=iter([(x, x[:, :1])]), hidden_dim=4)
+
+    assert result["status"] == "success"
+    assert tool._cache.metrics()["bypassed"] == 1
+    assert len(tool._cache) == 0
@@ -0,0 +1,100 @@
+"""Tests for vectorized rollouts and the EnvironmentAgent hand-off."""
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.envs import ToyDynamicsEnv, make_env_fn
+from multi_agent.core.rollout import VectorRollout
+
+
+def test_toy_env_dynamics_depend_on_the_seed():
+    first, second = ToyDynamicsEnv(), ToyDynamicsEnv()
+    first.reset(seed=0)
+    second.reset(seed=1)
+
+    assert not np.allclose(first._a, second._a)
+    obs, reward, terminated, truncated, _ = first.step(np.zeros(2, dtype=np.float32))
+    assert obs.shape == (4,) and obs.dtype == np.float32
+    assert reward <= 0.0 and not terminated and not truncated
+
+
+def test_collect_fills_buffer_and_marks_reset_steps():
+    with VectorRollout(make_env_fn(max_episode_steps=5), num_envs=3) as runner:
+        rollout, stats = runner.collect(12)
+
+    assert rollout.observations.shape == (13, 3, 4)
+    assert rollout.actions.shape == (12, 3, 2)
+    assert stats["env_steps"] == 36
+    assert stats["steps_per_second_per_core"] == stats["steps_per_second"]
+    # Episodes end at steps 4 and 10; the following step only resets
+    assert rollout.truncated[:, 0].nonzero()[0].tolist() == [4, 10]
+    assert (~rollout.valid[:, 0]).nonzero()[0].tolist() == [5, 11]
+
+    transitions = rollout.transitions()
+    assert transitions["observations"].shape == (3, 12, 4)
+    assert np.shares_memory(transitions["next_observations"].numpy(), rollout.observations)
+    assert torch.equal(transitions["next_observations"][:, :-1],
+                       transitions["observations"][:, 1:])
+
+
+def test_episodes_continue_across_collect_calls():
+    with VectorRollout(make_env_fn(), num_envs=2, seed=3) as runner:
+        first, _ = runner.collect(4)
+        last_obs = first.observations[-1].copy()
+        second, _ = runner.collect(4)
+
+    assert np.array_equal(second.observations[0], last_obs)
+    assert runner.total_steps == 16
+
+
+def test_async_mode_matches_sync():
+    with VectorRollout(make_env_fn(), num_envs=2, mode="async", seed=5) as runner:
+        async_rollout, _ = runner.collect(6)
+    with VectorRollout(make_env_fn(), num_envs=2, mode="sync", seed=5) as runner:
+        sync_rollout, _ = runner.collect(6)
+
+    np.testing.assert_allclose(async_rollout.observations, sync_rollout.observations)
+
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        VectorRollout(make_env_fn(), mode="threads")
+
+
+def test_environment_agent_feeds_ssm_and_maml_tools():
+    from multi_agent.agents.environment_agent import EnvironmentAgent
+    from multi_agent.tools.maml_tool import MAMLTool
+    from multi_agent.tools.ssm_tool import SSMTool
+
+    agent = EnvironmentAgent({"num_envs": 4, "num_steps": 32})
+    rollout = agent.collect_rollouts()
+    assert rollout["status"] == "success"
+    assert rollout["env_steps"] == 128
+
+    modeling = SSMTool()._run(state_dim=8, train_epochs=2, **agent.ssm_kwargs(rollout))
+    assert modeling["status"] == "success"
+
+    tasks = agent.meta_tasks(rollout)
+    assert len(tasks) == 4
+    meta = MAMLTool()._run(tasks, adaptation_steps=2, hidden_dim=16)
+    assert meta["status"] == "success"
+    assert meta["tasks_processed"] == 4
+    agent.environment_tool.close()
+
+
+def test_environment_tool_closes_least_recently_used_runners():
+    from multi_agent.agents.environment_agent import EnvironmentAgent
+
+    with EnvironmentAgent({"num_envs": 2, "num_steps": 4, "max_runners": 2}) as agent:
+        tool = agent.environment_tool
+        opened = {}
+        for seed in (0, 1, 0, 2):
+            assert tool._run(num_envs=2, num_steps=4, seed=seed)["status"] == "success"
+            opened.update({key[3]: runner for key, runner in tool._runners.items()})
+        assert [key[3] for key in tool._runners] == [0, 2]  # seed 1 was least recently used
+        assert opened[1].env.closed and not opened[0].env.closed
+        runners = list(tool._runners.values())
+
+    assert not tool._runners
+    assert all(runner.env.closed for runner in runners)
@@ -0,0 +1,127 @@
+"""Tests for the micro-batching SSM inference server."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.serving import SSMInferenceServer, StateTable
+from multi_agent.core.ssm import DiagonalSSM
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return DiagonalSSM(state_dim=8, input_dim=3, output_dim=2)
+
+
+def test_state_table_reuses_and_grows_slots():
+    table = StateTable(state_dim=4, capacity=2)
+    table.allocate("a", torch.ones(4))
+    table.allocate("b")
+    assert table.release("a").equal(torch.ones(4))
+    assert table.allocate("c") == 0  # the freed slot is reused
+
+    table.allocate("d")
+    assert table.capacity == 4 and table.slot("d") == 2
+    assert table.state("c").equal(torch.zeros(4))
+    with pytest.raises(KeyError):
+        table.allocate("b")
+
+
+def test_concurrent_streams_match_sequential_steps(model):
+    streams, steps = 16, 5
+    inputs = torch.randn(streams, steps, 3)
+    with torch.no_grad():
+        expected, _ = model(inputs)
+
+    results = {}
+    with SSMInferenceServer(model, max_batch_size=8, max_wait_ms=20.0, capacity=4) as server:
+        for stream in range(streams):
+            server.open_stream(stream)
+
+        def environment(stream):
+            results[stream] = [server.predict(stream, inputs[stream, t], timeout=10)
+                               for t in range(steps)]
+
+        threads = [threading.Thread(target=environment, args=(s,)) for s in range(streams)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = server.metrics()
+
+    for stream in range(streams):
+        assert torch.allclose(torch.stack(results[stream]), expected[stream], atol=1e-5)
+    assert metrics["requests"] == streams * steps
+    assert metrics["batches"] < streams * steps  # requests were actually batched
+    assert 0 < metrics["batch_fill_rate"] <= 1
+    assert metrics["p99_ms"] >= metrics["p50_ms"] > 0
+    assert metrics["state_slots"] == 16
+
+
+def test_requests_of_one_stream_stay_ordered(model):
+    inputs = torch.randn(4, 3)
+    with torch.no_grad():
+        expected, _ = model(inputs[None])
+
+    with SSMInferenceServer(model, max_batch_size=8, max_wait_ms=5.0) as server:
+        server.open_stream("env")
+        futures = [server.submit("env", x) for x in inputs]
+        outputs = torch.stack([future.result(timeout=10) for future in futures])
+        final_state = server.close_stream("env")
+
+    assert torch.allclose(outputs, expected[0], atol=1e-5)
+    assert server.metrics()["mean_batch_size"] == 1.0
+    with torch.no_grad():
+        _, state = model(inputs[None])
+    assert torch.allclose(final_state, state[0], atol=1e-5)
+
+
+def test_streams_being_stepped_cannot_be_closed(model):
+    entered, release = threading.Event(), threading.Event()
+    step = model.step
+
+    def blocking_step(x, state):
+        entered.set()
+        release.wait(10)
+        return step(x, state)
+
+    model.step = blocking_step
+    with SSMInferenceServer(model, max_batch_size=1, max_wait_ms=0.0) as server:
+        server.open_stream("old")
+        future = server.submit("old", torch.randn(3))
+        assert entered.wait(10)
+        # Closing now would free the slot the step is about to write back
+        with pytest.raises(RuntimeError):
+            server.close_stream("old")
+        release.set()
+        future.result(timeout=10)
+        server.close_stream("old")
+
+        new_state = torch.full((8,), 3.0)
+        server.open_stream("new", new_state)
+        assert server.table.state("new").equal(new_state)
+
+def test_agent_builds_a_server_from_a_fitted_model():
+    from multi_agent.agents import StateModelingAgent
+
+    t = np.linspace(0, 4 * np.pi, 64, dtype=np.float32)
+    agent = StateModelingAgent({"state_dim": 8, "cache": False,
+                                "serving": {"max_batch_size": 4, "max_wait_ms": 1.0}})
+    server = agent.inference_server(np.stack([np.sin(t), np.cos(t)], axis=-1))
+    try:
+        stream = server.open_stream()
+
+        async def step():
+            return await server.apredict(stream, [0.0, 1.0])
+
+        prediction = asyncio.run(step())
+    finally:
+        server.stop()
+
+    assert prediction.shape == (2,) and server.max_batch_size == 4
+    with pytest.raises(RuntimeError):
+        server.submit(stream, [0.0, 1.0])
@@ -0,0 +1,94 @@
+"""Tests for the shared-memory tensor store."""
+
+import os
+import pickle
+
+import numpy as np
+import torch
+
+from multi_agent.communication.shared_memory import (
+    SharedTensorStore,
+    TensorHandle,
+    handles_in,
+    load,
+    resolve,
+    share
+)
+from multi_agent.workflows.executor import SubtaskExecutor
+from multi_agent.workflows.subtasks import Subtask
+
+
+class SumTool:
+    """Tool double reporting what the worker received."""
+
+    def _run(self, data):
+        return {"status": "success", "sum": float(data.sum()),
+                "type": type(data).__name__, "pid": os.getpid()}
+
+
+def test_put_and_load_round_trip():
+    with SharedTensorStore() as store:
+        for tensor in [torch.randn(3, 4), torch.arange(6).reshape(2, 3),
+                       torch.randn(5).to(torch.bfloat16), torch.empty(0, 2)]:
+            handle = store.put(tensor)
+            loaded = load(pickle.loads(pickle.dumps(handle)))
+            assert loaded.dtype == tensor.dtype
+            assert torch.equal(loaded, tensor)
+        assert len(store) == 4
+
+
+def test_loaded_tensors_are_copy_on_write():
+    with SharedTensorStore() as store:
+        handle = store.put(np.zeros(8, dtype=np.float32))
+        first, second = load(handle), load(handle)
+        first += 1.0
+
+        assert torch.equal(second, torch.zeros(8))
+        assert torch.equal(load(handle), torch.zeros(8))
+
+
+def test_release_and_close_remove_files():
+    store = SharedTensorStore()
+    handle = store.put(torch.ones(4))
+    kept = store.put(torch.ones(4))
+    assert store.nbytes == 32
+
+    store.release(handle)
+    assert not os.path.exists(handle.path)
+    assert os.path.exists(kept.path)
+
+    store.close()
+    assert not os.path.exists(store.directory)
+
+
+def test_share_replaces_only_large_arrays():
+    with SharedTensorStore() as store:
+        value = {"big": torch.zeros(1000), "small": torch.zeros(2), "rate": 0.1,
+                 "tasks": [{"x": np.zeros(500, dtype=np.float32)}]}
+        shared = share(value, store, threshold=1024)
+
+        assert isinstance(shared["big"], TensorHandle)
+        assert isinstance(shared["tasks"][0]["x"], TensorHandle)
+        assert shared["small"] is value["small"]
+        assert len(handles_in(shared)) == 2
+
+        restored = resolve(shared)
+        assert torch.equal(restored["big"], value["big"])
+        assert restored["rate"] == 0.1
+
+
+def test_process_subtasks_receive_shared_tensors():
+    data = torch.arange(1 << 16, dtype=torch.float32)
+    subtask = Subtask("sum", SumTool(), {"data": data})
+    with SubtaskExecutor(kind="process", max_workers=1, share_threshold=1024) as executor:
+        kwargs, release = executor._shared_kwargs(subtask)
+        assert isinstance(kwargs["data"], TensorHandle)
+        release()
+
+        records = executor.run([subtask])
+        assert len(executor._store) == 0
+
+    result = records["sum"]["result"]
+    assert result["sum"] == float(data.sum())
+    assert result["type"] == "Tensor"
+    assert result["pid"] != os.getpid()
@@ -0,0 +1,91 @@
+"""Tests for the diagonal SSM engine."""
+
+import pytest
+import torch
+
+from multi_agent.core.ssm import DiagonalSSM, HiddenStateView, parallel_scan
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return DiagonalSSM(state_dim=8, input_dim=3, output_dim=2)
+
+
+def _trajectory(model, inputs, chunk_size):
+    boundaries = []
+    for _, _, state_in, _ in model.forward_chunked(inputs, chunk_size):
+        boundaries.append(state_in)
+    return boundaries
+
+
+def test_parallel_scan_matches_sequential_recurrence():
+    torch.manual_seed(0)
+    u = torch.randn(2, 37, 4)
+    decay = torch.rand(4)
+    h0 = torch.randn(2, 4)
+
+    states = parallel_scan(u, decay, h0)
+
+    h = h0
+    for t in range(u.shape[1]):
+        h = decay * h + u[:, t]
+        assert torch.allclose(states[:, t], h, atol=1e-5)
+
+
+def test_forward_matches_step(model):
+    x = torch.randn(2, 25, 3)
+    with torch.no_grad():
+        y, h_last = model(x)
+        h = model.init_state(2)
+        stepped = []
+        for t in range(x.shape[1]):
+            y_t, h = model.step(x[:, t], h)
+            stepped.append(y_t)
+
+    assert torch.allclose(y, torch.stack(stepped, dim=1), atol=1e-5)
+    assert torch.allclose(h_last, h, atol=1e-5)
+
+
+def test_forward_chunked_matches_full_pass(model):
+    x = torch.randn(1, 50, 3)
+    with torch.no_grad():
+        y, h_last = model(x)
+        chunks = list(model.forward_chunked(x, chunk_size=16))
+
+    assert [start for start, _, _, _ in chunks] == [0, 16, 32, 48]
+    assert torch.allclose(torch.cat([out for _, out, _, _ in chunks], dim=1), y, atol=1e-5)
+    assert torch.allclose(chunks[-1][3], h_last, atol=1e-5)
+
+
+def test_hidden_state_view_indexing_and_slicing(model):
+    x = torch.randn(1, 50, 3)
+    with torch.no_grad():
+        _, _, states = model(x, return_states=True)
+    view = HiddenStateView(model, x, _trajectory(model, x, 16), 16, squeeze_batch=True)
+
+    assert len(view) == 50
+    assert view.shape == (50, 8)
+    assert torch.allclose(view[0], states[0, 0], atol=1e-5)
+    assert torch.allclose(view[17], states[0, 17], atol=1e-5)
+    assert torch.allclose(view[-1], states[0, -1], atol=1e-5)
+    assert torch.allclose(view[10:40:3], states[0, 10:40:3], atol=1e-5)
+    assert torch.allclose(view.materialize(), states[0], atol=1e-5)
+    assert view[30:10].shape == (0, 8)
+    assert torch.allclose(torch.cat(list(view.iter_chunks())), states[0], atol=1e-5)
+
+    with pytest.raises(IndexError):
+        view[50]
+    with pytest.raises(TypeError):
+        view["0"]
+
+
+def test_hidden_state_view_keeps_batch_dimension(model):
+    x = torch.randn(3, 20, 3)
+    with torch.no_grad():
+        _, _, states = model(x, return_states=True)
+    view = HiddenStateView(model, x, _trajectory(model, x, 8), 8)
+
+    assert view.shape == (3, 20, 8)
+    assert torch.allclose(view[5], states[:, 5], atol=1e-5)
+    assert torch.allclose(view[4:12], states[:, 4:12], atol=1e-5)
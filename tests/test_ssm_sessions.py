@@ -0,0 +1,130 @@
+"""Tests for SSMTool sessions that carry the recurrent state across calls."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.cache import ResultCache
+from multi_agent.tools.ssm_tool import SSMTool
+
+
+def _sequence(length=120):
+    t = np.linspace(0, 6 * np.pi, length, dtype=np.float32)
+    return np.stack([np.sin(t), np.cos(t)], axis=-1)
+
+
+KWARGS = dict(state_dim=8, input_dim=2, prediction_steps=3)
+
+
+def test_appending_steps_matches_one_pass_over_the_history():
+    sequence = _sequence()
+    tool = SSMTool()
+    tool.set_cache(ResultCache())
+
+    opened = tool._run(sequence[:80], session_id="env", **KWARGS)
+    first = tool._run(sequence[80:100], session_id="env", **KWARGS)
+    second = tool._run(sequence[100:], session_id="env", **KWARGS)
+
+    assert opened["session"] == {"id": "env", "created": True, "steps": 80}
+    assert second["session"] == {"id": "env", "created": False, "steps": 120}
+    assert first["new_steps"] == 20 and second["sequence_length"] == 120
+    # Replaying the whole history through the fitted model gives the same state
+    model = tool._sessions["env"].model
+    with torch.no_grad():
+        _, state = model(torch.as_tensor(sequence[None, :-1]))
+    assert torch.allclose(second["final_state"], state[0], atol=1e-5)
+    assert second["predictions"].shape == (3, 2)
+    assert tool._cache.metrics()["bypassed"] == 3 and len(tool._cache) == 0
+
+
+def test_sessions_advance_concurrently():
+    sequence = _sequence()
+    tool = SSMTool()
+    for sid in ("slow", "fast"):
+        tool._run(sequence[:80], session_id=sid, **KWARGS)
+
+    entered, release = threading.Event(), threading.Event()
+    model = tool._sessions["slow"].model
+    forward_chunked = model.forward_chunked
+
+    def blocking(*args, **kwargs):
+        entered.set()
+        release.wait(10)
+        return forward_chunked(*args, **kwargs)
+
+    model.forward_chunked = blocking
+    slow = []
+    thread = threading.Thread(
+        target=lambda: slow.append(tool._run(sequence[80:], session_id="slow", **KWARGS)))
+    thread.start()
+    assert entered.wait(10)
+
+    # Another session is not serialized behind the one computing
+    start = time.monotonic()
+    fast = tool._run(sequence[80:], session_id="fast", **KWARGS)
+    assert time.monotonic() - start < 5 and fast["status"] == "success"
+    release.set()
+    thread.join(10)
+    assert slow[0]["status"] == "success" and slow[0]["session"]["steps"] == 120
+
+def test_snapshot_restore_rewinds_a_session():
+    sequence = _sequence()
+    tool = SSMTool()
+    tool.set_cache(None)
+    tool._run(sequence[:60], session_id="env", **KWARGS)
+    snapshot = tool.snapshot_session("env")
+
+    ahead = tool._run(sequence[60:90], session_id="env", **KWARGS)
+    tool.restore_session("env", snapshot)
+    replayed = tool._run(sequence[60:90], session_id="env", **KWARGS)
+
+    assert torch.equal(ahead["final_state"], replayed["final_state"])
+    assert torch.equal(ahead["predictions"], replayed["predictions"])
+    assert snapshot["steps"] == 60
+
+
+def test_idle_sessions_are_evicted_least_recently_used_first():
+    sequence = _sequence(40)
+    tool = SSMTool()
+    tool.set_cache(None)
+    tool.set_session_limits(max_sessions=2)
+    for sid in ("a", "b"):
+        tool._run(sequence[:20], session_id=sid, train_epochs=0, **KWARGS)
+    tool._run(sequence[20:25], session_id="a", **KWARGS)  # "b" is now least recent
+    tool._run(sequence[:20], session_id="c", train_epochs=0, **KWARGS)
+
+    assert tool.sessions() == {"active": ["a", "c"], "max_sessions": 2, "evictions": 1}
+    # An evicted id starts over from the history it is given
+    assert tool._run(sequence[:20], session_id="b", **KWARGS)["session"]["created"]
+
+
+def test_supervised_sessions_need_targets_for_new_steps():
+    x = np.random.default_rng(0).standard_normal((50, 2)).astype(np.float32)
+    y = x.sum(-1, keepdims=True)
+    tool = SSMTool()
+    tool.set_cache(None)
+    kwargs = dict(state_dim=8, input_dim=2, output_dim=1, prediction_steps=4)
+    tool._run(x[:30], targets=y[:30], session_id="s", **kwargs)
+
+    missing = tool._run(x[30:], session_id="s", **kwargs)
+    updated = tool._run(x[30:], targets=y[30:], session_id="s", **kwargs)
+
+    assert missing["status"] == "error"
+    assert updated["status"] == "success" and updated["predictions"].shape == (4, 1)
+    assert updated["sequence_length"] == 50
+
+
+def test_agent_streams_through_a_session():
+    from multi_agent.agents import StateModelingAgent
+
+    sequence = _sequence()
+    agent = StateModelingAgent({"state_dim": 8, "prediction_steps": 2, "cache": False})
+    agent.update_stream("env", sequence[:100])
+    predictions, metrics = agent.update_stream("env", sequence[100:])
+
+    assert predictions.shape == (2, 2)
+    assert agent.ssm_tool.sessions()["active"] == ["env"]
+    assert 0.0 <= metrics["modeling_accuracy"] <= 1.0
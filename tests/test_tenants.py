@@ -0,0 +1,92 @@
+"""Tests for the multi-tenant delta registry."""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from multi_agent.core.models import MLPRegressor
+from multi_agent.core.tenants import TenantRegistry
+
+
+def _task(amplitude, n=16, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-2, 2, (n, 3)).astype(np.float32)
+    return torch.as_tensor(x), torch.as_tensor(amplitude * np.sin(x).sum(-1, keepdims=True))
+
+
+@pytest.fixture
+def base():
+    torch.manual_seed(0)
+    return MLPRegressor(3, 1, 32)
+
+
+def test_batched_forward_matches_each_tenants_merged_model(base):
+    registry = TenantRegistry(base, rank=2)
+    (xa, ya), (xb, yb) = _task(1.0), _task(-2.0, seed=1)
+    losses = registry.adapt(["a"] * 16 + ["b"] * 16, torch.cat([xa, xb]), torch.cat([ya, yb]),
+                            steps=20, learning_rate=0.05)
+    assert all(loss["final_loss"] < loss["initial_loss"] for loss in losses.values())
+
+    mixed = torch.stack([xa[0], xb[0], xa[1]])
+    outputs = registry.forward(["a", "b", "a"], mixed)
+    for tenant, row in (("a", 0), ("b", 1), ("a", 2)):
+        model = MLPRegressor(3, 1, 32)
+        model.load_state_dict(registry.parameters(tenant))
+        with torch.no_grad():
+            assert torch.allclose(outputs[row], model(mixed[row]), atol=1e-5)
+    # The shared base is untouched
+    with torch.no_grad():
+        assert torch.allclose(registry.base(mixed), base(mixed))
+
+
+def test_tenants_adapt_independently_in_one_batch(base):
+    (xa, ya), (xb, yb) = _task(1.0), _task(-2.0, seed=1)
+    together = TenantRegistry(base, rank=2)
+    together.adapt(["a"] * 16 + ["b"] * 16, torch.cat([xa, xb]), torch.cat([ya, yb]))
+    alone = TenantRegistry(base, rank=2)
+    alone.create("a")
+    alone.create("b")
+    alone.adapt(["b"] * 16, xb, yb)
+
+    for name, value in alone.parameters("b").items():
+        assert torch.allclose(together.parameters("b")[name], value, atol=1e-6)
+
+
+def test_cold_tenants_spill_to_disk_and_come_back(base, tmp_path):
+    registry = TenantRegistry(base, rank=2, max_resident=2, spill_dir=str(tmp_path), capacity=2)
+    tenants = [f"t{i}" for i in range(5)]
+    x = torch.randn(2, 3)
+    for i, tenant in enumerate(tenants):
+        registry.adapt([tenant] * 16, *_task(i + 1.0, seed=i))
+        if i == 1:
+            before = registry.forward(tenants[:2], x)
+
+    memory = registry.memory()
+    assert memory["resident_tenants"] == 2 and memory["spilled_tenants"] == 3
+    assert sorted(os.listdir(tmp_path)) == ["t0.safetensors", "t1.safetensors", "t2.safetensors"]
+    assert memory["delta_bytes_per_tenant"] < memory["model_bytes"] / 3
+    assert registry.capacity == 2  # slots are reused, not grown
+
+    assert torch.equal(registry.forward(tenants[:2], x), before)
+    assert registry.memory()["loads"] == 2 and registry.capacity == 2
+    with pytest.raises(ValueError, match="resident"):
+        registry.forward(tenants[:3], torch.randn(3, 3))
+    with pytest.raises(KeyError):
+        registry.forward(["unknown"], x[:1])
+
+
+def test_agent_serves_tenants_on_top_of_its_adapted_model():
+    from multi_agent.agents import AdaptationAgent
+
+    agent = AdaptationAgent({"cache": False, "adaptation_steps": 10, "learning_rate": 0.05,
+                             "tenants": {"rank": 2}})
+    x, y = _task(1.0)
+    agent.adapt_online(x, y)
+    losses = agent.adapt_tenants(["a"] * 16 + ["b"] * 16, torch.cat([x, x]), torch.cat([y, -y]))
+
+    predictions = agent.predict_tenants(["a", "b"], x[:2].numpy())
+    assert set(losses) == {"a", "b"}
+    assert not torch.allclose(predictions[0], predictions[1])
+    assert agent.tenant_registry() is agent.tenant_registry()
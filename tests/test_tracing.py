@@ -0,0 +1,156 @@
+"""Tests for span tracing of the tool, agent and workflow hot paths."""
+
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from multi_agent.core.tracing import Tracer, disable_tracing, enable_tracing, get_tracer, span, traced
+
+
+@pytest.fixture
+def tracer():
+    tracer = enable_tracing()
+    tracer.clear()
+    yield tracer
+    disable_tracing()
+    tracer.clear()
+
+
+def test_spans_nest_and_record_resources(tracer):
+    @traced(category="tool")
+    def work(x):
+        return x * 2
+
+    with span("outer", category="workflow", run=1):
+        work(np.ones(256, dtype=np.float32))
+
+    inner, outer = tracer.spans()
+    assert (inner.name, inner.category, inner.parent, inner.depth) == (
+        "test_spans_nest_and_record_resources.<locals>.work", "tool", "outer", 1)
+    assert inner.tensor_bytes == 2 * 1024
+    assert outer.attributes == {"run": 1} and outer.depth == 0
+    assert outer.wall_seconds >= inner.wall_seconds > 0
+    assert inner.cpu_seconds >= 0 and outer.peak_rss_bytes > 0
+
+
+def test_errors_are_recorded_and_reraised(tracer):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+
+    (failed,) = tracer.spans()
+    assert failed.error == "ValueError"
+    assert tracer.summary()["by_name"]["failing"]["errors"] == 1
+
+
+def test_ring_buffer_keeps_the_newest_spans():
+    tracer = Tracer(capacity=3, enabled=True)
+    for index in range(5):
+        with tracer.span(f"s{index}"):
+            pass
+
+    assert [s.name for s in tracer.spans()] == ["s2", "s3", "s4"]
+    assert tracer.dropped == 2 and tracer.summary()["spans"] == 3
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer(enabled=True)
+    with tracer.span("phase", category="workflow", note=object()):
+        time.sleep(0.002)
+
+    def worker():
+        with tracer.span("worker"):
+            pass
+
+    thread = threading.Thread(target=worker, name="worker-thread")
+    thread.start()
+    thread.join()
+
+    path = tmp_path / "trace.json"
+    assert tracer.export_chrome_trace(str(path)) == 2
+    events = json.loads(path.read_text())["traceEvents"]
+    (phase,) = [e for e in events if e["name"] == "phase"]
+    assert phase["ph"] == "X" and phase["cat"] == "workflow" and phase["dur"] >= 2000
+    assert isinstance(phase["args"]["note"], str)
+    assert {"worker-thread", "MainThread"} <= {e["args"]["name"] for e in events if e["ph"] == "M"}
+
+
+def test_disabled_tracing_records_nothing_and_is_cheap():
+    tracer = get_tracer()
+    assert not tracer.enabled
+
+    def plain(x):
+        return x
+
+    wrapped = traced()(plain)
+    calls = 20000
+    start = time.perf_counter()
+    for _ in range(calls):
+        plain(1)
+    baseline = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(calls):
+        wrapped(1)
+        with span("noop"):
+            pass
+    overhead = (time.perf_counter() - start - baseline) / calls
+
+    assert tracer.spans() == []
+    assert overhead < 5e-6
+
+
+def test_tools_and_workflow_phases_surface_in_monitoring(tracer):
+    from multi_agent.agents import AdaptationAgent, StateModelingAgent
+    from multi_agent.workflows import CollaborativeLearning
+
+    t = np.linspace(0, 4 * np.pi, 64, dtype=np.float32)
+    x = np.random.default_rng(0).standard_normal((16, 3)).astype(np.float32)
+    workflow = CollaborativeLearning(
+        agents=[AdaptationAgent({"cache": False}), StateModelingAgent({"cache": False})])
+    result = workflow.solve_task("trace", sequence_data=np.stack([np.sin(t), np.cos(t)], -1),
+                                 environment_data={"observations": x, "targets": x.sum(-1)[:, None]})
+    workflow.executor.shutdown()
+    assert result["status"] == "success"
+
+    report = workflow.coordinator.monitor_collaboration(workflow.agents)["tracing"]
+    names = report["by_name"]
+    for name in ("CollaborativeLearning.solve_task", "CollaborativeLearning.execute",
+                 "SSMTool._run", "AdaptationTool._run", "CoordinatorAgent.coordinate"):
+        assert names[name]["count"] == 1
+    assert names["SSMTool._run"]["tensor_bytes"] >= 64 * 2 * 4
+    assert report["by_category"]["tool"]["wall_seconds"] > 0
+
+
+def test_agent_entry_points_are_traced(tracer):
+    from multi_agent.agents import AdaptationAgent, StateModelingAgent
+
+    t = np.linspace(0, 4 * np.pi, 64, dtype=np.float32)
+    x = np.random.default_rng(0).standard_normal((16, 3)).astype(np.float32)
+    StateModelingAgent({"cache": False}).model_dynamics(np.stack([np.sin(t), np.cos(t)], -1), 8)
+    AdaptationAgent({"cache": False}).adapt_online(x, x.sum(-1)[:, None])
+
+    names = tracer.summary()["by_name"]
+    for outer, inner in (("StateModelingAgent.model_dynamics", "SSMTool._run"),
+                         ("AdaptationAgent.adapt_online", "AdaptationTool._run")):
+        assert names[outer]["count"] == names[inner]["count"] == 1
+        assert names[outer]["wall_seconds"] >= names[inner]["wall_seconds"]
+
+
+def test_llm_call_events_become_spans(tracer):
+    from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+
+    from multi_agent.agents.llm_cache import trace_llm_calls
+
+    with trace_llm_calls(tracer):
+        crewai_event_bus.emit(None, LLMCallStartedEvent(call_id="c1", model="m", messages="hi"))
+        crewai_event_bus.emit(None, LLMCallCompletedEvent(call_id="c1", model="m", messages="hi",
+                                                          response="ok", call_type="llm_call"))
+    # Handlers are removed on exit
+    crewai_event_bus.emit(None, LLMCallStartedEvent(call_id="c2", model="m", messages="hi"))
+
+    (call,) = tracer.spans()
+    assert (call.name, call.category) == ("LLM.call[m]", "llm")
+    assert call.wall_seconds >= 0